@@ -1,6 +1,12 @@
 from django.apps import AppConfig
+from django.db.backends.signals import connection_created
 
 
 class CommonConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'common'
+
+    def ready(self) -> None:
+        from common.metrics import install_query_timer
+
+        connection_created.connect(install_query_timer, dispatch_uid='common.metrics.query_timer')
@@ -0,0 +1,126 @@
+"""
+In-process ASGI client and load driver.
+
+Requests go through Django's `ASGIHandler` with the project middleware, so
+sync views pay the same thread hops as under an ASGI server, without the
+network and server noise.
+"""
+import asyncio
+import statistics
+import time
+from collections import Counter
+from typing import Callable, NamedTuple, Optional
+
+from django.core.handlers.asgi import ASGIHandler
+
+
+class ASGIResponse(NamedTuple):
+    """Status, headers and body of a response."""
+    status: int
+    headers: dict
+    body: bytes
+
+
+async def asgi_request(
+        app: ASGIHandler,
+        method: str,
+        path: str,
+        query: str = '',
+        headers: Optional[dict] = None,
+        body: bytes = b'',
+) -> ASGIResponse:
+    """Send one HTTP request to an ASGI application."""
+    raw_headers = [(b'host', b'testserver')]
+    raw_headers += [(key.lower().encode(), value.encode()) for key, value in (headers or {}).items()]
+    if body:
+        raw_headers.append((b'content-length', str(len(body)).encode()))
+    scope = {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': method,
+        'scheme': 'http',
+        'path': path,
+        'raw_path': path.encode(),
+        'query_string': query.encode(),
+        'root_path': '',
+        'headers': raw_headers,
+        'client': ('127.0.0.1', 0),
+        'server': ('testserver', 80),
+    }
+    messages = [{'type': 'http.request', 'body': body, 'more_body': False}]
+    disconnected = asyncio.Event()
+
+    async def receive() -> dict:
+        if messages:
+            return messages.pop(0)
+        await disconnected.wait()
+        return {'type': 'http.disconnect'}
+
+    status, response_headers, chunks = 0, {}, []
+
+    async def send(message: dict) -> None:
+        nonlocal status, response_headers
+        if message['type'] == 'http.response.start':
+            status = message['status']
+            response_headers = {
+                key.decode().lower(): value.decode() for key, value in message['headers']
+            }
+        elif message['type'] == 'http.response.body':
+            chunks.append(message.get('body', b''))
+
+    try:
+        await app(scope, receive, send)
+    finally:
+        disconnected.set()
+    return ASGIResponse(status, response_headers, b''.join(chunks))
+
+
+def percentile(values: list[float], fraction: float) -> float:
+    """Nearest-rank percentile of sorted values."""
+    if not values:
+        return 0.0
+    index = min(len(values) - 1, max(0, round(fraction * len(values)) - 1))
+    return values[index]
+
+
+async def run_clients(
+        app: ASGIHandler,
+        make_request: Callable[[int], dict],
+        clients: int,
+        requests_per_client: int,
+) -> dict:
+    """
+    Run concurrent clients sending requests back to back.
+
+    `make_request(n)` returns the keyword arguments of `asgi_request` for the
+    n-th request of a client.
+    """
+    latencies, statuses = [], Counter()
+
+    async def client() -> None:
+        for number in range(requests_per_client):
+            started = time.perf_counter()
+            response = await asgi_request(app, **make_request(number))
+            latencies.append(time.perf_counter() - started)
+            statuses[response.status] += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(clients)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    total = len(latencies)
+    return {
+        'clients': clients,
+        'requests': total,
+        'seconds': round(elapsed, 4),
+        'throughput': round(total / elapsed, 2) if elapsed else 0.0,
+        'latency_ms': {
+            'mean': round(statistics.fmean(latencies) * 1000, 3) if latencies else 0.0,
+            'p50': round(percentile(latencies, 0.50) * 1000, 3),
+            'p95': round(percentile(latencies, 0.95) * 1000, 3),
+            'p99': round(percentile(latencies, 0.99) * 1000, 3),
+        },
+        'statuses': {str(code): count for code, count in sorted(statuses.items())},
+    }
@@ -0,0 +1,314 @@
+"""
+Seeded synthetic datasets.
+
+Generated users have an `@bench.example.com` email and share one password;
+generated vacations are created by the employers among them. Users get
+Russian or English names and a mix of roles, vacations get titles,
+companies, addresses and texts in either language and phone numbers valid
+for `PhoneNumberField`.
+
+`seed_dataset()` only adds the rows missing from the requested sizes, so a
+large dataset is built once and reused by later runs. Every row comes from
+a `random.Random` seeded with the seed and the row number, so the same
+sizes and seed always give the same data, apart from the timestamps which
+spread over the year before the load. Rows are loaded with
+`common.bulk`: `COPY` on PostgreSQL, `bulk_create()` elsewhere.
+"""
+import random
+from contextlib import nullcontext
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Optional
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models import QuerySet
+
+from common.bulk import deferred_indexes, load_in_chunks, load_rows
+from common.generations import bump_generation
+from vacations.models import Vacations
+
+User = get_user_model()
+
+EMAIL_DOMAIN = 'bench.example.com'
+USERNAME_PREFIX = 'bench-'
+PASSWORD = 'Benchmark-pass-1'
+SPREAD = timedelta(days=365)
+
+# Search terms found in the generated vacations.
+WORDS = (
+    'python', 'django', 'backend', 'frontend', 'developer', 'engineer', 'analyst',
+    'manager', 'designer', 'senior', 'junior', 'remote', 'office', 'data', 'cloud',
+    'mobile', 'support', 'sales', 'marketing', 'finance', 'logistics', 'teacher',
+    'разработчик', 'инженер', 'аналитик', 'менеджер', 'дизайнер', 'удаленно',
+    'офис', 'продажи', 'поддержка', 'логистика', 'бухгалтер', 'учитель',
+)
+COMPANIES = ('Acme', 'Globex', 'Initech', 'Umbrella', 'Stark', 'Ромашка', 'Вектор', 'Сигма')
+COMPANY_FORMS = {
+    'en': ('{} Inc.', '{} Labs', '{} Group', '{} Software', '{} Logistics'),
+    'ru': ('ООО «{}»', 'АО «{}»', 'Группа компаний «{}»', '{} Софт', '{} Логистика'),
+}
+SENIORITIES = {
+    'en': ('Junior', 'Middle', 'Senior', 'Lead', 'Remote'),
+    'ru': ('Младший', 'Старший', 'Ведущий', 'Главный', ''),
+}
+POSITIONS = {
+    'en': (
+        'Python developer', 'Django backend engineer', 'Frontend developer', 'Data analyst',
+        'Cloud engineer', 'Mobile developer', 'Product manager', 'UX designer',
+        'Support engineer', 'Sales manager', 'Marketing manager', 'Finance analyst',
+        'Logistics manager', 'Math teacher',
+    ),
+    'ru': (
+        'разработчик Python', 'backend-разработчик Django', 'frontend-разработчик',
+        'аналитик данных', 'инженер DevOps', 'менеджер по продажам', 'дизайнер интерфейсов',
+        'инженер поддержки', 'бухгалтер', 'менеджер по логистике', 'учитель английского',
+    ),
+}
+SENTENCES = {
+    'en': (
+        'We are a growing team building products used by millions of people.',
+        'You will work on the backend of our data platform.',
+        'The office is in the city centre, remote work is possible.',
+        'We value clean code, code review and automated tests.',
+        'Our stack is Python, Django, PostgreSQL and the cloud.',
+        'We offer a competitive salary, health insurance and flexible hours.',
+        'The role reports to the head of engineering.',
+        'You will help our sales and support teams with data.',
+        'Mentoring junior colleagues is part of the job.',
+        'We ship small changes to production every day.',
+    ),
+    'ru': (
+        'Мы растущая команда и делаем продукты для миллионов пользователей.',
+        'Вы будете работать над серверной частью платформы данных.',
+        'Офис в центре города, возможна удаленная работа.',
+        'Мы ценим чистый код, ревью и автоматические тесты.',
+        'Наш стек: Python, Django, PostgreSQL и облака.',
+        'Предлагаем конкурентную зарплату, ДМС и гибкий график.',
+        'Вы будете подчиняться руководителю разработки.',
+        'Вы поможете отделам продаж и поддержки с аналитикой.',
+        'В обязанности входит наставничество для младших коллег.',
+        'Мы выкатываем небольшие изменения в продакшен каждый день.',
+    ),
+}
+REQUIREMENTS = {
+    'en': (
+        '3+ years of commercial Python experience', 'Knowledge of Django and DRF',
+        'Experience with PostgreSQL', 'Understanding of REST APIs', 'Docker and CI/CD',
+        'English at B2 level', 'Experience in sales or marketing', 'Attention to detail',
+        'Higher education in finance', 'Excel and data analysis skills',
+    ),
+    'ru': (
+        'Опыт коммерческой разработки на Python от 3 лет', 'Знание Django и DRF',
+        'Опыт работы с PostgreSQL', 'Понимание REST API', 'Docker и CI/CD',
+        'Английский на уровне B2', 'Опыт в продажах или маркетинге', 'Внимательность к деталям',
+        'Высшее экономическое образование', 'Уверенное владение Excel и аналитикой',
+    ),
+}
+RESPONSIBILITIES = {
+    'en': (
+        'Develop and maintain services', 'Review the code of colleagues',
+        'Design database schemas', 'Work with customers and partners', 'Prepare reports',
+        'Take part in planning', 'Improve monitoring and logging', 'Support the office team',
+    ),
+    'ru': (
+        'Разработка и поддержка сервисов', 'Ревью кода коллег', 'Проектирование схем баз данных',
+        'Работа с клиентами и партнерами', 'Подготовка отчетов', 'Участие в планировании',
+        'Улучшение мониторинга и логирования', 'Поддержка сотрудников офиса',
+    ),
+}
+CITIES = {
+    'en': ('London', 'Berlin', 'New York', 'Austin', 'Dublin'),
+    'ru': ('Москва', 'Санкт-Петербург', 'Казань', 'Новосибирск', 'Екатеринбург'),
+}
+STREETS = {
+    'en': ('Main street', 'Oak avenue', 'Park lane', 'King street', 'Market square'),
+    'ru': ('ул. Ленина', 'Невский пр.', 'ул. Пушкина', 'пр. Мира', 'ул. Гагарина'),
+}
+# Pairs of the displayed name and its latin form used in logins.
+FIRST_NAMES = {
+    'en': tuple((name, name.lower()) for name in (
+        'James', 'Mary', 'John', 'Linda', 'Robert', 'Emma', 'David', 'Olivia', 'Daniel', 'Sophia',
+    )),
+    'ru': (
+        ('Иван', 'ivan'), ('Анна', 'anna'), ('Сергей', 'sergey'), ('Мария', 'maria'),
+        ('Дмитрий', 'dmitry'), ('Елена', 'elena'), ('Алексей', 'alexey'), ('Ольга', 'olga'),
+    ),
+}
+LAST_NAMES = {
+    'en': tuple((name, name.lower()) for name in (
+        'Smith', 'Johnson', 'Brown', 'Taylor', 'Miller', 'Wilson', 'Moore', 'Clark',
+    )),
+    'ru': (
+        ('Иванов', 'ivanov'), ('Смирнов', 'smirnov'), ('Кузнецов', 'kuznetsov'),
+        ('Попов', 'popov'), ('Соколов', 'sokolov'), ('Новиков', 'novikov'),
+    ),
+}
+# Russian women take the feminine form of the last name.
+FEMININE_FIRST_NAMES = frozenset(('Анна', 'Мария', 'Елена', 'Ольга'))
+# Every number under these prefixes is valid: Russian mobile and city
+# numbers, and US numbers whose exchange starts with 2-9.
+PHONE_PREFIXES = {
+    'en': ('+1212', '+1415', '+1646', '+1312', '+1617', '+1512'),
+    'ru': ('+7495', '+7812', *(f'+79{code:02d}' for code in range(100))),
+}
+ROLE_WEIGHTS = {
+    User.Role.EMPLOYEE: 78,
+    User.Role.EMPLOYER: 20,
+    User.Role.ADMIN: 2,
+}
+TYPE_WEIGHTS = {
+    Vacations.TypeChoices.FULL_TIME: 6,
+    Vacations.TypeChoices.PART_TIME: 1,
+    Vacations.TypeChoices.REMOTE_TIME: 3,
+}
+USER_FIELDS = (
+    'username', 'email', 'password', 'role', 'first_name', 'last_name',
+    'is_superuser', 'is_staff', 'is_active', 'date_joined',
+)
+VACATION_FIELDS = (
+    'title', 'company_name', 'address', 'phone_number', 'description', 'requirements',
+    'responsibilities', 'type_vacation', 'created_by', 'updated_by', 'created_at', 'updated_at',
+)
+
+
+def benchmark_users(using: str = DEFAULT_DB_ALIAS) -> QuerySet:
+    return User.objects.using(using).filter(email__endswith=f'@{EMAIL_DOMAIN}')
+
+
+def benchmark_vacations(using: str = DEFAULT_DB_ALIAS) -> QuerySet:
+    return Vacations.objects.using(using).filter(created_by__email__endswith=f'@{EMAIL_DOMAIN}')
+
+
+def make_text(rng: random.Random, words: int) -> str:
+    return ' '.join(rng.choice(WORDS) for _ in range(words))
+
+
+def make_phone_number(rng: random.Random, language: str) -> str:
+    """Make a valid phone number in the E164 format."""
+    prefix = rng.choice(PHONE_PREFIXES[language])
+    if prefix.startswith('+1'):
+        return f'{prefix}{rng.randint(2, 9)}{rng.randrange(10 ** 6):06d}'
+    return f'{prefix}{rng.randrange(10 ** 7):07d}'
+
+
+def make_timestamp(rng: random.Random, now: datetime) -> datetime:
+    return now - timedelta(seconds=rng.randrange(int(SPREAD.total_seconds())))
+
+
+def make_user_row(number: int, seed: int, password: str, now: datetime) -> tuple:
+    """Make a user row of `USER_FIELDS`."""
+    rng = random.Random(f'{seed}:user:{number}')
+    language = rng.choice(('en', 'ru'))
+    first_name, first_login = rng.choice(FIRST_NAMES[language])
+    last_name, last_login = rng.choice(LAST_NAMES[language])
+    if first_name in FEMININE_FIRST_NAMES:
+        last_name, last_login = f'{last_name}а', f'{last_login}a'
+    role = rng.choices(tuple(ROLE_WEIGHTS), weights=tuple(ROLE_WEIGHTS.values()))[0]
+    is_admin = role == User.Role.ADMIN
+    return (
+        f'{USERNAME_PREFIX}{last_login}{number}',
+        f'{first_login}.{last_login}.{number}@{EMAIL_DOMAIN}',
+        password,
+        role,
+        first_name,
+        last_name,
+        False,
+        is_admin,
+        True,
+        make_timestamp(rng, now),
+    )
+
+
+def make_vacation_row(number: int, seed: int, owner_id: int, now: datetime) -> tuple:
+    """Make a vacation row of `VACATION_FIELDS`."""
+    rng = random.Random(f'{seed}:vacation:{number}')
+    language = rng.choice(('en', 'ru'))
+    position = rng.choice(POSITIONS[language])
+    title = f'{rng.choice(SENIORITIES[language])} {position}'.strip()
+    created_at = make_timestamp(rng, now)
+    return (
+        title[0].upper() + title[1:],
+        rng.choice(COMPANY_FORMS[language]).format(rng.choice(COMPANIES)),
+        f'{rng.choice(CITIES[language])}, {rng.choice(STREETS[language])}, {rng.randint(1, 200)}',
+        make_phone_number(rng, language) if rng.random() < 0.8 else None,
+        ' '.join(rng.sample(SENTENCES[language], rng.randint(3, 6))),
+        '\n'.join(f'- {item}' for item in rng.sample(REQUIREMENTS[language], rng.randint(2, 5))),
+        '\n'.join(f'- {item}' for item in rng.sample(RESPONSIBILITIES[language], rng.randint(2, 5))),
+        rng.choices(tuple(TYPE_WEIGHTS), weights=tuple(TYPE_WEIGHTS.values()))[0],
+        owner_id,
+        owner_id,
+        created_at,
+        # Edited within a week, but not after `now`.
+        min(created_at + timedelta(seconds=rng.randrange(7 * 24 * 3600)), now) if rng.random() < 0.3 else created_at,
+    )
+
+
+def load_users(start: int, stop: int, seed: int, password: str, now: datetime, using: str) -> int:
+    """Load users `start` to `stop`, run by `load_in_chunks()`."""
+    rows = (make_user_row(number, seed, password, now) for number in range(start, stop))
+    return load_rows(User, USER_FIELDS, rows, using=using)
+
+
+def load_vacations(start: int, stop: int, seed: int, owner_ids: list[int], now: datetime, using: str) -> int:
+    """Load vacations `start` to `stop`, run by `load_in_chunks()`."""
+    rows = (
+        make_vacation_row(number, seed, owner_ids[number % len(owner_ids)], now)
+        for number in range(start, stop)
+    )
+    return load_rows(Vacations, VACATION_FIELDS, rows, using=using)
+
+
+def seed_dataset(
+        users: int,
+        vacations: int,
+        seed: int = 0,
+        chunk_size: int = 50_000,
+        workers: int = 1,
+        defer_indexes: bool = False,
+        using: str = DEFAULT_DB_ALIAS,
+        progress: Optional[Callable[[str], None]] = None,
+) -> dict[str, int]:
+    """
+    Add the users and vacations missing from the requested sizes.
+
+    Chunks of `chunk_size` rows are loaded by `workers` processes. With
+    `defer_indexes` the indexes of a table are dropped while rows are
+    added to it and built again afterwards.
+    """
+    report = progress or (lambda message: None)
+    now = datetime.now(timezone.utc)
+
+    existing = benchmark_users(using).count()
+    if existing < users:
+        password = make_password(PASSWORD)
+        with deferred_indexes(User, using) if defer_indexes else nullcontext():
+            load_in_chunks(
+                load_users, existing, users, seed, password, now, using,
+                chunk_size=chunk_size, workers=workers, using=using,
+                progress=lambda total: report(f'users: {existing + total}/{users}'),
+            )
+        bump_generation(User, using=using)
+
+    existing = benchmark_vacations(using).count()
+    if existing < vacations:
+        owner_ids = list(
+            benchmark_users(using).filter(role=User.Role.EMPLOYER).order_by('pk').values_list('pk', flat=True)
+        )
+        if not owner_ids:
+            raise ValueError('Vacations need at least one employer, seed more users.')
+        with deferred_indexes(Vacations, using) if defer_indexes else nullcontext():
+            load_in_chunks(
+                load_vacations, existing, vacations, seed, owner_ids, now, using,
+                chunk_size=chunk_size, workers=workers, using=using,
+                progress=lambda total: report(f'vacations: {existing + total}/{vacations}'),
+            )
+        bump_generation(Vacations, using=using)
+
+    return {'users': benchmark_users(using).count(), 'vacations': benchmark_vacations(using).count()}
+
+
+def drop_dataset(using: str = DEFAULT_DB_ALIAS) -> None:
+    """Delete the generated vacations and users."""
+    benchmark_vacations(using).delete()
+    benchmark_users(using).delete()
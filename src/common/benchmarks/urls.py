@@ -0,0 +1,75 @@
+"""
+Sync and async variants of the vacation read endpoints and of registration.
+
+Both read variants share the configuration of `VacationsViewSet` reads,
+without the response cache, so the comparison measures the view stack
+itself. Sync registration is the `CustomUserViewSet` action.
+"""
+from django.urls import path
+from rest_framework import filters, status
+from rest_framework.authentication import BasicAuthentication
+from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.request import Request
+from rest_framework.response import Response
+
+from common.counting import CachedCount, EstimatedCount
+from common.filters import FullTextSearchFilter
+from common.pagination import KeysetPagination
+from common.views.async_mixins import AsyncExtendedGenericViewSet, AsyncRetrieveListViewSet
+from common.views.mixins import RetrieveListViewSet
+from users.jwt.authentication import AsyncJWTAuthentication
+from users.jwt.tokens import set_refresh_cookie
+from users.serializers.api.users import RegistrationSerializer
+from users.views.users import CustomUserViewSet
+from vacations.models import Vacations
+from vacations.serializers.vacations import VacationsSerializers
+
+
+class VacationsReadConfig:
+    """Read configuration of `VacationsViewSet`."""
+    queryset = Vacations.objects.all()
+    serializer_class = VacationsSerializers
+    authentication_classes = (AsyncJWTAuthentication,)
+    permission_classes = (IsAuthenticated,)
+    fast_read_actions = ('list', 'retrieve')
+    pagination_class = KeysetPagination
+    count_strategy = EstimatedCount(fallback=CachedCount())
+    filter_backends = [FullTextSearchFilter, filters.OrderingFilter]
+    search_vector_field = 'search_vector'
+    search_configs = Vacations.SEARCH_CONFIGS
+    search_headline_field = 'description'
+    ordering_fields = ['created_at', 'company_name']
+
+
+class SyncVacationsViewSet(VacationsReadConfig, RetrieveListViewSet):
+    pass
+
+
+class AsyncVacationsViewSet(VacationsReadConfig, AsyncRetrieveListViewSet):
+    pass
+
+
+class AsyncRegistrationViewSet(AsyncExtendedGenericViewSet):
+    """`CustomUserViewSet.registration` saving with `RegistrationSerializer.asave()`."""
+    authentication_classes = (BasicAuthentication,)
+    permission_classes = (AllowAny,)
+    serializer_class = RegistrationSerializer
+
+    async def registration(self, request: Request, *args, **kwargs) -> Response:
+        serializer = self.get_serializer(data=request.data)
+        # Validation runs no query since uniqueness is left to the INSERT.
+        serializer.is_valid(raise_exception=True)
+        data = await serializer.asave()
+        response = Response({'user': data['user'], 'access': data['access']}, status=status.HTTP_201_CREATED)
+        set_refresh_cookie(response, data['refresh'])
+        return response
+
+
+urlpatterns = [
+    path('sync/vacations/', SyncVacationsViewSet.as_view({'get': 'list'})),
+    path('sync/vacations/<int:pk>/', SyncVacationsViewSet.as_view({'get': 'retrieve'})),
+    path('async/vacations/', AsyncVacationsViewSet.as_view({'get': 'list'})),
+    path('async/vacations/<int:pk>/', AsyncVacationsViewSet.as_view({'get': 'retrieve'})),
+    path('sync/registration/', CustomUserViewSet.as_view({'post': 'registration'})),
+    path('async/registration/', AsyncRegistrationViewSet.as_view({'post': 'registration'})),
+]
@@ -0,0 +1,183 @@
+"""
+Bulk loading of generated rows.
+
+`load_rows()` streams rows into PostgreSQL with `COPY ... FROM STDIN`, which
+skips the ORM, the model `save()` and the per-statement overhead of
+`INSERT`. Other databases fall back to batched `bulk_create()`. Rows are
+tuples matching `fields`, with values already in their database form;
+`None` is loaded as `NULL`.
+
+Large loads are split with `load_in_chunks()`, which runs the chunks in a
+pool of processes, each with its own connection, and `deferred_indexes()`,
+which drops the declared indexes of a model for the load and builds them
+again afterwards, once instead of row by row. Database triggers still run
+for copied rows.
+"""
+import csv
+import io
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import contextmanager
+from typing import Callable, Iterable, Iterator, Optional, Sequence
+
+import django
+from django.db import DEFAULT_DB_ALIAS, connections, models, transaction
+
+# Rows must not contain this string, it is loaded as `NULL`.
+COPY_NULL = r'\N'
+
+
+class RowStream(io.TextIOBase):
+    """
+    File-like object reading rows as CSV, for `cursor.copy_expert()`.
+
+    Rows are encoded as they are read, so a load never holds more than a
+    buffer of them.
+    """
+
+    def __init__(self, rows: Iterable[Sequence]) -> None:
+        self.rows = iter(rows)
+        self.buffer = io.StringIO()
+        self.writer = csv.writer(self.buffer, lineterminator='\n')
+        self.pending = ''
+
+    def readable(self) -> bool:
+        return True
+
+    def read(self, size: int = -1) -> str:
+        while size < 0 or len(self.pending) < size:
+            row = next(self.rows, None)
+            if row is None:
+                break
+            self.writer.writerow([COPY_NULL if value is None else value for value in row])
+            if self.buffer.tell() >= max(size, io.DEFAULT_BUFFER_SIZE):
+                self.pending += self.flush_buffer()
+        self.pending += self.flush_buffer()
+        if size < 0:
+            data, self.pending = self.pending, ''
+        else:
+            data, self.pending = self.pending[:size], self.pending[size:]
+        return data
+
+    def flush_buffer(self) -> str:
+        data = self.buffer.getvalue()
+        self.buffer.seek(0)
+        self.buffer.truncate()
+        return data
+
+
+def copy_rows(
+        model: type[models.Model],
+        fields: Sequence[str],
+        rows: Iterable[Sequence],
+        using: str = DEFAULT_DB_ALIAS,
+) -> int:
+    """Load rows with `COPY FROM STDIN`, PostgreSQL only."""
+    connection = connections[using]
+    quote_name = connection.ops.quote_name
+    columns = ', '.join(quote_name(model._meta.get_field(field).column) for field in fields)
+    sql = (
+        f'COPY {quote_name(model._meta.db_table)} ({columns}) '
+        f"FROM STDIN WITH (FORMAT csv, NULL '{COPY_NULL}')"
+    )
+    with transaction.atomic(using=using), connection.cursor() as cursor:
+        cursor.copy_expert(sql, RowStream(rows), size=64 * 1024)
+        return cursor.rowcount
+
+
+def insert_rows(
+        model: type[models.Model],
+        fields: Sequence[str],
+        rows: Iterable[Sequence],
+        using: str = DEFAULT_DB_ALIAS,
+        batch_size: int = 1000,
+) -> int:
+    """Load rows with `bulk_create()`, bypassing the model managers."""
+    attnames = [model._meta.get_field(field).attname for field in fields]
+    objects = [model(**dict(zip(attnames, row))) for row in rows]
+    with transaction.atomic(using=using):
+        model._base_manager.using(using).bulk_create(objects, batch_size=batch_size)
+    return len(objects)
+
+
+def load_rows(
+        model: type[models.Model],
+        fields: Sequence[str],
+        rows: Iterable[Sequence],
+        using: str = DEFAULT_DB_ALIAS,
+) -> int:
+    """Load rows with `COPY` on PostgreSQL and `bulk_create()` elsewhere."""
+    if connections[using].vendor == 'postgresql':
+        return copy_rows(model, fields, rows, using=using)
+    return insert_rows(model, fields, rows, using=using)
+
+
+def load_in_chunks(
+        function: Callable[..., int],
+        start: int,
+        stop: int,
+        *args,
+        chunk_size: int = 50_000,
+        workers: int = 1,
+        using: str = DEFAULT_DB_ALIAS,
+        progress: Optional[Callable[[int], None]] = None,
+) -> int:
+    """
+    Call `function(chunk_start, chunk_stop, *args)` over `range(start, stop)`.
+
+    `function` loads its chunk and returns the rows loaded; it must be a
+    module level function so worker processes can import it. Chunks run in
+    `workers` processes, except on SQLite which allows a single writer.
+    `progress` gets the total loaded after every chunk.
+    """
+    chunks = [(number, min(number + chunk_size, stop)) for number in range(start, stop, chunk_size)]
+    if connections[using].vendor == 'sqlite':
+        workers = 1
+    total = 0
+    if workers <= 1 or len(chunks) <= 1:
+        for chunk_start, chunk_stop in chunks:
+            total += function(chunk_start, chunk_stop, *args)
+            if progress:
+                progress(total)
+        return total
+
+    # Forked workers must not share the connections of the parent.
+    connections.close_all()
+    with ProcessPoolExecutor(min(workers, len(chunks)), initializer=django.setup) as pool:
+        futures = [pool.submit(function, chunk_start, chunk_stop, *args) for chunk_start, chunk_stop in chunks]
+        for future in as_completed(futures):
+            total += future.result()
+            if progress:
+                progress(total)
+    return total
+
+
+@contextmanager
+def deferred_indexes(model: type[models.Model], using: str = DEFAULT_DB_ALIAS) -> Iterator[list[models.Index]]:
+    """
+    Drop the `Meta.indexes` of a model for the block and build them again.
+
+    Only PostgreSQL indexes are deferred, and only those that exist: an
+    index whose migration is not applied is left alone. The table is
+    analyzed afterwards for the planner to see the new rows.
+    """
+    connection = connections[using]
+    if connection.vendor != 'postgresql':
+        yield []
+        return
+
+    table = model._meta.db_table
+    with connection.cursor() as cursor:
+        existing = connection.introspection.get_constraints(cursor, table)
+    indexes = [index for index in model._meta.indexes if index.name in existing]
+    with connection.schema_editor() as editor:
+        for index in indexes:
+            editor.remove_index(model, index)
+    try:
+        yield indexes
+    finally:
+        connection = connections[using]
+        with connection.schema_editor() as editor:
+            for index in indexes:
+                editor.add_index(model, index)
+        with connection.cursor() as cursor:
+            cursor.execute(f'ANALYZE {connection.ops.quote_name(table)}')
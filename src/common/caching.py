@@ -0,0 +1,140 @@
+"""
+Versioned cache of rendered GET responses.
+
+Entries are keyed on the generation of the view model (see
+`common.generations`), so any write to the model makes every cached page
+unreachable at once. The storage is a Django cache alias: local memory by
+default, Redis when `REDIS_URL` is configured.
+"""
+import hashlib
+import threading
+from typing import Optional
+from urllib.parse import urlencode
+
+from django.core.cache import caches
+from django.http import HttpResponse
+from rest_framework.request import Request
+from rest_framework.response import Response
+
+from common.generations import aget_generation, get_generation
+
+
+class ResponseCache:
+    """
+    Response cache views attach to with the `response_cache` attribute.
+
+    Attributes:
+        * `timeout` (int): TTL in seconds
+        * `actions` (tuple[str]): cached view actions
+        * `cache_alias` (str)
+        * `hits` (int)
+        * `misses` (int)
+    """
+
+    key_prefix = 'response'
+    anonymous_role = 'ANON'
+
+    def __init__(
+            self,
+            timeout: int = 300,
+            actions: tuple[str, ...] = ('list', 'retrieve'),
+            cache_alias: str = 'default',
+    ) -> None:
+        self.timeout = timeout
+        self.actions = actions
+        self.cache_alias = cache_alias
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @property
+    def cache(self):
+        return caches[self.cache_alias]
+
+    def is_cacheable(self, view, request: Request) -> bool:
+        """Check whether the request may be answered from the cache."""
+        return (
+                request.method in ('GET', 'HEAD')
+                and getattr(view, 'action', None) in self.actions
+        )
+
+    def get_role(self, request: Request) -> str:
+        """Get the role the response is rendered for."""
+        user = request.user
+        if not user or not user.is_authenticated:
+            return self.anonymous_role
+        return getattr(user, 'role', '')
+
+    def get_cache_key(self, view, request: Request, generation: Optional[int] = None) -> str:
+        """
+        Build the key from the URL, normalized query params and role.
+
+        The scheme and host are part of the key since cached bodies hold
+        absolute pagination links.
+        """
+        params = sorted(
+            (key, value)
+            for key in request.query_params
+            for value in request.query_params.getlist(key)
+            if value != ''
+        )
+        raw = '|'.join((
+            request.scheme,
+            request.get_host(),
+            request.path,
+            urlencode(params),
+            self.get_role(request),
+            request.accepted_media_type or '',
+        ))
+        model = view.get_queryset().model
+        if generation is None:
+            generation = get_generation(model)
+        digest = hashlib.md5(raw.encode()).hexdigest()
+        return f'{self.key_prefix}:{model._meta.label}:{generation}:{digest}'
+
+    async def aget_cache_key(self, view, request: Request) -> str:
+        """Build the key, reading the generation from async code."""
+        generation = await aget_generation(view.get_queryset().model)
+        return self.get_cache_key(view, request, generation)
+
+    def _count(self, hit: bool) -> None:
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def lookup(self, key: str) -> Optional[HttpResponse]:
+        """Get a cached response."""
+        return self.build_response(self.cache.get(key))
+
+    async def alookup(self, key: str) -> Optional[HttpResponse]:
+        """Get a cached response from async code."""
+        return self.build_response(await self.cache.aget(key))
+
+    def build_response(self, cached: Optional[tuple]) -> Optional[HttpResponse]:
+        """Rebuild a response from its cached content."""
+        self._count(hit=cached is not None)
+        if cached is None:
+            return None
+
+        content, content_type = cached
+        response = HttpResponse(content, content_type=content_type)
+        response['X-Cache'] = 'HIT'
+        return response
+
+    def store(self, key: str, response: Response) -> None:
+        """Cache the response once it is rendered."""
+        response['X-Cache'] = 'MISS'
+
+        def callback(rendered: Response) -> None:
+            self.cache.set(
+                key, (rendered.content, rendered['Content-Type']), self.timeout
+            )
+
+        response.add_post_render_callback(callback)
+
+    def stats(self) -> dict[str, int]:
+        """Get hit/miss counters of this process."""
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses}
@@ -0,0 +1,87 @@
+"""
+HTTP validators for querysets.
+
+`ETag` and `Last-Modified` come from one aggregate query (`MAX` of the
+timestamp field and `COUNT`), cached per generation of the model so repeated
+polling does not scan the table again until the next write.
+"""
+import datetime
+import hashlib
+from typing import NamedTuple, Optional
+
+from django.core.cache import cache
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Count, Max, QuerySet
+
+from common.generations import aget_generation, get_generation, is_tracked
+
+
+class Validators(NamedTuple):
+    """Weak entity tag, last modification time and number of rows."""
+    etag: str
+    last_modified: Optional[datetime.datetime]
+    count: int
+
+
+def has_field(queryset: QuerySet, field: str) -> bool:
+    """Check that the model has a concrete field."""
+    try:
+        queryset.model._meta.get_field(field)
+    except FieldDoesNotExist:
+        return False
+    return True
+
+
+def get_digest(queryset: QuerySet, field: str) -> str:
+    """Hash the field and the unordered SQL of a queryset."""
+    sql, params = queryset.order_by().query.sql_with_params()
+    return hashlib.md5(f'{field}|{sql}|{params!r}'.encode()).hexdigest()
+
+
+def build_validators(result: dict, digest: str) -> Validators:
+    """Build the validators from the aggregate of the queryset."""
+    last_modified = result['last_modified']
+    stamp = last_modified.timestamp() if last_modified else 0
+    return Validators(
+        etag=f'W/"{result["count"]}-{stamp:.6f}-{digest[:8]}"',
+        last_modified=last_modified,
+        count=result['count'],
+    )
+
+
+def get_validators(queryset: QuerySet, field: str, timeout: int = 300) -> Validators:
+    """Compute the validators of a queryset."""
+    digest = get_digest(queryset, field)
+
+    model = queryset.model
+    key = None
+    if is_tracked(model):
+        key = f'validators:{model._meta.label}:{get_generation(model)}:{digest}'
+        cached = cache.get(key)
+        if cached is not None:
+            return Validators(*cached)
+
+    result = queryset.order_by().aggregate(last_modified=Max(field), count=Count('pk'))
+    validators = build_validators(result, digest)
+    if key:
+        cache.set(key, tuple(validators), timeout)
+    return validators
+
+
+async def aget_validators(queryset: QuerySet, field: str, timeout: int = 300) -> Validators:
+    """Compute the validators of a queryset with the async ORM and cache."""
+    digest = get_digest(queryset, field)
+
+    model = queryset.model
+    key = None
+    if is_tracked(model):
+        key = f'validators:{model._meta.label}:{await aget_generation(model)}:{digest}'
+        cached = await cache.aget(key)
+        if cached is not None:
+            return Validators(*cached)
+
+    result = await queryset.order_by().aaggregate(last_modified=Max(field), count=Count('pk'))
+    validators = build_validators(result, digest)
+    if key:
+        await cache.aset(key, tuple(validators), timeout)
+    return validators
@@ -0,0 +1,172 @@
+"""
+Count strategies for paginated list endpoints.
+
+A view picks a strategy with the `count_strategy` attribute, the pagination
+reports whether the returned count is exact. `acount` is the variant used by
+async pagination; strategies without a native one run `count` in a thread.
+"""
+import hashlib
+import json
+from typing import NamedTuple, Optional
+
+from asgiref.sync import sync_to_async
+from django.core.cache import caches
+from django.db import connections
+from django.db.models import QuerySet
+from rest_framework.request import Request
+
+from common.generations import aget_generation, get_generation, is_tracked
+
+
+class CountResult(NamedTuple):
+    """Row count and whether it is exact."""
+    value: int
+    exact: bool
+
+
+class CountStrategy:
+    """Base count strategy."""
+
+    def count(self, queryset: QuerySet, request: Request) -> CountResult:
+        raise NotImplementedError
+
+    async def acount(self, queryset: QuerySet, request: Request) -> CountResult:
+        return await sync_to_async(self.count)(queryset, request)
+
+
+class ExactCount(CountStrategy):
+    """Plain `COUNT(*)`."""
+
+    def count(self, queryset: QuerySet, request: Request) -> CountResult:
+        return CountResult(queryset.count(), exact=True)
+
+    async def acount(self, queryset: QuerySet, request: Request) -> CountResult:
+        return CountResult(await queryset.acount(), exact=True)
+
+
+class EstimatedCount(CountStrategy):
+    """
+    Planner estimate for unfiltered lists.
+
+    A bare table is estimated from `pg_class.reltuples`, the base queryset of
+    a view (e.g. with a default `exclude()`) from `EXPLAIN`. Requests with
+    filter or search parameters, estimates below `threshold` and databases
+    other than PostgreSQL go to `fallback`.
+
+    Attributes:
+        * `fallback` (CountStrategy)
+        * `threshold` (int): estimates below it are counted exactly
+        * `ignored_params` (tuple[str]): query parameters that do not filter
+    """
+
+    ignored_params = ('page', 'page_size', 'cursor', 'ordering', 'format')
+
+    def __init__(
+            self,
+            fallback: Optional[CountStrategy] = None,
+            threshold: int = 10000,
+    ) -> None:
+        self.fallback = fallback or ExactCount()
+        self.threshold = threshold
+
+    def is_unfiltered(self, request: Request) -> bool:
+        """Check that the request carries no filtering parameters."""
+        return all(param in self.ignored_params for param in request.query_params)
+
+    @staticmethod
+    def get_table_estimate(queryset: QuerySet) -> Optional[int]:
+        """Get `reltuples` of the model table."""
+        connection = connections[queryset.db]
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass',
+                [connection.ops.quote_name(queryset.model._meta.db_table)],
+            )
+            row = cursor.fetchone()
+        # -1 means the table has never been analyzed.
+        return row[0] if row and row[0] >= 0 else None
+
+    @staticmethod
+    def get_plan_estimate(queryset: QuerySet) -> Optional[int]:
+        """Get the row estimate of the query plan."""
+        sql, params = queryset.order_by().query.sql_with_params()
+        with connections[queryset.db].cursor() as cursor:
+            cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+            plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]['Plan']['Plan Rows'])
+
+    def count(self, queryset: QuerySet, request: Request) -> CountResult:
+        if connections[queryset.db].vendor != 'postgresql' or not self.is_unfiltered(request):
+            return self.fallback.count(queryset, request)
+
+        if queryset.query.where:
+            estimate = self.get_plan_estimate(queryset)
+        else:
+            estimate = self.get_table_estimate(queryset)
+
+        if estimate is None or estimate < self.threshold:
+            return self.fallback.count(queryset, request)
+        return CountResult(estimate, exact=False)
+
+
+class CachedCount(CountStrategy):
+    """
+    Count cached per normalized query.
+
+    The key is the SQL of the unordered queryset, so it covers every filter,
+    search term and scoping applied by the view, plus the generation of the
+    model: a write invalidates all cached counts of the model. Hits on
+    untracked models are reported as approximate.
+
+    Attributes:
+        * `fallback` (CountStrategy)
+        * `timeout` (int): TTL in seconds
+        * `cache_alias` (str)
+    """
+
+    key_prefix = 'count'
+
+    def __init__(
+            self,
+            fallback: Optional[CountStrategy] = None,
+            timeout: int = 300,
+            cache_alias: str = 'default',
+    ) -> None:
+        self.fallback = fallback or ExactCount()
+        self.timeout = timeout
+        self.cache_alias = cache_alias
+
+    def get_cache_key(self, queryset: QuerySet, generation: Optional[int] = None) -> str:
+        """Build the cache key of a queryset."""
+        sql, params = queryset.order_by().query.sql_with_params()
+        digest = hashlib.md5(f'{sql}|{params!r}'.encode()).hexdigest()
+        model = queryset.model
+        if generation is None:
+            generation = get_generation(model)
+        return f'{self.key_prefix}:{model._meta.label}:{generation}:{digest}'
+
+    def count(self, queryset: QuerySet, request: Request) -> CountResult:
+        cache = caches[self.cache_alias]
+        key = self.get_cache_key(queryset)
+        cached = cache.get(key)
+        if cached is not None:
+            value, exact = cached
+            return CountResult(value, exact=exact and is_tracked(queryset.model))
+
+        result = self.fallback.count(queryset, request)
+        cache.set(key, tuple(result), self.timeout)
+        return result
+
+    async def acount(self, queryset: QuerySet, request: Request) -> CountResult:
+        cache = caches[self.cache_alias]
+        key = self.get_cache_key(queryset, await aget_generation(queryset.model))
+        cached = await cache.aget(key)
+        if cached is not None:
+            value, exact = cached
+            return CountResult(value, exact=exact and is_tracked(queryset.model))
+
+        result = await self.fallback.acount(queryset, request)
+        await cache.aset(key, tuple(result), self.timeout)
+        return result
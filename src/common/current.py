@@ -0,0 +1,51 @@
+"""
+Current request and user of the running request.
+
+Values live in context variables, so they follow the request through
+`sync_to_async`/`async_to_sync` hops and concurrent requests served by one
+event loop never see each other's user. `CurrentRequestMiddleware` binds the
+request; the user is read from it lazily, after DRF has authenticated.
+"""
+import contextlib
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+from django.http import HttpRequest
+
+_request: ContextVar[Optional[HttpRequest]] = ContextVar('current_request', default=None)
+# `False` means "not impersonated": `None` is a valid impersonated user.
+_user: ContextVar = ContextVar('current_user', default=False)
+
+
+def get_current_request() -> Optional[HttpRequest]:
+    """Get the request being served, if any."""
+    return _request.get()
+
+
+def set_current_request(request: Optional[HttpRequest]):
+    """Bind the request to the current context, returning the reset token."""
+    return _request.set(request)
+
+
+def reset_current_request(token) -> None:
+    """Restore the request bound before `set_current_request`."""
+    _request.reset(token)
+
+
+def get_current_user():
+    """Get the impersonated user or the user of the current request."""
+    user = _user.get()
+    if user is not False:
+        return user
+    request = _request.get()
+    return getattr(request, 'user', None)
+
+
+@contextlib.contextmanager
+def impersonate(user=None) -> Iterator:
+    """Temporarily act as `user`, e.g. in commands and tasks."""
+    token = _user.set(user)
+    try:
+        yield user
+    finally:
+        _user.reset(token)
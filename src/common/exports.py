@@ -0,0 +1,154 @@
+"""
+Streaming exports of serialized rows.
+
+Rows are encoded as they come from the database cursor, so memory use does
+not depend on the number of exported rows. That only holds when the
+iterator matches the server: Django buffers a sync iterator entirely under
+ASGI and an async one under WSGI. Views thus stream `aiter_rows()` when
+`is_async_request()` and `iter_rows()` otherwise:
+
+    rows = (
+        exports.aiter_rows(queryset, convert, chunk_size)
+        if exports.is_async_request(request)
+        else exports.iter_rows(queryset, convert, chunk_size)
+    )
+    return exports.stream_export(rows, fields, exports.CSV, 'vacations')
+"""
+import csv
+from itertools import chain
+from typing import AsyncIterable, AsyncIterator, Callable, Iterable, Iterator, Union
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.db.models import QuerySet
+from django.http import StreamingHttpResponse
+
+from common.renderers import dumps
+
+NDJSON = 'ndjson'
+CSV = 'csv'
+
+CONTENT_TYPES = {
+    NDJSON: 'application/x-ndjson',
+    CSV: 'text/csv; charset=utf-8',
+}
+
+
+class _Echo:
+    """File-like object returning what is written to it."""
+
+    @staticmethod
+    def write(value: str) -> str:
+        return value
+
+
+def is_async_request(request) -> bool:
+    """Check whether the request is served by the ASGI handler."""
+    return isinstance(getattr(request, '_request', request), ASGIRequest)
+
+
+def iter_rows(queryset: QuerySet, convert: Callable, chunk_size: int) -> Iterator[dict]:
+    """Convert the rows of a queryset, fetched `chunk_size` at a time."""
+    return map(convert, queryset.iterator(chunk_size=chunk_size))
+
+
+async def aiter_rows(
+        queryset: QuerySet,
+        convert: Callable,
+        chunk_size: int,
+        in_thread: bool = False,
+) -> AsyncIterator[dict]:
+    """
+    `iter_rows()` with the async ORM.
+
+    With `in_thread` each chunk is converted in a thread, for converters
+    that may query the database, e.g. DRF serializers.
+    """
+    if not in_thread:
+        async for item in queryset.aiterator(chunk_size=chunk_size):
+            yield convert(item)
+        return
+
+    convert_chunk = sync_to_async(lambda items: [convert(item) for item in items])
+    chunk = []
+    async for item in queryset.aiterator(chunk_size=chunk_size):
+        chunk.append(item)
+        if len(chunk) >= chunk_size:
+            for row in await convert_chunk(chunk):
+                yield row
+            chunk = []
+    for row in await convert_chunk(chunk):
+        yield row
+
+
+def get_encoder(export_format: str, fields: list[str]) -> tuple[list[bytes], Callable[[dict], bytes]]:
+    """Get the header lines and the row encoder of an export format."""
+    if export_format != CSV:
+        return [], lambda row: dumps(row) + b'\n'
+
+    writer = csv.writer(_Echo())
+
+    def encode(row: dict) -> bytes:
+        return writer.writerow(
+            ['' if row.get(field) is None else row[field] for field in fields]
+        ).encode()
+
+    return [writer.writerow(fields).encode()], encode
+
+
+def _batched(lines: Iterable[bytes], size: int) -> Iterator[bytes]:
+    """Join encoded lines into chunks of `size` lines."""
+    batch = []
+    for line in lines:
+        batch.append(line)
+        if len(batch) >= size:
+            yield b''.join(batch)
+            batch = []
+    if batch:
+        yield b''.join(batch)
+
+
+def iter_export(
+        rows: Iterable[dict],
+        fields: list[str],
+        export_format: str,
+        batch_size: int = 100,
+) -> Iterator[bytes]:
+    """Encode rows in chunks of `batch_size` lines."""
+    header, encode = get_encoder(export_format, fields)
+    return _batched(chain(header, map(encode, rows)), batch_size)
+
+
+async def aiter_export(
+        rows: AsyncIterable[dict],
+        fields: list[str],
+        export_format: str,
+        batch_size: int = 100,
+) -> AsyncIterator[bytes]:
+    """`iter_export()` of async rows."""
+    header, encode = get_encoder(export_format, fields)
+    batch = header
+    async for row in rows:
+        batch.append(encode(row))
+        if len(batch) >= batch_size:
+            yield b''.join(batch)
+            batch = []
+    if batch:
+        yield b''.join(batch)
+
+
+def stream_export(
+        rows: Union[Iterable[dict], AsyncIterable[dict]],
+        fields: list[str],
+        export_format: str,
+        filename: str,
+) -> StreamingHttpResponse:
+    """Build the streaming attachment response of an export of sync or async rows."""
+    if hasattr(rows, '__aiter__'):
+        stream = aiter_export(rows, fields, export_format)
+    else:
+        stream = iter_export(rows, fields, export_format)
+
+    response = StreamingHttpResponse(stream, content_type=CONTENT_TYPES[export_format])
+    response['Content-Disposition'] = f'attachment; filename="{filename}.{export_format}"'
+    return response
@@ -0,0 +1,166 @@
+from typing import Optional
+
+from django.contrib.postgres.search import (
+    SearchHeadline,
+    SearchQuery,
+    SearchRank,
+    TrigramWordSimilarity,
+)
+from django.db.models import Case, F, FloatField, Q, QuerySet, Value, When
+from django.db.models.functions import Greatest
+from rest_framework.filters import BaseFilterBackend
+from rest_framework.request import Request
+
+
+class FullTextSearchFilter(BaseFilterBackend):
+    """
+    Ranked PostgreSQL full-text search over a maintained tsvector column.
+
+    Matches are ordered by `ts_rank`; `OrderingFilter` placed after this
+    backend still wins when the client passes `ordering` explicitly.
+
+    View attributes:
+        * `search_vector_field` (str): tsvector column
+        * `search_configs` (tuple[str]): text search configurations of the column
+        * `search_headline_field` (str): column used for the highlighted snippet
+
+    Attributes:
+        * `search_param` (str)
+        * `search_type` (str): `SearchQuery` parser
+        * `rank_annotation` (str)
+        * `headline_annotation` (str)
+        * `headline_options` (dict)
+    """
+
+    search_param = 'search'
+    search_type = 'websearch'
+    rank_annotation = 'search_rank'
+    headline_annotation = 'search_headline'
+    headline_options = {
+        'start_sel': '<b>',
+        'stop_sel': '</b>',
+        'max_fragments': 2,
+    }
+
+    def get_search_terms(self, request: Request) -> str:
+        """Get the raw search string."""
+        return request.query_params.get(self.search_param, '').strip()
+
+    def get_search_query(self, terms: str, configs: tuple[str]) -> Optional[SearchQuery]:
+        """Combine one query per configuration with OR."""
+        query = None
+        for config in configs:
+            part = SearchQuery(terms, config=config, search_type=self.search_type)
+            query = part if query is None else query | part
+        return query
+
+    def filter_queryset(self, request: Request, queryset: QuerySet, view) -> QuerySet:
+        """Filter by the search query and order by relevance."""
+        terms = self.get_search_terms(request)
+        if not terms:
+            return queryset
+
+        vector_field = getattr(view, 'search_vector_field', 'search_vector')
+        configs = getattr(view, 'search_configs', ('english',))
+        query = self.get_search_query(terms, configs)
+
+        queryset = queryset.filter(**{vector_field: query}).annotate(
+            **{self.rank_annotation: SearchRank(F(vector_field), query)}
+        )
+        headline_field = getattr(view, 'search_headline_field', None)
+        if headline_field:
+            queryset = queryset.annotate(**{
+                self.headline_annotation: SearchHeadline(
+                    headline_field, query, config=configs[0], **self.headline_options
+                )
+            })
+        return queryset.order_by(f'-{self.rank_annotation}', '-pk')
+
+    def get_schema_operation_parameters(self, view) -> list[dict]:
+        """Describe the search parameter for the schema."""
+        return [
+            {
+                'name': self.search_param,
+                'required': False,
+                'in': 'query',
+                'description': 'Full-text search, results are ranked by relevance.',
+                'schema': {'type': 'string'},
+            },
+        ]
+
+
+class TrigramAutocompleteFilter(BaseFilterBackend):
+    """
+    Prefix and fuzzy matching for autocomplete, ranked by trigram similarity.
+
+    Rows match when a field contains a word similar to the query (`%>`),
+    served by `gin_trgm_ops` indexes on the fields. That includes the
+    prefixes of words, whose similarity is at least 3/4 from 3 characters.
+    Fields starting with the query rank first, then by the best similarity.
+    The filter only acts on the view actions in `actions`, and keeps the
+    ordering of `OrderingFilter` placed before it when the client passes
+    `ordering` explicitly. Queries shorter than `autocomplete_min_length`
+    match nothing without touching the database.
+
+    View attributes:
+        * `autocomplete_fields` (tuple[str]): fields with trigram indexes
+        * `autocomplete_min_length` (int)
+
+    Attributes:
+        * `search_param` (str)
+        * `ordering_param` (str)
+        * `max_length` (int): longer queries are truncated
+        * `actions` (tuple[str])
+        * `rank_annotation` (str)
+    """
+
+    search_param = 'q'
+    ordering_param = 'ordering'
+    max_length = 64
+    actions = ('autocomplete',)
+    rank_annotation = 'autocomplete_rank'
+
+    def get_search_terms(self, request: Request) -> str:
+        return request.query_params.get(self.search_param, '').strip()[:self.max_length]
+
+    def filter_queryset(self, request: Request, queryset: QuerySet, view) -> QuerySet:
+        """Filter by prefix or similarity and order by rank."""
+        if getattr(view, 'action', None) not in self.actions:
+            return queryset
+
+        terms = self.get_search_terms(request)
+        if len(terms) < getattr(view, 'autocomplete_min_length', 3):
+            return queryset.none()
+
+        fields = view.autocomplete_fields
+        prefix = Q()
+        similar = Q()
+        for field in fields:
+            prefix |= Q(**{f'{field}__istartswith': terms})
+            similar |= Q(**{f'{field}__trigram_word_similar': terms})
+
+        similarities = [TrigramWordSimilarity(terms, field) for field in fields]
+        # The prefix test only ranks: `UPPER(field) LIKE` cannot use the indexes.
+        queryset = queryset.filter(similar).annotate(**{
+            self.rank_annotation: Case(
+                When(prefix, then=Value(1.0)), default=Value(0.0), output_field=FloatField()
+            ) + (Greatest(*similarities) if len(similarities) > 1 else similarities[0]),
+        })
+        if request.query_params.get(self.ordering_param):
+            return queryset
+        return queryset.order_by(f'-{self.rank_annotation}', '-pk')
+
+    def get_schema_operation_parameters(self, view) -> list[dict]:
+        """Describe the autocomplete parameter for the schema."""
+        return [
+            {
+                'name': self.search_param,
+                'required': True,
+                'in': 'query',
+                'description': (
+                    f'Prefix or approximate text, at least '
+                    f'{getattr(view, "autocomplete_min_length", 3)} characters.'
+                ),
+                'schema': {'type': 'string'},
+            },
+        ]
@@ -0,0 +1,64 @@
+"""
+Per-model generation counters.
+
+Every write to a tracked model bumps its generation once the transaction
+commits. Derived data (cached counts, cached responses) is keyed on the
+generation, so it is never served after a write even before its TTL runs out.
+Counters live in the default cache; use a shared backend when running more
+than one process.
+"""
+from functools import partial
+
+from django.core.cache import cache
+from django.db import models, transaction
+from django.db.models.signals import post_delete, post_save
+
+GENERATION_KEY = 'generation:{label}'
+
+_tracked: set[str] = set()
+
+
+def get_generation(model: type[models.Model]) -> int:
+    """Get the current generation of a model."""
+    return cache.get(GENERATION_KEY.format(label=model._meta.label), 0)
+
+
+async def aget_generation(model: type[models.Model]) -> int:
+    """Get the current generation of a model from async code."""
+    return await cache.aget(GENERATION_KEY.format(label=model._meta.label), 0)
+
+
+def _bump(label: str) -> None:
+    """Increment the counter, creating it when missing."""
+    key = GENERATION_KEY.format(label=label)
+    if cache.add(key, 1, timeout=None):
+        return
+    try:
+        cache.incr(key)
+    except ValueError:
+        # Evicted between `add` and `incr`.
+        cache.set(key, 1, timeout=None)
+
+
+def bump_generation(model: type[models.Model], using: str = None) -> None:
+    """Bump the generation of a model after the current transaction commits."""
+    transaction.on_commit(partial(_bump, model._meta.label), using=using)
+
+
+def is_tracked(model: type[models.Model]) -> bool:
+    """Check whether writes to the model bump its generation."""
+    return getattr(model, 'bumps_generation', False) or model._meta.label in _tracked
+
+
+def _on_write(sender: type[models.Model], using: str = None, **kwargs) -> None:
+    """Signal receiver bumping the generation of the sender."""
+    bump_generation(sender, using=using)
+
+
+def track_generations(*models_: type[models.Model]) -> None:
+    """Bump generations on instance saves and deletes through signals."""
+    for model in models_:
+        _tracked.add(model._meta.label)
+        uid = f'generation:{model._meta.label}'
+        post_save.connect(_on_write, sender=model, dispatch_uid=uid)
+        post_delete.connect(_on_write, sender=model, dispatch_uid=uid)
@@ -0,0 +1,314 @@
+"""
+Shared outbound HTTP clients.
+
+A client is configured per upstream in the `OUTBOUND_HTTP` setting and
+shared by the whole process, so connections are pooled and kept alive
+between requests. Every call is bounded by connect/read timeouts, retried a
+bounded number of times with full-jitter backoff and guarded by a circuit
+breaker that fails fast while the upstream is down.
+
+Retries only happen when they are safe: connection failures (the request
+never reached the upstream) for any method, read timeouts and
+`retry_statuses` for idempotent methods only.
+
+    from common.http import get_client
+
+    response = get_client('google').post(url, data=data)
+    response = await get_client('google').apost(url, data=data)
+"""
+import asyncio
+import random
+import threading
+import time
+from typing import Any, Optional
+from weakref import WeakKeyDictionary
+
+import httpx
+from django.conf import settings
+from django.core.signals import setting_changed
+
+from common.metrics import timed
+
+DEFAULTS = {
+    'base_url': '',
+    'connect_timeout': 3.0,
+    'read_timeout': 10.0,
+    'max_connections': 20,
+    'max_keepalive_connections': 10,
+    'keepalive_expiry': 30.0,
+    'retries': 2,
+    'backoff': 0.2,
+    'max_backoff': 2.0,
+    'retry_statuses': (502, 503, 504),
+    'failure_threshold': 5,
+    'reset_timeout': 30.0,
+}
+
+IDEMPOTENT_METHODS = frozenset(('GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'))
+
+
+class OutboundError(Exception):
+    """The upstream could not be reached or did not answer in time."""
+
+
+class OutboundTimeout(OutboundError):
+    """The upstream did not answer within the timeouts."""
+
+
+class CircuitOpenError(OutboundError):
+    """The circuit breaker rejects calls to a failing upstream."""
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker.
+
+    After `failure_threshold` consecutive failures the circuit opens and
+    calls fail fast for `reset_timeout` seconds. Then one trial call is let
+    through (half-open): success closes the circuit, failure opens it again.
+
+    Attributes:
+        * `failure_threshold` (int)
+        * `reset_timeout` (float): seconds
+        * `failures` (int): consecutive failures
+        * `opened_at` (float | None): monotonic time the circuit opened
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0) -> None:
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self._trial = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        """`closed`, `open` or `half-open`."""
+        if self.opened_at is None:
+            return 'closed'
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return 'half-open'
+        return 'open'
+
+    def allow(self) -> bool:
+        """Check whether a call may go through."""
+        with self._lock:
+            state = self.state
+            if state == 'closed':
+                return True
+            if state == 'half-open' and not self._trial:
+                self._trial = True
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self._trial or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+            self._trial = False
+
+    def release(self) -> None:
+        """End a call; a trial that recorded no outcome lets the next call try."""
+        with self._lock:
+            self._trial = False
+
+
+class HTTPClient:
+    """
+    Pooled HTTP client with timeouts, retries and a circuit breaker.
+
+    The sync `httpx.Client` is shared by all threads; async clients are
+    bound to an event loop, so one is kept per loop.
+
+    Attributes:
+        * `name` (str): key in `OUTBOUND_HTTP`
+        * `options` (dict): `DEFAULTS` merged with the settings
+        * `breaker` (CircuitBreaker)
+    """
+
+    def __init__(self, name: str, **options) -> None:
+        self.name = name
+        self.options = {**DEFAULTS, **options}
+        self.breaker = CircuitBreaker(
+            failure_threshold=self.options['failure_threshold'],
+            reset_timeout=self.options['reset_timeout'],
+        )
+        self._client = None
+        self._async_clients = WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    def get_client_kwargs(self) -> dict[str, Any]:
+        """Arguments shared by the sync and async `httpx` clients."""
+        options = self.options
+        return {
+            'base_url': options['base_url'],
+            'timeout': httpx.Timeout(
+                options['read_timeout'], connect=options['connect_timeout']
+            ),
+            'limits': httpx.Limits(
+                max_connections=options['max_connections'],
+                max_keepalive_connections=options['max_keepalive_connections'],
+                keepalive_expiry=options['keepalive_expiry'],
+            ),
+        }
+
+    @property
+    def client(self) -> httpx.Client:
+        """The shared sync client."""
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    self._client = httpx.Client(**self.get_client_kwargs())
+        return self._client
+
+    @property
+    def async_client(self) -> httpx.AsyncClient:
+        """The async client of the running event loop."""
+        loop = asyncio.get_running_loop()
+        client = self._async_clients.get(loop)
+        if client is None:
+            client = httpx.AsyncClient(**self.get_client_kwargs())
+            self._async_clients[loop] = client
+        return client
+
+    def get_delay(self, attempt: int) -> float:
+        """Full-jitter backoff before retry number `attempt` (from 0)."""
+        ceiling = min(self.options['max_backoff'], self.options['backoff'] * 2 ** attempt)
+        return random.uniform(0, ceiling)
+
+    def should_retry(self, method: str, attempt: int, exc: Optional[Exception] = None,
+                     response: Optional[httpx.Response] = None) -> bool:
+        """Check whether a failed attempt may be sent again."""
+        if attempt >= self.options['retries']:
+            return False
+        if isinstance(exc, (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)):
+            return True
+        if method.upper() not in IDEMPOTENT_METHODS:
+            return False
+        if exc is not None:
+            return isinstance(exc, (httpx.ReadTimeout, httpx.RemoteProtocolError))
+        return response is not None and response.status_code in self.options['retry_statuses']
+
+    def is_failure(self, response: httpx.Response) -> bool:
+        """Check whether a response counts against the circuit breaker."""
+        return response.status_code >= 500
+
+    def check_circuit(self) -> None:
+        if not self.breaker.allow():
+            raise CircuitOpenError(f'Circuit of {self.name!r} is open')
+
+    def record(self, response: httpx.Response) -> None:
+        if self.is_failure(response):
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()
+
+    @staticmethod
+    def wrap_error(exc: httpx.HTTPError) -> OutboundError:
+        """Map `httpx` transport errors to `OutboundError`."""
+        if isinstance(exc, httpx.TimeoutException):
+            return OutboundTimeout(str(exc) or type(exc).__name__)
+        return OutboundError(str(exc) or type(exc).__name__)
+
+    def request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        """Send a request, retrying and recording the outcome."""
+        with timed('http'):
+            attempt = 0
+            while True:
+                self.check_circuit()
+                try:
+                    response = self.client.request(method, url, **kwargs)
+                except httpx.TransportError as exc:
+                    self.breaker.record_failure()
+                    if not self.should_retry(method, attempt, exc=exc):
+                        raise self.wrap_error(exc) from exc
+                else:
+                    self.record(response)
+                    if not self.should_retry(method, attempt, response=response):
+                        return response
+                    response.close()
+                finally:
+                    # Other errors and cancellation must not keep the trial.
+                    self.breaker.release()
+                time.sleep(self.get_delay(attempt))
+                attempt += 1
+
+    async def arequest(self, method: str, url: str, **kwargs) -> httpx.Response:
+        """Send a request from async code, retrying and recording the outcome."""
+        with timed('http'):
+            attempt = 0
+            while True:
+                self.check_circuit()
+                try:
+                    response = await self.async_client.request(method, url, **kwargs)
+                except httpx.TransportError as exc:
+                    self.breaker.record_failure()
+                    if not self.should_retry(method, attempt, exc=exc):
+                        raise self.wrap_error(exc) from exc
+                else:
+                    self.record(response)
+                    if not self.should_retry(method, attempt, response=response):
+                        return response
+                    await response.aclose()
+                finally:
+                    # Other errors and cancellation must not keep the trial.
+                    self.breaker.release()
+                await asyncio.sleep(self.get_delay(attempt))
+                attempt += 1
+
+    def get(self, url: str, **kwargs) -> httpx.Response:
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> httpx.Response:
+        return self.request('POST', url, **kwargs)
+
+    async def aget(self, url: str, **kwargs) -> httpx.Response:
+        return await self.arequest('GET', url, **kwargs)
+
+    async def apost(self, url: str, **kwargs) -> httpx.Response:
+        return await self.arequest('POST', url, **kwargs)
+
+    def close(self) -> None:
+        """Close the sync client; async clients close with their loop."""
+        with self._lock:
+            if self._client is not None:
+                self._client.close()
+                self._client = None
+
+
+_clients: dict[str, HTTPClient] = {}
+_clients_lock = threading.Lock()
+
+
+def get_client(name: str = 'default') -> HTTPClient:
+    """Get the shared client of an `OUTBOUND_HTTP` entry."""
+    client = _clients.get(name)
+    if client is None:
+        with _clients_lock:
+            client = _clients.get(name)
+            if client is None:
+                config = getattr(settings, 'OUTBOUND_HTTP', {})
+                client = HTTPClient(name, **{**config.get('default', {}), **config.get(name, {})})
+                _clients[name] = client
+    return client
+
+
+def reset_clients(**kwargs) -> None:
+    """Drop the shared clients, e.g. when `OUTBOUND_HTTP` changes in tests."""
+    if kwargs.get('setting', 'OUTBOUND_HTTP') != 'OUTBOUND_HTTP':
+        return
+    with _clients_lock:
+        for client in _clients.values():
+            client.close()
+        _clients.clear()
+
+
+setting_changed.connect(reset_clients)
@@ -0,0 +1,184 @@
+"""
+Request logging off the request thread.
+
+`BatchQueueHandler` only puts records on a bounded queue; a writer thread
+formats them with the handler formatter and writes them in batches, one
+write and flush per batch. A full queue drops records instead of blocking
+the request, and the drops are reported by the writer.
+
+    'handlers': {
+        'requests': {
+            '()': 'common.logs.BatchQueueHandler',
+            'formatter': 'json',
+            'stream': 'ext://sys.stdout',
+        },
+    }
+
+Configure it with a `'()'` factory rather than `'class'`: from Python 3.12
+`dictConfig` builds `QueueHandler` subclasses given by class itself, asking
+for `handlers` of a listener (3.12) and passing an unbounded queue.
+
+`RequestLoggingMiddleware` (see `common.middleware`) samples the requests
+and uses `redact()` and `truncate()` on the bodies it logs.
+"""
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from logging.handlers import QueueHandler
+from queue import Empty, Full, Queue
+from typing import Iterable, Optional, TextIO
+
+REDACTED = '***'
+
+
+class BatchQueueHandler(QueueHandler):
+    """
+    Handler queueing records for a writer thread flushing them in batches.
+
+    The writer takes up to `batch_size` records, waiting at most
+    `flush_interval` seconds for a batch to fill. It starts with the first
+    record of a process, so forked workers get their own.
+
+    Attributes:
+        * `queue` (Queue): a bounded one of `queue_size` records by default
+        * `stream` (TextIO): stream written by the writer, `sys.stderr` by default
+        * `batch_size` (int)
+        * `flush_interval` (float): seconds
+        * `dropped` (int): records dropped on a full queue
+    """
+
+    def __init__(
+            self,
+            queue: Optional[Queue] = None,
+            stream: Optional[TextIO] = None,
+            queue_size: int = 10_000,
+            batch_size: int = 256,
+            flush_interval: float = 1.0,
+    ) -> None:
+        super().__init__(Queue(queue_size) if queue is None else queue)
+        self.stream = stream
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.dropped = 0
+        self._reported = 0
+        self._drops_lock = threading.Lock()
+        self._writer: Optional[threading.Thread] = None
+        self._writer_pid = None
+        self._writer_lock = threading.Lock()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """Keep the record as is, the writer formats it in the same process."""
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except Full:
+            with self._drops_lock:
+                self.dropped += 1
+
+    def emit(self, record: logging.LogRecord) -> None:
+        if self._writer_pid != os.getpid():
+            self.start()
+        super().emit(record)
+
+    def start(self) -> None:
+        """Start the writer thread of the current process."""
+        with self._writer_lock:
+            if self._writer_pid == os.getpid():
+                return
+            self._writer = threading.Thread(target=self.run, name='log-writer', daemon=True)
+            self._writer.start()
+            self._writer_pid = os.getpid()
+
+    def run(self) -> None:
+        """Write batches until `close()` queues `None`."""
+        while True:
+            batch = [self.queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+            while batch[-1] is not None and len(batch) < self.batch_size:
+                timeout = deadline - time.monotonic()
+                try:
+                    batch.append(self.queue.get(timeout=timeout) if timeout > 0 else self.queue.get_nowait())
+                except Empty:
+                    break
+            stop = batch[-1] is None
+            self.write([record for record in batch if record is not None])
+            if stop:
+                return
+
+    def write(self, records: list[logging.LogRecord]) -> None:
+        """Format records and write them at once."""
+        lines = []
+        dropped = self.dropped
+        if dropped > self._reported:
+            records = [self.make_drop_record(dropped - self._reported), *records]
+            self._reported = dropped
+        for record in records:
+            try:
+                lines.append(self.format(record))
+            except Exception:
+                self.handleError(record)
+        if not lines:
+            return
+        stream = self.stream or sys.stderr
+        try:
+            stream.write('\n'.join(lines) + '\n')
+            stream.flush()
+        except Exception:
+            if records:
+                self.handleError(records[0])
+
+    @staticmethod
+    def make_drop_record(count: int) -> logging.LogRecord:
+        return logging.LogRecord(
+            __name__, logging.WARNING, __file__, 0,
+            '%d log records dropped on a full queue', (count,), None,
+        )
+
+    def close(self) -> None:
+        """Write the queued records and stop the writer."""
+        writer = self._writer
+        if writer is not None and writer.is_alive() and self._writer_pid == os.getpid():
+            try:
+                self.queue.put(None, timeout=self.flush_interval)
+            except Full:
+                pass
+            writer.join(timeout=self.flush_interval * 5)
+        self._writer = None
+        self._writer_pid = None
+        super().close()
+
+
+def get_redaction_pattern(fields: Iterable[str]) -> re.Pattern:
+    """
+    Match the values of `fields` in JSON and urlencoded bodies.
+
+    JSON matches fill groups 1 and 2, urlencoded ones 3 and 4: the field
+    with its separator, then the value.
+    """
+    names = '|'.join(re.escape(field) for field in fields)
+    return re.compile(
+        rf'("(?:{names})"\s*:\s*)("(?:[^"\\]|\\.)*"?|[^,}}\]\s]+)'
+        rf'|((?:^|&)(?:{names})=)([^&]*)',
+        re.IGNORECASE,
+    )
+
+
+def redact(text: str, pattern: re.Pattern) -> str:
+    """Replace the values matched by a `get_redaction_pattern()` pattern."""
+    def replace(match: re.Match) -> str:
+        if match.group(1) is not None:
+            return f'{match.group(1)}"{REDACTED}"'
+        return f'{match.group(3)}{REDACTED}'
+
+    return pattern.sub(replace, text)
+
+
+def truncate(text: str, max_length: int) -> str:
+    if len(text) <= max_length:
+        return text
+    return f'{text[:max_length]}... ({len(text)} chars)'
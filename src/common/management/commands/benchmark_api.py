@@ -0,0 +1,267 @@
+import asyncio
+import json
+import platform
+import random
+import resource
+import subprocess
+import sys
+import tracemalloc
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+from urllib.parse import urlencode
+
+import django
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.handlers.asgi import ASGIHandler
+from django.core.management import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.settings import api_settings
+
+from common.benchmarks import datasets
+from common.benchmarks.asgi import run_clients
+from users.jwt.tokens import UserRefreshToken
+from vacations.models import Vacations
+
+User = get_user_model()
+
+SCENARIOS = ('list', 'search', 'retrieve', 'create', 'login', 'registration', 'me')
+SIGNUP_DOMAIN = f'signup.{datasets.EMAIL_DOMAIN}'
+CREATE_PREFIX = 'bench-create-'
+
+
+class Command(BaseCommand):
+    """
+    Benchmark the API hot paths against a seeded dataset.
+
+    The dataset (see `common.benchmarks.datasets`) is topped up to the
+    requested sizes, then each scenario is driven by concurrent clients
+    through Django's `ASGIHandler` with the project URLs and middleware.
+    Query counts and peak Python memory per request come from a serial
+    probe with the test client. Throttling and request logging are disabled
+    for the run.
+
+    Rows created by the `create` and `registration` scenarios are deleted
+    afterwards; the dataset is kept unless `--drop` is passed.
+    """
+
+    help = 'Benchmark the API hot paths with a seeded dataset.'
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument('--vacations', type=int, default=10_000, help='Vacations in the dataset.')
+        parser.add_argument('--users', type=int, default=10_000, help='Users in the dataset.')
+        parser.add_argument('--seed', type=int, default=0, help='Seed of the data and the requests.')
+        parser.add_argument(
+            '--scenarios', default=','.join(SCENARIOS),
+            help='Comma-separated scenarios.',
+        )
+        parser.add_argument(
+            '--clients', default='1,10',
+            help='Comma-separated numbers of concurrent clients.',
+        )
+        parser.add_argument('--requests', type=int, default=20, help='Requests per client.')
+        parser.add_argument('--warmup', type=int, default=5, help='Untimed requests per scenario.')
+        parser.add_argument('--probe', type=int, default=5, help='Requests of the query and memory probe.')
+        parser.add_argument('--page-size', type=int, default=20)
+        parser.add_argument(
+            '--cold-cache', action='store_true',
+            help='Run with dummy caches, so reads always reach the database.',
+        )
+        parser.add_argument('--output', help='Write the JSON results to this file instead of stdout.')
+        parser.add_argument('--drop', action='store_true', help='Delete the dataset afterwards.')
+
+    def handle(self, *args, **options) -> None:
+        try:
+            clients = [int(value) for value in options['clients'].split(',')]
+        except ValueError:
+            raise CommandError('--clients must be comma-separated integers.')
+        scenarios = options['scenarios'].split(',')
+        if not set(scenarios) <= set(SCENARIOS):
+            raise CommandError(f'--scenarios must be among {", ".join(SCENARIOS)}.')
+        if settings.DEBUG:
+            self.stderr.write('DEBUG is on: query logging and the debug toolbar skew the results.')
+
+        started_at = datetime.now(timezone.utc)
+        sizes = datasets.seed_dataset(
+            options['users'], options['vacations'], seed=options['seed'],
+            progress=lambda message: self.stderr.write(f'seeding {message}'),
+        )
+        self.rng = random.Random(options['seed'])
+        self.run_id = uuid.uuid4().hex[:8]
+        self.page_size = options['page_size']
+        self.prepare()
+
+        overrides = {
+            # Sampled request logs would go to stdout with the results.
+            'REQUEST_LOGGING': {'SAMPLE_RATE': 0.0, 'ROUTE_SAMPLE_RATES': {}, 'ERROR_SAMPLE_RATE': 0.0},
+            # The benchmark measures latency, not the rate limits.
+            'REST_FRAMEWORK': {
+                **settings.REST_FRAMEWORK,
+                'DEFAULT_THROTTLE_RATES': {
+                    scope: None for scope in api_settings.DEFAULT_THROTTLE_RATES
+                },
+            },
+        }
+        if options['cold_cache']:
+            overrides['CACHES'] = {
+                alias: {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}
+                for alias in settings.CACHES
+            }
+
+        results = {}
+        try:
+            with override_settings(**overrides):
+                app = ASGIHandler()
+                for scenario in scenarios:
+                    self.stderr.write(f'running {scenario}')
+                    make_request = getattr(self, f'make_{scenario}_request')
+                    results[scenario] = {
+                        **self.probe(make_request, options['probe']),
+                        'runs': asyncio.run(self.run(app, make_request, clients, options)),
+                    }
+        finally:
+            Vacations.objects.filter(title__startswith=CREATE_PREFIX).delete()
+            User.objects.filter(email__endswith=f'@{SIGNUP_DOMAIN}').delete()
+            if options['drop']:
+                datasets.drop_dataset()
+
+        report = {
+            'meta': self.get_meta(started_at, sizes, options),
+            'max_rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+            'scenarios': results,
+        }
+        output = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as file:
+                file.write(output + '\n')
+        else:
+            self.stdout.write(output)
+
+    def prepare(self) -> None:
+        """Pick the users and rows the requests use."""
+        employer = datasets.benchmark_users().filter(role=User.Role.EMPLOYER).first()
+        if employer is None:
+            raise CommandError('The dataset has no employer, seed more users.')
+        self.auth_headers = {
+            'Authorization': f'Bearer {UserRefreshToken.for_user(employer).access_token}',
+        }
+        self.usernames = list(datasets.benchmark_users().values_list('username', flat=True)[:1000])
+        self.vacation_ids = list(datasets.benchmark_vacations().values_list('pk', flat=True)[:10_000])
+        self.signups = 0
+
+    @staticmethod
+    def json_request(method: str, path: str, payload: dict, headers: dict = None) -> dict:
+        return {
+            'method': method,
+            'path': path,
+            'headers': {'Content-Type': 'application/json', **(headers or {})},
+            'body': json.dumps(payload).encode(),
+        }
+
+    def make_list_request(self, number: int) -> dict:
+        return {
+            'method': 'GET', 'path': '/api/v1/vacations/',
+            'query': f'page_size={self.page_size}', 'headers': self.auth_headers,
+        }
+
+    def make_search_request(self, number: int) -> dict:
+        return {
+            'method': 'GET', 'path': '/api/v1/vacations/',
+            'query': urlencode({'search': self.rng.choice(datasets.WORDS), 'page_size': self.page_size}),
+            'headers': self.auth_headers,
+        }
+
+    def make_retrieve_request(self, number: int) -> dict:
+        if not self.vacation_ids:
+            raise CommandError('The retrieve scenario needs vacations in the dataset.')
+        return {
+            'method': 'GET', 'path': f'/api/v1/vacations/{self.rng.choice(self.vacation_ids)}/',
+            'headers': self.auth_headers,
+        }
+
+    def make_create_request(self, number: int) -> dict:
+        return self.json_request('POST', '/api/v1/vacations/', {
+            'title': f'{CREATE_PREFIX}{self.run_id}',
+            'company_name': self.rng.choice(datasets.COMPANIES),
+            'description': datasets.make_text(self.rng, 40),
+            'type_vacation': Vacations.TypeChoices.FULL_TIME,
+        }, headers=self.auth_headers)
+
+    def make_login_request(self, number: int) -> dict:
+        return self.json_request('POST', '/api/v1/auth/login/', {
+            'username': self.rng.choice(self.usernames),
+            'password': datasets.PASSWORD,
+        })
+
+    def make_registration_request(self, number: int) -> dict:
+        self.signups += 1
+        return self.json_request('POST', '/api/v1/users/registration/', {
+            'email': f'{self.run_id}-{self.signups}@{SIGNUP_DOMAIN}',
+            'role': User.Role.EMPLOYEE,
+            'password': datasets.PASSWORD,
+            'confirm_password': datasets.PASSWORD,
+        })
+
+    def make_me_request(self, number: int) -> dict:
+        return {'method': 'GET', 'path': '/api/v1/users/me/', 'headers': self.auth_headers}
+
+    @staticmethod
+    def probe(make_request, count: int) -> dict:
+        """Count the queries and the peak Python memory of serial requests."""
+        client = Client()
+        queries, peaks, statuses = [], [], set()
+        for number in range(count):
+            request = make_request(number)
+            path = request['path'] + (f'?{request["query"]}' if request.get('query') else '')
+            headers = dict(request.get('headers') or {})
+            content_type = headers.pop('Content-Type', 'application/octet-stream')
+            tracemalloc.start()
+            try:
+                with CaptureQueriesContext(connection) as context:
+                    response = client.generic(
+                        request['method'], path, data=request.get('body', b''),
+                        content_type=content_type, headers=headers,
+                    )
+                peaks.append(tracemalloc.get_traced_memory()[1])
+            finally:
+                tracemalloc.stop()
+            queries.append(len(context.captured_queries))
+            statuses.add(response.status_code)
+        return {
+            'queries_per_request': round(sum(queries) / len(queries), 2) if queries else 0,
+            'peak_memory_kb': round(max(peaks, default=0) / 1024, 1),
+            'probe_statuses': sorted(statuses),
+        }
+
+    @staticmethod
+    async def run(app: ASGIHandler, make_request, clients: list[int], options: dict) -> list[dict]:
+        """Warm up, then run every client count."""
+        await run_clients(app, make_request, 1, options['warmup'])
+        return [await run_clients(app, make_request, count, options['requests']) for count in clients]
+
+    @staticmethod
+    def get_meta(started_at: datetime, sizes: dict, options: dict) -> dict:
+        try:
+            commit = subprocess.run(
+                ['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True,
+                cwd=Path(__file__).resolve().parent,
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            commit = None
+        return {
+            'started_at': started_at.isoformat(),
+            'commit': commit,
+            'python': sys.version.split()[0],
+            'django': django.get_version(),
+            'platform': platform.platform(),
+            'database': connection.vendor,
+            'dataset': sizes,
+            'seed': options['seed'],
+            'clients': options['clients'],
+            'requests_per_client': options['requests'],
+            'page_size': options['page_size'],
+            'cold_cache': options['cold_cache'],
+        }
@@ -0,0 +1,102 @@
+import asyncio
+import json
+
+from django.contrib.auth import get_user_model
+from django.core.handlers.asgi import ASGIHandler
+from django.core.management import BaseCommand, CommandError
+from django.test import override_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from common.benchmarks.asgi import run_clients
+from vacations.models import Vacations
+
+User = get_user_model()
+
+ENDPOINTS = ('list', 'retrieve')
+
+
+class Command(BaseCommand):
+    """
+    Compare the throughput of the sync and async view stacks under ASGI.
+
+    Concurrent clients call the same vacation endpoint implemented with
+    `RetrieveListViewSet` and `AsyncRetrieveListViewSet` (see
+    `common.benchmarks.urls`), in process through Django's `ASGIHandler`.
+    """
+
+    help = 'Benchmark sync vs async viewsets with concurrent ASGI clients.'
+    username = 'benchmark'
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument(
+            '--clients', default='1,10,50',
+            help='Comma-separated numbers of concurrent clients.',
+        )
+        parser.add_argument('--requests', type=int, default=20, help='Requests per client.')
+        parser.add_argument('--endpoint', choices=ENDPOINTS, default='list')
+        parser.add_argument('--page-size', type=int, default=20)
+        parser.add_argument('--warmup', type=int, default=5, help='Untimed requests per stack.')
+        parser.add_argument('--json', action='store_true', help='Print the results as JSON.')
+
+    def get_user(self):
+        """Get the active user the clients authenticate as."""
+        user = User.objects.filter(username=self.username).first()
+        if user is None:
+            user = User.objects.create_user(
+                username=self.username, email=f'{self.username}@example.com', password=None
+            )
+        return user
+
+    def handle(self, *args, **options) -> None:
+        try:
+            clients = [int(value) for value in options['clients'].split(',')]
+        except ValueError:
+            raise CommandError('--clients must be comma-separated integers.')
+
+        endpoint = options['endpoint']
+        pk = None
+        if endpoint == 'retrieve':
+            pk = Vacations.objects.values_list('pk', flat=True).first()
+            if pk is None:
+                raise CommandError('No vacations to retrieve, seed the database first.')
+
+        headers = {'Authorization': f'Bearer {AccessToken.for_user(self.get_user())}'}
+        query = f'page_size={options["page_size"]}' if endpoint == 'list' else ''
+
+        def request_factory(stack: str):
+            path = f'/{stack}/vacations/' + (f'{pk}/' if pk else '')
+            return lambda number: {
+                'method': 'GET', 'path': path, 'query': query, 'headers': headers,
+            }
+
+        with override_settings(ROOT_URLCONF='common.benchmarks.urls'):
+            app = ASGIHandler()
+            results = asyncio.run(self.run(app, request_factory, clients, options))
+
+        if options['json']:
+            self.stdout.write(json.dumps({'endpoint': endpoint, 'results': results}, indent=2))
+            return
+
+        self.stdout.write(f'endpoint: {endpoint}')
+        for stack, runs in results.items():
+            for run in runs:
+                latency = run['latency_ms']
+                self.stdout.write(
+                    f'{stack:>5} clients={run["clients"]:<4} '
+                    f'{run["throughput"]:>9.1f} req/s  '
+                    f'p50={latency["p50"]:.1f}ms p95={latency["p95"]:.1f}ms '
+                    f'p99={latency["p99"]:.1f}ms  statuses={run["statuses"]}'
+                )
+
+    @staticmethod
+    async def run(app: ASGIHandler, request_factory, clients: list[int], options: dict) -> dict:
+        """Warm up, then run every client count against both stacks."""
+        results = {}
+        for stack in ('sync', 'async'):
+            make_request = request_factory(stack)
+            await run_clients(app, make_request, 1, options['warmup'])
+            results[stack] = [
+                await run_clients(app, make_request, count, options['requests'])
+                for count in clients
+            ]
+        return results
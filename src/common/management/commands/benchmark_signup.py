@@ -0,0 +1,136 @@
+import asyncio
+import itertools
+import json
+import uuid
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.handlers.asgi import ASGIHandler
+from django.core.management import BaseCommand, CommandError
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.settings import api_settings
+
+from common.benchmarks.asgi import run_clients
+from users.serializers.api.users import RegistrationSerializer
+
+User = get_user_model()
+
+STACKS = ('sync', 'async')
+FAST_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
+UNTHROTTLED_SCOPES = ('registration', 'password_hashing')
+
+
+class Command(BaseCommand):
+    """
+    Measure signup throughput of the sync and async registration views.
+
+    Concurrent clients register new users through `CustomUserViewSet` and
+    its async counterpart (see `common.benchmarks.urls`), in process through
+    Django's `ASGIHandler`. The users created are deleted afterwards.
+    """
+
+    help = 'Benchmark signup throughput with concurrent ASGI clients.'
+    email_prefix = 'signup-benchmark-'
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument(
+            '--clients', default='1,10',
+            help='Comma-separated numbers of concurrent clients.',
+        )
+        parser.add_argument('--requests', type=int, default=10, help='Signups per client.')
+        parser.add_argument('--stacks', default=','.join(STACKS), help='Comma-separated stacks.')
+        parser.add_argument(
+            '--fast-hasher', action='store_true',
+            help='Hash with MD5 to measure the pipeline without the password hashing cost.',
+        )
+        parser.add_argument('--json', action='store_true', help='Print the results as JSON.')
+
+    def get_payload(self, email: str) -> dict:
+        return {
+            'email': email,
+            'role': User.Role.EMPLOYEE,
+            'password': 'Benchmark-pass-1',
+            'confirm_password': 'Benchmark-pass-1',
+        }
+
+    def count_queries(self) -> int:
+        """Count the queries of one signup."""
+        serializer = RegistrationSerializer(data=self.get_payload(f'{self.email_prefix}probe@example.com'))
+        with CaptureQueriesContext(connection) as context:
+            serializer.is_valid(raise_exception=True)
+            serializer.save()
+        return len(context.captured_queries)
+
+    def handle(self, *args, **options) -> None:
+        try:
+            clients = [int(value) for value in options['clients'].split(',')]
+        except ValueError:
+            raise CommandError('--clients must be comma-separated integers.')
+        stacks = options['stacks'].split(',')
+        if not set(stacks) <= set(STACKS):
+            raise CommandError(f'--stacks must be among {", ".join(STACKS)}.')
+
+        run_id = uuid.uuid4().hex[:8]
+        numbers = itertools.count()
+
+        def request_factory(stack: str):
+            path = f'/{stack}/registration/'
+            return lambda number: {
+                'method': 'POST',
+                'path': path,
+                'headers': {'Content-Type': 'application/json'},
+                'body': json.dumps(self.get_payload(
+                    f'{self.email_prefix}{run_id}-{next(numbers)}@example.com'
+                )).encode(),
+            }
+
+        overrides = {'PASSWORD_HASHERS': FAST_HASHERS} if options['fast_hasher'] else {}
+        # The benchmark measures throughput, not the signup rate limits.
+        overrides['REST_FRAMEWORK'] = {
+            **settings.REST_FRAMEWORK,
+            'DEFAULT_THROTTLE_RATES': {
+                **api_settings.DEFAULT_THROTTLE_RATES,
+                **{scope: None for scope in UNTHROTTLED_SCOPES},
+            },
+        }
+        try:
+            with override_settings(ROOT_URLCONF='common.benchmarks.urls', **overrides):
+                queries = self.count_queries()
+                app = ASGIHandler()
+                results = asyncio.run(self.run(app, request_factory, stacks, clients, options))
+        finally:
+            User.objects.filter(email__startswith=self.email_prefix).delete()
+
+        if options['json']:
+            self.stdout.write(json.dumps({
+                'queries_per_signup': queries,
+                'fast_hasher': options['fast_hasher'],
+                'results': results,
+            }, indent=2))
+            return
+
+        self.stdout.write(f'queries per signup: {queries}')
+        for stack, runs in results.items():
+            for run in runs:
+                latency = run['latency_ms']
+                self.stdout.write(
+                    f'{stack:>5} clients={run["clients"]:<4} '
+                    f'{run["throughput"]:>9.1f} signups/s  '
+                    f'p50={latency["p50"]:.1f}ms p95={latency["p95"]:.1f}ms '
+                    f'p99={latency["p99"]:.1f}ms  statuses={run["statuses"]}'
+                )
+
+    @staticmethod
+    async def run(app: ASGIHandler, request_factory, stacks: list[str], clients: list[int],
+                  options: dict) -> dict:
+        """Run every client count against each stack."""
+        results = {}
+        for stack in stacks:
+            make_request = request_factory(stack)
+            results[stack] = [
+                await run_clients(app, make_request, count, options['requests'])
+                for count in clients
+            ]
+        return results
@@ -0,0 +1,65 @@
+import os
+import time
+
+from django.core.management import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from common.benchmarks import datasets
+
+
+class Command(BaseCommand):
+    """
+    Generate a large synthetic dataset of users and vacations.
+
+    Rows come from the seeded generator of `common.benchmarks.datasets`,
+    the same dataset `benchmark_api` runs against, so a dataset loaded
+    here is reused by the benchmark. On PostgreSQL chunks of rows are
+    streamed with `COPY FROM STDIN` by parallel worker processes and the
+    table indexes are built once after the load; other databases fall back
+    to `bulk_create()` in a single process.
+    """
+
+    help = 'Load synthetic users and vacations with COPY.'
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument('--users', type=int, default=100_000, help='Users in the dataset.')
+        parser.add_argument('--vacations', type=int, default=1_000_000, help='Vacations in the dataset.')
+        parser.add_argument('--seed', type=int, default=0, help='Seed of the generated rows.')
+        parser.add_argument(
+            '--workers', type=int, default=os.cpu_count() or 1,
+            help='Processes loading chunks in parallel.',
+        )
+        parser.add_argument('--chunk-size', type=int, default=50_000, help='Rows per chunk.')
+        parser.add_argument(
+            '--keep-indexes', action='store_true',
+            help='Keep the indexes during the load, faster for small additions to a large table.',
+        )
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS, help='Database to load.')
+        parser.add_argument('--drop', action='store_true', help='Delete the generated rows instead.')
+
+    def handle(self, *args, **options) -> None:
+        using = options['database']
+        if using not in connections:
+            raise CommandError(f'Unknown database {using}.')
+        if options['drop']:
+            datasets.drop_dataset(using)
+            self.stdout.write(self.style.SUCCESS('Generated rows deleted'))
+            return
+        if options['workers'] < 1 or options['chunk_size'] < 1:
+            raise CommandError('--workers and --chunk-size must be positive.')
+
+        started = time.perf_counter()
+        try:
+            sizes = datasets.seed_dataset(
+                options['users'], options['vacations'], seed=options['seed'],
+                chunk_size=options['chunk_size'], workers=options['workers'],
+                defer_indexes=not options['keep_indexes'], using=using,
+                progress=self.stdout.write,
+            )
+        except ValueError as error:
+            raise CommandError(str(error))
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Dataset has {sizes["users"]} users and {sizes["vacations"]} vacations '
+            f'({time.perf_counter() - started:.1f}s)'
+        ))
@@ -0,0 +1,235 @@
+"""
+Per-request timings and their Prometheus histograms.
+
+`MetricsMiddleware` (see `common.middleware`) opens a `RequestTimings` for
+every request. Code then adds the time of its phase with `timed()`:
+
+    with timed('paginate'):
+        page = paginator.paginate_queryset(queryset, request, view=self)
+
+Phases are recorded by:
+    * `db`: every query, through `QueryTimer` on all database connections
+    * `auth`, `permissions`, `paginate`, `handler`: `ExtendedView`
+    * `serialize`: `FastReadConverter` and serializers built by `ExtendedView`
+    * `render`: `ORJSONRenderer`
+    * `http`: the outbound clients of `common.http`
+
+Phases may nest: queries run while paginating count in both. Admins get
+the timings back in a `Server-Timing` header, and every request feeds the
+histograms of `registry`, served in the Prometheus text format by
+`MetricsView`. The histograms are per process: with several workers each
+scrape reads the worker that answered it.
+"""
+import math
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from typing import Iterable, Iterator, Optional
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+
+class RequestTimings:
+    """Seconds spent and times entered per phase of a request."""
+
+    def __init__(self) -> None:
+        self.started = time.perf_counter()
+        self.phases: dict[str, list] = {}
+
+    def add(self, phase: str, seconds: float) -> None:
+        entry = self.phases.get(phase)
+        if entry is None:
+            self.phases[phase] = [seconds, 1]
+        else:
+            entry[0] += seconds
+            entry[1] += 1
+
+    def get(self, phase: str) -> tuple[float, int]:
+        seconds, count = self.phases.get(phase, (0.0, 0))
+        return seconds, count
+
+    @property
+    def total(self) -> float:
+        return time.perf_counter() - self.started
+
+    def get_server_timing(self) -> str:
+        """Format the phases and the total as a `Server-Timing` header value."""
+        metrics = []
+        for phase, (seconds, count) in self.phases.items():
+            description = f';desc="{count} queries"' if phase == 'db' else ''
+            metrics.append(f'{phase};dur={seconds * 1000:.2f}{description}')
+        metrics.append(f'total;dur={self.total * 1000:.2f}')
+        return ', '.join(metrics)
+
+
+_timings: ContextVar[Optional[RequestTimings]] = ContextVar('request_timings', default=None)
+
+
+def start_timings() -> Token:
+    return _timings.set(RequestTimings())
+
+
+def reset_timings(token: Token) -> None:
+    _timings.reset(token)
+
+
+def get_timings() -> Optional[RequestTimings]:
+    """Get the timings of the current request, `None` outside requests."""
+    return _timings.get()
+
+
+def record(phase: str, seconds: float) -> None:
+    """Add time to `phase` of the current request."""
+    timings = _timings.get()
+    if timings is not None:
+        timings.add(phase, seconds)
+
+
+@contextmanager
+def timed(phase: str) -> Iterator[None]:
+    """Add the time of the block to `phase` of the current request."""
+    timings = _timings.get()
+    if timings is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add(phase, time.perf_counter() - started)
+
+
+class QueryTimer:
+    """Database execute wrapper adding queries to the `db` phase."""
+
+    def __call__(self, execute, sql, params, many, context):
+        timings = _timings.get()
+        if timings is None:
+            return execute(sql, params, many, context)
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            timings.add('db', time.perf_counter() - started)
+
+
+query_timer = QueryTimer()
+
+
+def install_query_timer(sender=None, connection=None, **kwargs) -> None:
+    """`connection_created` receiver timing the queries of a new connection."""
+    if query_timer not in connection.execute_wrappers:
+        connection.execute_wrappers.append(query_timer)
+
+
+def escape_label(value: str) -> str:
+    return value.replace('\\', r'\\').replace('\n', r'\n').replace('"', r'\"')
+
+
+def format_value(value: float) -> str:
+    if value == math.inf:
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Histogram:
+    """
+    Prometheus histogram with labels.
+
+    Attributes:
+        * `name` (str)
+        * `documentation` (str)
+        * `labelnames` (tuple[str])
+        * `buckets` (tuple[float]): upper bounds, `+Inf` is added
+    """
+
+    def __init__(
+            self,
+            name: str,
+            documentation: str,
+            labelnames: tuple[str, ...] = (),
+            buckets: Iterable[float] = DURATION_BUCKETS,
+    ) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.buckets = (*sorted(buckets), math.inf)
+        self._series: dict[tuple[str, ...], list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels: str) -> None:
+        """Count an observation in the series of `labels`."""
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * len(self.buckets), 0.0, 0]
+            counts = series[0]
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[index] += 1
+                    break
+            series[1] += value
+            series[2] += 1
+
+    def collect(self) -> Iterator[str]:
+        """Yield the lines of the Prometheus text format."""
+        yield f'# HELP {self.name} {self.documentation}'
+        yield f'# TYPE {self.name} histogram'
+        with self._lock:
+            series = [(labels, list(counts), total, count) for labels, (counts, total, count) in self._series.items()]
+        for labels, counts, total, count in sorted(series):
+            pairs = [f'{name}="{escape_label(value)}"' for name, value in zip(self.labelnames, labels)]
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                bucket_labels = ','.join([*pairs, f'le="{format_value(bound)}"'])
+                yield f'{self.name}_bucket{{{bucket_labels}}} {cumulative}'
+            suffix = f'{{{",".join(pairs)}}}' if pairs else ''
+            yield f'{self.name}_sum{suffix} {format_value(total)}'
+            yield f'{self.name}_count{suffix} {count}'
+
+    def clear(self) -> None:
+        with self._lock:
+            self._series.clear()
+
+
+class MetricsRegistry:
+    """Histograms of the request timings."""
+
+    def __init__(self) -> None:
+        self.request_duration = Histogram(
+            'http_request_duration_seconds', 'Request latency.',
+            labelnames=('route', 'method', 'status'),
+        )
+        self.phase_duration = Histogram(
+            'http_request_phase_duration_seconds', 'Time spent per request phase.',
+            labelnames=('route', 'phase'),
+        )
+        self.db_queries = Histogram(
+            'http_request_db_queries', 'Database queries per request.',
+            labelnames=('route',), buckets=QUERY_COUNT_BUCKETS,
+        )
+
+    @property
+    def histograms(self) -> tuple[Histogram, ...]:
+        return self.request_duration, self.phase_duration, self.db_queries
+
+    def observe(self, timings: RequestTimings, route: str, method: str, status: int) -> None:
+        """Count a finished request."""
+        self.request_duration.observe(timings.total, route, method, f'{status // 100}xx')
+        for phase, (seconds, _) in timings.phases.items():
+            self.phase_duration.observe(seconds, route, phase)
+        self.db_queries.observe(timings.get('db')[1], route)
+
+    def render(self) -> str:
+        """Render all histograms in the Prometheus text format."""
+        return '\n'.join(line for histogram in self.histograms for line in histogram.collect()) + '\n'
+
+    def clear(self) -> None:
+        for histogram in self.histograms:
+            histogram.clear()
+
+
+registry = MetricsRegistry()
@@ -0,0 +1,292 @@
+import logging
+import random
+import time
+from typing import Any, Optional
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.http.request import RawPostDataException
+from django.urls import Resolver404, resolve
+from django.utils.functional import SimpleLazyObject, empty
+
+from common.current import reset_current_request, set_current_request
+from common.logs import REDACTED, get_redaction_pattern, redact, truncate
+from common.metrics import RequestTimings, get_timings, registry, reset_timings, start_timings
+
+REQUEST_LOGGING_DEFAULTS = {
+    'LOGGER': 'api.requests',
+    'SAMPLE_RATE': 1.0,
+    'ROUTE_SAMPLE_RATES': {},
+    'ERROR_SAMPLE_RATE': 1.0,
+    'MAX_BODY_LENGTH': 2048,
+    'LOG_HEADERS': True,
+    'REDACTED_FIELDS': (
+        'password', 'confirm_password', 'old_password', 'new_password',
+        'access', 'refresh', 'token', 'code', 'secret',
+    ),
+    'REDACTED_HEADERS': ('Authorization', 'Proxy-Authorization'),
+    'REDACTED_COOKIES': ('refresh_token', 'access_token', 'sessionid', 'csrftoken'),
+}
+
+TEXT_CONTENT_TYPES = ('application/json', 'application/x-www-form-urlencoded')
+
+
+def is_text_content_type(content_type: str) -> bool:
+    """Whether bodies of the content type are logged as text."""
+    return content_type.startswith('text/') or content_type in TEXT_CONTENT_TYPES
+
+
+def get_content_length(request) -> int:
+    """Get the declared body length, 0 when missing or malformed."""
+    try:
+        return max(int(request.META.get('CONTENT_LENGTH') or 0), 0)
+    except ValueError:
+        return 0
+
+METRICS_DEFAULTS = {
+    'SERVER_TIMING': True,
+    'SERVER_TIMING_ROLES': (),
+}
+
+
+def get_request_user(request) -> Optional[Any]:
+    """Get the user DRF authenticated, without evaluating a lazy session user."""
+    user = request.__dict__.get('user')
+    if isinstance(user, SimpleLazyObject) and user._wrapped is empty:
+        return None
+    return user
+
+
+class CurrentRequestMiddleware:
+    """
+    Bind the request to the current context (see `common.current`).
+
+    Runs natively in both sync and async chains, so ASGI requests reaching
+    async views do not pay a thread hop for it.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response) -> None:
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        token = set_current_request(request)
+        try:
+            return self.get_response(request)
+        finally:
+            reset_current_request(token)
+
+    async def __acall__(self, request):
+        token = set_current_request(request)
+        try:
+            return await self.get_response(request)
+        finally:
+            reset_current_request(token)
+
+
+class RequestLoggingMiddleware:
+    """
+    Log sampled requests with their bodies through the `api.requests` logger.
+
+    The sample rate of a request is the one of its view name or route in
+    `ROUTE_SAMPLE_RATES`, else `SAMPLE_RATE`. Requests failing with a 5xx
+    are logged at `ERROR_SAMPLE_RATE` whether sampled or not, without the
+    request body. Bodies are redacted of `REDACTED_FIELDS` and truncated;
+    `REDACTED_HEADERS` and `REDACTED_COOKIES` are masked.
+
+    Only text request bodies within `DATA_UPLOAD_MAX_MEMORY_SIZE` are read:
+    others, e.g. uploads, are left to the parsers and logged by their
+    `Content-Type` and `Content-Length` headers.
+
+    Records are only built here: formatting and writing is left to the
+    handler, `common.logs.BatchQueueHandler` in the settings.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response) -> None:
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+        config = {**REQUEST_LOGGING_DEFAULTS, **getattr(settings, 'REQUEST_LOGGING', {})}
+        self.logger = logging.getLogger(config['LOGGER'])
+        self.sample_rate = config['SAMPLE_RATE']
+        self.route_sample_rates = config['ROUTE_SAMPLE_RATES']
+        self.error_sample_rate = config['ERROR_SAMPLE_RATE']
+        self.max_body_length = config['MAX_BODY_LENGTH']
+        self.log_headers = config['LOG_HEADERS']
+        self.redaction_pattern = get_redaction_pattern(config['REDACTED_FIELDS'])
+        self.redacted_headers = {name.lower() for name in config['REDACTED_HEADERS']}
+        self.redacted_cookies = set(config['REDACTED_COOKIES'])
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        context = self.start(request)
+        response = self.get_response(request)
+        if context is not None:
+            self.finish(request, response, *context)
+        return response
+
+    async def __acall__(self, request):
+        context = self.start(request)
+        response = await self.get_response(request)
+        if context is not None:
+            self.finish(request, response, *context)
+        return response
+
+    def get_sample_rate(self, request) -> float:
+        if not self.route_sample_rates:
+            return self.sample_rate
+        try:
+            match = resolve(request.path_info)
+        except Resolver404:
+            return self.sample_rate
+        rate = self.route_sample_rates.get(match.view_name)
+        if rate is None:
+            rate = self.route_sample_rates.get(match.route, self.sample_rate)
+        return rate
+
+    def start(self, request) -> Optional[tuple[float, bool, Optional[str]]]:
+        """Sample the request, reading its body before the view consumes it."""
+        if not self.logger.isEnabledFor(logging.INFO):
+            return None
+        sampled = random.random() < self.get_sample_rate(request)
+        body = self.get_request_body(request) if sampled else None
+        return time.perf_counter(), sampled, body
+
+    def finish(self, request, response, started: float, sampled: bool, body: Optional[str]) -> None:
+        duration = time.perf_counter() - started
+        status = response.status_code
+        if not sampled and (status < 500 or random.random() >= self.error_sample_rate):
+            return
+
+        extra = {
+            'method': request.method,
+            'path': request.path,
+            'route': request.resolver_match.route if request.resolver_match else None,
+            'status': status,
+            'duration_ms': round(duration * 1000, 2),
+            'user_id': self.get_user_id(request),
+        }
+        if sampled:
+            extra['request_body'] = body
+            extra['response_body'] = self.get_response_body(response)
+            if self.log_headers:
+                extra['request_headers'] = {
+                    name: REDACTED if name.lower() in self.redacted_headers else value
+                    for name, value in request.headers.items()
+                    if name.lower() != 'cookie'
+                }
+                extra['request_cookies'] = {
+                    name: REDACTED if name in self.redacted_cookies else value
+                    for name, value in request.COOKIES.items()
+                }
+        level = logging.ERROR if status >= 500 else logging.WARNING if status >= 400 else logging.INFO
+        self.logger.log(level, '%s %s %s', request.method, request.path, status, extra=extra)
+
+    @staticmethod
+    def get_user_id(request) -> Optional[Any]:
+        user = get_request_user(request)
+        if user is None or not user.is_authenticated:
+            return None
+        return user.pk
+
+    def format_body(self, content_type: str, content: bytes) -> str:
+        if not content:
+            return ''
+        if not is_text_content_type(content_type):
+            return self.format_size(content_type, len(content))
+        text = content.decode('utf-8', errors='replace')
+        return truncate(redact(text, self.redaction_pattern), self.max_body_length)
+
+    @staticmethod
+    def format_size(content_type: str, length: int) -> str:
+        return f'({content_type or "binary"}, {length} bytes)'
+
+    def get_request_body(self, request) -> Optional[str]:
+        content_type = request.content_type
+        length = get_content_length(request)
+        if not length:
+            return ''
+        limit = settings.DATA_UPLOAD_MAX_MEMORY_SIZE
+        # Reading `request.body` of other requests would load uploads into
+        # memory and raise `RequestDataTooBig` before the view runs.
+        if not is_text_content_type(content_type) or (limit is not None and length > limit):
+            return self.format_size(content_type, length)
+        try:
+            return self.format_body(content_type, request.body)
+        except RawPostDataException:
+            return None
+
+    def get_response_body(self, response) -> str:
+        if response.streaming:
+            return '(stream)'
+        content_type = response.get('Content-Type', '').split(';')[0].strip()
+        return self.format_body(content_type, response.content)
+
+
+class MetricsMiddleware:
+    """
+    Time requests by phase (see `common.metrics`) and count them in the histograms.
+
+    Superusers and users whose role is in `SERVER_TIMING_ROLES` of the
+    `METRICS` setting get the timings in a `Server-Timing` header.
+    Requests matching no route are counted under `unmatched`.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response) -> None:
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+        config = {**METRICS_DEFAULTS, **getattr(settings, 'METRICS', {})}
+        self.server_timing = config['SERVER_TIMING']
+        self.server_timing_roles = set(config['SERVER_TIMING_ROLES'])
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        token = start_timings()
+        try:
+            response = self.get_response(request)
+            self.finish(request, response, get_timings())
+        finally:
+            reset_timings(token)
+        return response
+
+    async def __acall__(self, request):
+        token = start_timings()
+        try:
+            response = await self.get_response(request)
+            self.finish(request, response, get_timings())
+        finally:
+            reset_timings(token)
+        return response
+
+    def finish(self, request, response, timings: RequestTimings) -> None:
+        match = request.resolver_match
+        route = match.route if match else 'unmatched'
+        registry.observe(timings, route, request.method, response.status_code)
+        if self.server_timing and self.shows_server_timing(request):
+            response['Server-Timing'] = timings.get_server_timing()
+
+    def shows_server_timing(self, request) -> bool:
+        user = get_request_user(request)
+        if user is None or not user.is_authenticated:
+            return False
+        return user.is_superuser or getattr(user, 'role', None) in self.server_timing_roles
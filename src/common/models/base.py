@@ -1,11 +1,56 @@
 from django.db import models
 
+from common.generations import bump_generation
+
+
+class BaseQuerySet(models.QuerySet):
+    """
+    Base queryset. Bulk writes bump the model generation once per call.
+    """
+
+    def update(self, **kwargs) -> int:
+        rows = super().update(**kwargs)
+        bump_generation(self.model, using=self.db)
+        return rows
+
+    def delete(self) -> tuple[int, dict[str, int]]:
+        deleted = super().delete()
+        bump_generation(self.model, using=self.db)
+        return deleted
+
+    def bulk_create(self, objs, *args, **kwargs) -> list[models.Model]:
+        objs = super().bulk_create(objs, *args, **kwargs)
+        bump_generation(self.model, using=self.db)
+        return objs
+
+    def bulk_update(self, objs, fields, *args, **kwargs) -> int:
+        rows = super().bulk_update(objs, fields, *args, **kwargs)
+        bump_generation(self.model, using=self.db)
+        return rows
+
 
 class BaseModel(models.Model):
     """
     Abstract base model. Used to initialize objects in other models.
+
+    Attributes:
+        * `bumps_generation` (bool): writes bump the model generation.
     """
-    objects = models.Manager()
+    bumps_generation = True
+
+    objects = BaseQuerySet.as_manager()
 
     class Meta:
         abstract = True
+
+    def save(self, *args, **kwargs) -> None:
+        """Save the object and bump the model generation."""
+        super().save(*args, **kwargs)
+        bump_generation(type(self), using=kwargs.get('using') or self._state.db)
+
+    def delete(self, *args, **kwargs) -> tuple[int, dict[str, int]]:
+        """Delete the object and bump the model generation."""
+        using = kwargs.get('using') or self._state.db
+        deleted = super().delete(*args, **kwargs)
+        bump_generation(type(self), using=using)
+        return deleted
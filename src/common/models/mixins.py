@@ -1,17 +1,104 @@
-from crum import get_current_user
 from django.contrib.auth import get_user_model
 from django.contrib.auth.models import AnonymousUser
 from django.db import models
 from django.utils import timezone
 
-from .base import BaseModel
+from common.current import get_current_user
+
+from .base import BaseModel, BaseQuerySet
 
 User = get_user_model()
 
 
+def get_audit_user():
+    """Get the user of the current request to stamp, if authenticated."""
+    user = get_current_user()
+    if user and not user.pk:
+        return None
+    return user
+
+
+class DateQuerySet(BaseQuerySet):
+    """
+    Queryset stamping `created_at`/`updated_at` on bulk writes.
+
+    The time is taken once per call. Fields the caller sets explicitly are
+    kept.
+    """
+
+    def stamp_create(self, objs: list[models.Model]) -> None:
+        """Stamp new objects."""
+        now = timezone.now()
+        for obj in objs:
+            if obj.created_at is None:
+                obj.created_at = now
+            if obj.updated_at is None:
+                obj.updated_at = now
+
+    def stamp_update(self, objs: list[models.Model], fields: list[str]) -> list[str]:
+        """Stamp updated objects, returning the fields to write."""
+        if 'updated_at' in fields:
+            return fields
+        now = timezone.now()
+        for obj in objs:
+            obj.updated_at = now
+        return [*fields, 'updated_at']
+
+    def stamp_values(self, values: dict) -> dict:
+        """Stamp the values of `update()`."""
+        values.setdefault('updated_at', timezone.now())
+        return values
+
+    def update(self, **kwargs) -> int:
+        return super().update(**self.stamp_values(kwargs))
+
+    def bulk_create(self, objs, *args, **kwargs) -> list[models.Model]:
+        objs = list(objs)
+        self.stamp_create(objs)
+        return super().bulk_create(objs, *args, **kwargs)
+
+    def bulk_update(self, objs, fields, *args, **kwargs) -> int:
+        objs = list(objs)
+        fields = self.stamp_update(objs, list(fields))
+        return super().bulk_update(objs, fields, *args, **kwargs)
+
+
+class InfoQuerySet(DateQuerySet):
+    """
+    Queryset also stamping `created_by`/`updated_by` on bulk writes.
+
+    The current user is resolved once per call.
+    """
+
+    def stamp_create(self, objs: list[models.Model]) -> None:
+        super().stamp_create(objs)
+        user = get_audit_user()
+        for obj in objs:
+            if obj.created_by_id is None:
+                obj.created_by = user
+            if obj.updated_by_id is None:
+                obj.updated_by = user
+
+    def stamp_update(self, objs: list[models.Model], fields: list[str]) -> list[str]:
+        fields = super().stamp_update(objs, fields)
+        if 'updated_by' in fields:
+            return fields
+        user = get_audit_user()
+        for obj in objs:
+            obj.updated_by = user
+        return [*fields, 'updated_by']
+
+    def stamp_values(self, values: dict) -> dict:
+        values = super().stamp_values(values)
+        if 'updated_by' not in values and 'updated_by_id' not in values:
+            values['updated_by'] = get_audit_user()
+        return values
+
+
 class DateMixin(BaseModel):
     """
-    Abstract date and time model.
+    Abstract date and time model. Bulk writes through `objects` are stamped
+    by `DateQuerySet`.
 
     Attributes:
         * `created_at` (DateTimeField): created at
@@ -29,6 +116,8 @@ class DateMixin(BaseModel):
         blank=True,
     )
 
+    objects = DateQuerySet.as_manager()
+
     class Meta:
         abstract = True
 
@@ -43,7 +132,8 @@ class DateMixin(BaseModel):
 
 class InfoMixin(DateMixin):
     """
-    Abstract information model.
+    Abstract information model. Bulk writes through `objects` are stamped
+    by `InfoQuerySet`.
 
     Attributes:
         * `created_by` (ForeignKey): created by
@@ -65,16 +155,15 @@ class InfoMixin(DateMixin):
         null=True,
     )
 
+    objects = InfoQuerySet.as_manager()
+
     class Meta:
         abstract = True
 
     def save(self, *args, **kwargs) -> None:
         """Save creation and update information."""
 
-        user = get_current_user()
-
-        if user and not user.pk:
-            user = None
+        user = get_audit_user()
 
         if not self.pk:
             self.created_by = user
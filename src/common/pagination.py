@@ -1,26 +1,526 @@
+import datetime
+import uuid
+from decimal import Decimal
+from typing import Any, Optional
+
+from django.core import signing
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.core.paginator import EmptyPage, InvalidPage, Page, PageNotAnInteger, Paginator as DjangoPaginator
+from django.db.models import F, Q, QuerySet
+from django.http import StreamingHttpResponse
+from django.utils.functional import cached_property
+from rest_framework.exceptions import NotFound
 from rest_framework.pagination import PageNumberPagination
+from rest_framework.request import Request
 from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from common.counting import CountStrategy, ExactCount
+
+
+class CountedPage(Page):
+    """
+    Page knowing whether rows follow it.
+
+    Attributes:
+        * `has_more` (Optional[bool]): rows after the page, `None` to compare with the page count
+    """
+
+    has_more = None
+
+    def has_next(self) -> bool:
+        if self.has_more is None:
+            return super().has_next()
+        return self.has_more
+
+
+class CountedPaginator(DjangoPaginator):
+    """
+    Django paginator taking its count from a count strategy.
+
+    An inexact count is only reported: pages are bounded by fetching one
+    row past them instead, as an estimate may fall short of the real count.
+    The rows seen raise the reported count, the estimate is a lower bound.
+
+    Attributes:
+        * `count_exact` (bool): whether `count` is exact
+    """
+
+    def __init__(
+            self,
+            object_list,
+            per_page: int,
+            strategy: CountStrategy,
+            request: Request,
+            **kwargs,
+    ) -> None:
+        super().__init__(object_list, per_page, **kwargs)
+        self.strategy = strategy
+        self.request = request
+        self.count_exact = True
+
+    @cached_property
+    def count(self) -> int:
+        """Get the number of rows from the strategy."""
+        if not isinstance(self.object_list, QuerySet):
+            return len(self.object_list)
+
+        result = self.strategy.count(self.object_list, self.request)
+        self.count_exact = result.exact
+        return result.value
+
+    async def acount(self) -> int:
+        """Resolve `count` through the async variant of the strategy."""
+        if 'count' not in self.__dict__ and isinstance(self.object_list, QuerySet):
+            result = await self.strategy.acount(self.object_list, self.request)
+            self.count_exact = result.exact
+            self.__dict__['count'] = result.value
+        return self.count
+
+    def validate_number(self, number) -> int:
+        """Validate the page number, without an upper bound for inexact counts."""
+        # Resolving the count sets `count_exact`.
+        self.count
+        if self.count_exact:
+            return super().validate_number(number)
+        try:
+            if isinstance(number, float) and not number.is_integer():
+                raise ValueError
+            number = int(number)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger(self.error_messages['invalid_page'])
+        if number < 1:
+            raise EmptyPage(self.error_messages['min_page'])
+        return number
+
+    def page(self, number) -> Page:
+        """Get a page, fetching a look-ahead row when the count is inexact."""
+        number = self.validate_number(number)
+        if self.count_exact:
+            return super().page(number)
+        bottom = (number - 1) * self.per_page
+        return self.get_bounded_page(list(self.object_list[bottom:bottom + self.per_page + 1]), number)
+
+    async def apage(self, number) -> Page:
+        """Get a page with the async ORM."""
+        number = self.validate_number(number)
+        if self.count_exact:
+            page = super().page(number)
+            if isinstance(page.object_list, QuerySet):
+                page.object_list = [row async for row in page.object_list]
+            return page
+        bottom = (number - 1) * self.per_page
+        rows = [row async for row in self.object_list[bottom:bottom + self.per_page + 1]]
+        return self.get_bounded_page(rows, number)
+
+    def get_bounded_page(self, rows: list, number: int) -> CountedPage:
+        """Build the page from its rows and the look-ahead row."""
+        if not rows and number > 1:
+            raise EmptyPage(self.error_messages['no_results'])
+        page = self._get_page(rows[:self.per_page], number, self)
+        page.has_more = len(rows) > self.per_page
+        seen = (number - 1) * self.per_page + len(rows)
+        if seen > self.count:
+            self.__dict__['count'] = seen
+            self.__dict__.pop('num_pages', None)
+        return page
+
+    def _get_page(self, *args, **kwargs) -> CountedPage:
+        return CountedPage(*args, **kwargs)
 
 
 class BasePagination(PageNumberPagination):
     """
     Base pagination.
 
+    The view may set `count_strategy` to avoid an exact `COUNT(*)`. Pages
+    larger than `stream_threshold` are streamed when the negotiated renderer
+    supports it (see `ORJSONRenderer.render_stream`). Async views paginate
+    with `apaginate_queryset`.
+
     Attributes:
         * `page_size_query_param` (str)
         * `max_page_size` (int)
+        * `count_strategy` (CountStrategy): default count strategy
+        * `stream_threshold` (int): page length above which the body is streamed
     """
 
     page_size_query_param = 'page_size'
     max_page_size = 1000
+    count_strategy = ExactCount()
+    stream_threshold = 200
+
+    view = None
+
+    def django_paginator_class(self, object_list, per_page: int) -> CountedPaginator:
+        """Build the paginator with the count strategy of the view."""
+        strategy = getattr(self.view, 'count_strategy', None) or self.count_strategy
+        return CountedPaginator(object_list, per_page, strategy=strategy, request=self.request)
+
+    def paginate_queryset(
+            self,
+            queryset: QuerySet,
+            request: Request,
+            view=None,
+    ) -> Optional[list]:
+        """Paginate a queryset by page number."""
+        self.view = view
+        return super().paginate_queryset(queryset, request, view=view)
+
+    async def apaginate_queryset(
+            self,
+            queryset: QuerySet,
+            request: Request,
+            view=None,
+    ) -> Optional[list]:
+        """Paginate a queryset by page number with the async ORM."""
+        self.view = view
+        self.request = request
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+
+        paginator = self.django_paginator_class(queryset, page_size)
+        await paginator.acount()
+        page_number = self.get_page_number(request, paginator)
+        try:
+            self.page = await paginator.apage(page_number)
+        except InvalidPage as exc:
+            msg = self.invalid_page_message.format(
+                page_number=page_number, message=str(exc)
+            )
+            raise NotFound(msg)
+
+        if paginator.num_pages > 1 and self.template is not None:
+            self.display_page_controls = True
+        return list(self.page)
+
+    def build_response(self, payload: dict, data):
+        """Wrap the page, streaming it when it is large."""
+        renderer = getattr(self.request, 'accepted_renderer', None)
+        if len(data) <= self.stream_threshold or not hasattr(renderer, 'render_stream'):
+            return Response(payload)
+
+        stream = renderer.render_stream(
+            payload,
+            self.request.accepted_media_type,
+            {'view': self.view, 'request': self.request},
+        )
+        return StreamingHttpResponse(stream, content_type=renderer.media_type)
 
     def get_paginated_response(self, data) -> Response:
         """Get paginated response."""
 
-        return Response({
+        return self.build_response({
             'next': self.get_next_link(),
             'previous': self.get_previous_link(),
             'count': self.page.paginator.count,
+            'count_exact': self.page.paginator.count_exact,
             'pages': self.page.paginator.num_pages,
             'results': data
-        })
+        }, data)
+
+    def get_paginated_response_schema(self, schema: dict) -> dict:
+        """Describe the page with the count accuracy flag."""
+        response_schema = super().get_paginated_response_schema(schema)
+        response_schema['properties']['count_exact'] = {
+            'type': 'boolean',
+            'example': True,
+        }
+        response_schema['properties']['pages'] = {
+            'type': 'integer',
+            'example': 1,
+        }
+        return response_schema
+
+
+class KeysetPagination(BasePagination):
+    """
+    Keyset (cursor) pagination without a total count.
+
+    A page is addressed by an opaque signed cursor holding the ordering
+    values of its boundary row, so deep pages cost the same as the first one.
+    The queryset ordering (e.g. applied by `OrderingFilter`) is the key,
+    `ordering` is the fallback, and the primary key is always appended as a
+    tie-breaker. NULL sorts as the largest value, like in PostgreSQL.
+
+    Requests with `page` and without `cursor` fall back to the page-number
+    response of `BasePagination`, in the same order.
+
+    Attributes:
+        * `cursor_query_param` (str)
+        * `ordering` (tuple[str]): fallback ordering
+        * `cursor_salt` (str)
+    """
+
+    cursor_query_param = 'cursor'
+    cursor_query_description = 'The pagination cursor value.'
+    ordering = ('-created_at',)
+    cursor_salt = 'common.pagination.KeysetPagination'
+    invalid_cursor_message = 'Invalid cursor'
+
+    keyset = False
+    request = None
+    model = None
+    keys = None
+    rows = None
+    has_next = False
+    has_previous = False
+
+    def paginate_queryset(
+            self,
+            queryset: QuerySet,
+            request: Request,
+            view=None,
+    ) -> Optional[list]:
+        """Paginate by cursor, or by page number when `page` is passed."""
+        self.keyset = self.is_keyset(request)
+        if not self.keyset:
+            return super().paginate_queryset(self.order_by_keys(queryset), request, view=view)
+
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+
+        queryset, values, reverse = self.get_page_queryset(queryset, request, view)
+        rows = list(queryset[:page_size + 1])
+        return self.set_rows(rows, page_size, values, reverse)
+
+    async def apaginate_queryset(
+            self,
+            queryset: QuerySet,
+            request: Request,
+            view=None,
+    ) -> Optional[list]:
+        """Paginate by cursor with the async ORM."""
+        self.keyset = self.is_keyset(request)
+        if not self.keyset:
+            return await super().apaginate_queryset(self.order_by_keys(queryset), request, view=view)
+
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+
+        queryset, values, reverse = self.get_page_queryset(queryset, request, view)
+        rows = [row async for row in queryset[:page_size + 1]]
+        return self.set_rows(rows, page_size, values, reverse)
+
+    def is_keyset(self, request: Request) -> bool:
+        """Check whether the request pages by cursor."""
+        return (
+                self.cursor_query_param in request.query_params
+                or self.page_query_param not in request.query_params
+        )
+
+    def order_by_keys(self, queryset: QuerySet) -> QuerySet:
+        """Give page-number pages the ordering of cursor pages."""
+        self.model = queryset.model
+        self.keys = self.get_keys(queryset)
+        return queryset.order_by(*self.get_order_by(reverse=False))
+
+    def get_page_queryset(
+            self,
+            queryset: QuerySet,
+            request: Request,
+            view=None,
+    ) -> tuple[QuerySet, Optional[list], bool]:
+        """Order and bound the queryset after the cursor of the request."""
+        self.request = request
+        self.view = view
+        self.model = queryset.model
+        self.keys = self.get_keys(queryset)
+        values, reverse = self.decode_cursor(request)
+
+        queryset = queryset.order_by(*self.get_order_by(reverse))
+        if values is not None:
+            queryset = queryset.filter(self.get_boundary_filter(values, reverse))
+        return self.select_keys(queryset), values, reverse
+
+    def set_rows(self, rows: list, page_size: int, values: Optional[list], reverse: bool) -> list:
+        """Trim the look-ahead row and set the page links state."""
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+        if reverse:
+            rows.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, values is not None
+
+        self.rows = rows
+        return rows
+
+    def get_paginated_response(self, data) -> Response:
+        """Get paginated response."""
+        if not self.keyset:
+            return super().get_paginated_response(data)
+
+        return self.build_response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        }, data)
+
+    def get_next_link(self) -> Optional[str]:
+        """Get the link to the next page."""
+        if not self.keyset:
+            return super().get_next_link()
+        if not (self.has_next and self.rows):
+            return None
+        return self.encode_link(self.rows[-1], reverse=False)
+
+    def get_previous_link(self) -> Optional[str]:
+        """Get the link to the previous page."""
+        if not self.keyset:
+            return super().get_previous_link()
+        if not (self.has_previous and self.rows):
+            return None
+        return self.encode_link(self.rows[0], reverse=True)
+
+    def get_keys(self, queryset: QuerySet) -> list[tuple[str, bool]]:
+        """Resolve the ordering into `(name, descending)` keys."""
+        ordering = queryset.query.order_by
+        if not ordering or not all(
+                isinstance(item, str) and '__' not in item for item in ordering
+        ):
+            ordering = self.ordering
+
+        pk_name = self.model._meta.pk.name
+        keys = []
+        for item in ordering:
+            name = item.lstrip('-')
+            field = self._get_field(self.model, pk_name if name == 'pk' else name)
+            if field is not None:
+                name = field.attname
+            keys.append((name, item.startswith('-')))
+
+        if pk_name not in (name for name, _ in keys):
+            keys.append((pk_name, keys[-1][1] if keys else True))
+        return keys
+
+    def get_order_by(self, reverse: bool) -> list:
+        """Get the order expressions, flipped for backward pages."""
+        return [
+            F(name).desc() if descending != reverse else F(name).asc()
+            for name, descending in self.keys
+        ]
+
+    def select_keys(self, queryset: QuerySet) -> QuerySet:
+        """Make sure `values()` querysets fetch the key columns."""
+        fields = getattr(queryset, '_fields', None)
+        if not fields:
+            return queryset
+        missing = [name for name, _ in self.keys if name not in fields]
+        return queryset.values(*fields, *missing) if missing else queryset
+
+    @staticmethod
+    def _following(name: str, value: Any, descending: bool, inclusive: bool) -> Optional[Q]:
+        """Rows following `value` in the ordering of `name`."""
+        if value is None:
+            # Nothing is larger than NULL, every other value is smaller.
+            if not descending:
+                return Q(**{f'{name}__isnull': True}) if inclusive else None
+            return Q() if inclusive else Q(**{f'{name}__isnull': False})
+
+        if descending:
+            return Q(**{f'{name}__{"lte" if inclusive else "lt"}': value})
+        return (
+                Q(**{f'{name}__{"gte" if inclusive else "gt"}': value})
+                | Q(**{f'{name}__isnull': True})
+        )
+
+    def get_boundary_filter(self, values: list, reverse: bool) -> Q:
+        """Build the `(k1, k2, ...) > (v1, v2, ...)` condition."""
+        condition = None
+        equal = Q()
+        for (name, descending), value in zip(self.keys, values):
+            strict = self._following(name, value, descending != reverse, inclusive=False)
+            if strict is not None:
+                term = equal & strict
+                condition = term if condition is None else condition | term
+            equal &= (
+                Q(**{f'{name}__isnull': True}) if value is None else Q(**{name: value})
+            )
+
+        if condition is None:
+            return Q(pk__in=[])
+        # Redundant range on the leading key lets the planner use its index.
+        name, descending = self.keys[0]
+        return self._following(name, values[0], descending != reverse, inclusive=True) & condition
+
+    @staticmethod
+    def _get_field(model, name: str):
+        """Get the concrete model field of a key, if any."""
+        try:
+            return model._meta.get_field(name)
+        except FieldDoesNotExist:
+            return None
+
+    @staticmethod
+    def _dump_value(value: Any) -> Any:
+        """Make a key value JSON-safe without losing precision."""
+        if isinstance(value, (datetime.date, datetime.time)):
+            return value.isoformat()
+        if isinstance(value, (Decimal, uuid.UUID)):
+            return str(value)
+        return value
+
+    def get_signature(self) -> list[str]:
+        """Get the ordering the cursor was issued for."""
+        return [f'-{name}' if descending else name for name, descending in self.keys]
+
+    def encode_link(self, row, reverse: bool) -> str:
+        """Build the page link for a boundary row."""
+        values = [
+            row[name] if isinstance(row, dict) else getattr(row, name)
+            for name, _ in self.keys
+        ]
+        cursor = signing.dumps(
+            {
+                'o': self.get_signature(),
+                'v': [self._dump_value(value) for value in values],
+                'r': reverse,
+            },
+            salt=self.cursor_salt,
+            compress=True,
+        )
+        url = self.request.build_absolute_uri()
+        url = remove_query_param(url, self.page_query_param)
+        return replace_query_param(url, self.cursor_query_param, cursor)
+
+    def decode_cursor(self, request: Request) -> tuple[Optional[list], bool]:
+        """Decode the cursor into key values and direction."""
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+
+        try:
+            payload = signing.loads(encoded, salt=self.cursor_salt)
+            if payload['o'] != self.get_signature():
+                raise ValueError('Ordering mismatch')
+            values = []
+            for (name, _), raw in zip(self.keys, payload['v'], strict=True):
+                field = self._get_field(self.model, name)
+                values.append(
+                    field.to_python(raw) if field is not None and raw is not None else raw
+                )
+            return values, bool(payload['r'])
+        except (signing.BadSignature, KeyError, TypeError, ValueError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def get_paginated_response_schema(self, schema: dict) -> dict:
+        """Describe the cursor page; the count fields only come with `page`."""
+        response_schema = super().get_paginated_response_schema(schema)
+        response_schema['required'] = ['results']
+        return response_schema
+
+    def get_schema_operation_parameters(self, view) -> list[dict]:
+        """Describe the cursor parameter next to the page-number ones."""
+        return super().get_schema_operation_parameters(view) + [
+            {
+                'name': self.cursor_query_param,
+                'required': False,
+                'in': 'query',
+                'description': self.cursor_query_description,
+                'schema': {'type': 'string'},
+            },
+        ]
@@ -0,0 +1,33 @@
+import orjson
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+
+from common.renderers import ORJSONRenderer
+
+
+class ORJSONParser(JSONParser):
+    """
+    JSON parser backed by orjson.
+
+    orjson rejects `NaN` and `Infinity` like the strict `JSONParser`; with
+    `STRICT_JSON` disabled parsing is left to `JSONParser`.
+    """
+
+    renderer_class = ORJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        """Parse the request body as JSON."""
+        if not self.strict:
+            return super().parse(stream, media_type, parser_context)
+
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+
+        try:
+            content = stream.read()
+            if encoding.lower().replace('-', '') != 'utf8':
+                content = content.decode(encoding)
+            return orjson.loads(content)
+        except (ValueError, UnicodeDecodeError) as exc:
+            raise ParseError('JSON parse error - %s' % str(exc))
@@ -0,0 +1,202 @@
+"""
+Read path for model serializers that skips model instances.
+
+`FastReadConverter` fetches rows with `values()` and builds the same dicts as
+`Serializer.to_representation`, with a plan compiled once per serializer
+class and fieldset. Serializers with fields it cannot reproduce (nested
+serializers, method fields, dotted sources, ...) get no converter and go
+through DRF as usual.
+"""
+from functools import lru_cache
+from typing import Any, Callable, Iterable, NamedTuple, Optional
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist
+from django.db import models
+from django.db.models import ExpressionWrapper, F, QuerySet
+from phonenumber_field.modelfields import PhoneNumberField
+from rest_framework import serializers
+from rest_framework.utils.serializer_helpers import ReturnDict, ReturnList
+
+from common.metrics import timed
+
+# Serializer fields returning the database value of these columns unchanged.
+PASSTHROUGH_FIELDS = {
+    serializers.CharField: ('CharField', 'TextField'),
+    serializers.EmailField: ('CharField', 'TextField'),
+    serializers.IntegerField: (
+        'AutoField', 'BigAutoField', 'SmallAutoField', 'IntegerField',
+        'BigIntegerField', 'SmallIntegerField', 'PositiveIntegerField',
+        'PositiveBigIntegerField', 'PositiveSmallIntegerField',
+    ),
+    serializers.BooleanField: ('BooleanField',),
+}
+
+RAW_ALIAS = '_raw_{name}'
+
+
+class Step(NamedTuple):
+    """Output key, `values()` key and conversion of one field."""
+    name: str
+    key: str
+    convert: Optional[Callable[[Any], Any]]
+    raw: bool = False
+
+
+class ConvertedList(ReturnList):
+    """Serializer output built by a converter."""
+
+
+class ConvertedDict(ReturnDict):
+    """Serializer output built by a converter."""
+
+
+class ConvertedData:
+    """Stands in for a serializer whose output is already built."""
+
+    def __init__(self, data) -> None:
+        self.data = data
+
+
+def raw_phone_numbers() -> bool:
+    """Check that stored phone numbers are already in the output format."""
+    return (
+            getattr(settings, 'PHONENUMBER_DB_FORMAT', 'E164') == 'E164'
+            and getattr(settings, 'PHONENUMBER_DEFAULT_FORMAT', 'E164') == 'E164'
+    )
+
+
+class FastReadConverter:
+    """
+    Compiled `values()` query and row conversion of a serializer.
+
+    Attributes:
+        * `steps` (tuple[Step]): output fields in serializer order
+        * `columns` (tuple[str]): plain `values()` names
+        * `expressions` (dict[str, Expression]): aliased `values()` columns
+    """
+
+    def __init__(self, steps: tuple[Step, ...], columns: tuple[str, ...], expressions: dict) -> None:
+        self.steps = steps
+        self.columns = columns
+        self.expressions = expressions
+
+    @classmethod
+    def for_serializer(
+            cls,
+            serializer: serializers.Serializer,
+            queryset: QuerySet,
+    ) -> Optional['FastReadConverter']:
+        """Get the converter of a serializer instance, if it is supported."""
+        if not isinstance(serializer, serializers.ModelSerializer):
+            return None
+        return cls.compile(
+            type(serializer),
+            tuple(serializer.fields),
+            frozenset(queryset.query.annotations),
+        )
+
+    @classmethod
+    @lru_cache(maxsize=256)
+    def compile(
+            cls,
+            serializer_class: type[serializers.ModelSerializer],
+            names: tuple[str, ...],
+            annotations: frozenset[str],
+    ) -> Optional['FastReadConverter']:
+        """Build the plan for a fieldset; fields come from a context-free instance."""
+        fields = serializer_class().fields
+        model = serializer_class.Meta.model
+
+        steps, columns, expressions = [], [], {}
+        for name in names:
+            field = fields[name]
+            if field.write_only:
+                continue
+            step = cls.compile_field(field, model, annotations)
+            if step is False:
+                return None
+            if step is None:
+                continue
+
+            if step.raw and raw_phone_numbers():
+                key = RAW_ALIAS.format(name=step.key)
+                expressions[key] = ExpressionWrapper(
+                    F(step.key), output_field=models.CharField()
+                )
+                step = Step(step.name, key, None, raw=False)
+            elif step.key not in columns:
+                columns.append(step.key)
+            steps.append(step)
+        return cls(tuple(steps), tuple(columns), expressions)
+
+    @staticmethod
+    def compile_field(field: serializers.Field, model: type[models.Model], annotations):
+        """
+        Get the step of a field.
+
+        Returns None for fields DRF would skip and False for unsupported ones.
+        """
+        source = field.source
+        if source == '*' or '.' in source or isinstance(field, serializers.BaseSerializer):
+            return False
+        if isinstance(field, (serializers.SerializerMethodField, serializers.HiddenField)):
+            return False
+
+        if source in annotations:
+            return Step(field.field_name, source, field.to_representation)
+
+        try:
+            model_field = model._meta.get_field(source)
+        except FieldDoesNotExist:
+            # Missing attributes of optional fields are skipped by DRF.
+            return None if not field.required and not hasattr(model, source) else False
+
+        if model_field.is_relation:
+            if (
+                    model_field.many_to_one
+                    and isinstance(field, serializers.PrimaryKeyRelatedField)
+                    and field.pk_field is None
+            ):
+                return Step(field.field_name, model_field.name, None)
+            return False
+        if not model_field.concrete:
+            return False
+
+        if isinstance(model_field, PhoneNumberField):
+            # `str()` of the parsed number is the stored string in E164.
+            return Step(field.field_name, model_field.name, field.to_representation, raw=True)
+
+        internal_types = PASSTHROUGH_FIELDS.get(type(field), ())
+        if (
+                model_field.get_internal_type() in internal_types
+                and not hasattr(model_field, 'from_db_value')
+        ):
+            return Step(field.field_name, model_field.name, None)
+        return Step(field.field_name, model_field.name, field.to_representation)
+
+    def values(self, queryset: QuerySet) -> QuerySet:
+        """Get the rows as dicts with the columns of the plan."""
+        return queryset.values(*self.columns, **self.expressions)
+
+    def convert(self, row: dict) -> dict:
+        """Build the serializer output of one row."""
+        ret = {}
+        for name, key, convert, _ in self.steps:
+            value = row[key]
+            if value is None or convert is None:
+                ret[name] = value
+            else:
+                ret[name] = convert(value)
+        return ret
+
+    def convert_rows(self, rows: Iterable[dict], serializer) -> ConvertedList:
+        """Build the serializer output of many rows."""
+        convert = self.convert
+        with timed('serialize'):
+            return ConvertedList([convert(row) for row in rows], serializer=serializer)
+
+    def convert_row(self, row: dict, serializer) -> ConvertedDict:
+        """Build the serializer output of a single row."""
+        with timed('serialize'):
+            return ConvertedDict(self.convert(row), serializer=serializer)
@@ -0,0 +1,78 @@
+from typing import Optional
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Model
+from rest_framework.request import Request
+
+
+class SparseFieldsMixin:
+    """
+    Sparse fieldsets for read requests.
+
+    `?fields=id,title` keeps only the listed fields, `?omit=description`
+    drops fields from the output. Unknown names are ignored; write requests
+    always get the full serializer.
+
+    Attributes:
+        * `fields_query_param` (str)
+        * `omit_query_param` (str)
+    """
+
+    fields_query_param = 'fields'
+    omit_query_param = 'omit'
+    sparse_methods = ('GET', 'HEAD')
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        request = self.context.get('request')
+        if request is None or request.method not in self.sparse_methods:
+            return
+
+        fields = self.parse_param(request, self.fields_query_param)
+        omit = self.parse_param(request, self.omit_query_param)
+        if fields is None and omit is None:
+            return
+
+        for name in list(self.fields):
+            if (fields is not None and name not in fields) or (omit and name in omit):
+                self.fields.pop(name)
+
+    @staticmethod
+    def parse_param(request: Request, param: str) -> Optional[set[str]]:
+        """Get the comma-separated field names of a query parameter."""
+        if param not in request.query_params:
+            return None
+        return {
+            name.strip()
+            for value in request.query_params.getlist(param)
+            for name in value.split(',')
+            if name.strip()
+        }
+
+    def get_model_fields(self, model: type[Model], annotations=()) -> Optional[list[str]]:
+        """
+        Get the model fields the output reads, for `QuerySet.only()`.
+
+        Annotation sources need no column and are skipped. Returns None when
+        a source cannot be resolved (e.g. `*` or a property), since it may
+        read any column.
+        """
+        names = []
+        for field in self.fields.values():
+            if field.write_only:
+                continue
+            if field.source == '*':
+                return None
+
+            source = field.source.split('.', 1)[0]
+            try:
+                model_field = model._meta.get_field(source)
+            except FieldDoesNotExist:
+                if source in annotations or not hasattr(model, source):
+                    continue
+                return None
+
+            # Reverse and many-to-many relations have no column of their own.
+            if model_field.concrete and not model_field.many_to_many:
+                names.append(model_field.name)
+        return names
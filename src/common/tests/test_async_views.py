@@ -0,0 +1,136 @@
+from asgiref.sync import async_to_sync, sync_to_async
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import include, path
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+from common.current import get_current_user
+from common.throttling import UserThrottle, get_bucket_backend
+from common.views.async_mixins import AsyncExtendedGenericViewSet
+from common.views.mixins import ExtendedGenericViewSet
+from users.jwt.authentication import AsyncJWTAuthentication
+from users.jwt.tokens import UserRefreshToken
+from users.models.users import User
+from vacations.models import Vacations
+from vacations.permissions.vacations import IsEmployee
+
+
+class CurrentUserThrottle(UserThrottle):
+    scope = 'current_user'
+    rate = '2/min'
+
+
+class CurrentUserConfig:
+    authentication_classes = (AsyncJWTAuthentication,)
+    permission_classes = (IsAuthenticated, IsEmployee)
+    throttle_classes = (CurrentUserThrottle,)
+    conditional_field = None
+
+
+class SyncCurrentUserViewSet(CurrentUserConfig, ExtendedGenericViewSet):
+
+    def list(self, request):
+        return Response({'user': get_current_user().username, 'thread': get_current_user().username})
+
+
+class AsyncCurrentUserViewSet(CurrentUserConfig, AsyncExtendedGenericViewSet):
+
+    async def list(self, request):
+        thread = await sync_to_async(get_current_user)()
+        return Response({'user': get_current_user().username, 'thread': thread.username})
+
+
+urlpatterns = [
+    path('', include('common.benchmarks.urls')),
+    path('sync/me/', SyncCurrentUserViewSet.as_view({'get': 'list'})),
+    path('async/me/', AsyncCurrentUserViewSet.as_view({'get': 'list'})),
+]
+
+
+@override_settings(ROOT_URLCONF=__name__)
+class AsyncViewSetTest(TestCase):
+    """Async viewsets answer like their sync counterparts."""
+
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.user = User.objects.create(username='anna', email='anna@example.com', role=User.Role.EMPLOYER)
+        cls.employee = User.objects.create(username='boris', email='boris@example.com', role=User.Role.EMPLOYEE)
+        Vacations.objects.bulk_create([
+            Vacations(title=f'Vacation {number}', company_name=f'Company {number % 2}') for number in range(5)
+        ])
+        cls.vacation = Vacations.objects.first()
+
+    def setUp(self) -> None:
+        cache.clear()
+        get_bucket_backend().clear()
+
+    def get_headers(self, user=None) -> dict:
+        token = UserRefreshToken.for_user(user or self.user).access_token
+        return {'authorization': f'Bearer {token}'}
+
+    def get(self, path: str, data=None, headers=None):
+        """Request `path` from the sync and the async view."""
+        headers = self.get_headers() if headers is None else headers
+        sync = self.client.get(f'/sync/{path}', data, headers=headers)
+        get_bucket_backend().clear()
+        response = async_to_sync(self.async_client.get)(f'/async/{path}', data, headers=headers)
+        return sync, response
+
+    def assert_same(self, path: str, data=None, headers=None, status: int = 200):
+        sync, response = self.get(path, data, headers)
+        self.assertEqual((sync.status_code, response.status_code), (status, status))
+        self.assertEqual(
+            sync.content.decode().replace('/sync/', '/async/'),
+            response.content.decode(),
+        )
+        return response
+
+    def test_list(self) -> None:
+        for data in ({}, {'ordering': 'company_name'}, {'page_size': 2}, {'page': 2, 'page_size': 2}):
+            with self.subTest(data=data):
+                self.assert_same('vacations/', data)
+
+    def test_next_page(self) -> None:
+        page = self.assert_same('vacations/', {'page_size': 2, 'ordering': 'company_name'}).json()
+        pages = 1
+        while page['next']:
+            path = page['next'].split('/async/')[1]
+            page = self.assert_same(path).json()
+            pages += 1
+        self.assertEqual(pages, 3)
+
+    def test_retrieve(self) -> None:
+        response = self.assert_same(f'vacations/{self.vacation.pk}/')
+        self.assertEqual(response.json()['title'], self.vacation.title)
+        self.assert_same('vacations/999999/', status=404)
+
+    def test_not_modified(self) -> None:
+        for path in ('vacations/', f'vacations/{self.vacation.pk}/'):
+            with self.subTest(path=path):
+                etag = self.assert_same(path)['ETag']
+                sync, response = self.get(path, headers={**self.get_headers(), 'if-none-match': etag})
+                self.assertEqual((sync.status_code, response.status_code), (304, 304))
+                self.assertEqual((sync['ETag'], response['ETag']), (etag, etag))
+
+    def test_unauthenticated(self) -> None:
+        self.assert_same('vacations/', headers={}, status=401)
+        self.assert_same('vacations/', headers={'authorization': 'Bearer invalid'}, status=401)
+
+    def test_forbidden(self) -> None:
+        self.assert_same('me/', headers=self.get_headers(self.employee), status=403)
+
+    def test_current_user(self) -> None:
+        response = self.assert_same('me/')
+        # Also inside `sync_to_async` of the async view.
+        self.assertEqual(response.json(), {'user': 'anna', 'thread': 'anna'})
+
+    def test_throttled(self) -> None:
+        headers = self.get_headers()
+        for prefix in ('/sync/', '/async/'):
+            with self.subTest(prefix=prefix):
+                get_bucket_backend().clear()
+                get = self.client.get if prefix == '/sync/' else async_to_sync(self.async_client.get)
+                statuses = [get(f'{prefix}me/', headers=headers).status_code for _ in range(3)]
+                self.assertEqual(statuses, [200, 200, 429])
+                self.assertEqual(get(f'{prefix}me/', headers=headers)['Retry-After'], '30')
@@ -0,0 +1,111 @@
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from common.current import impersonate
+from users.models.users import User
+from vacations.models import Vacations
+from vacations.views.vacations import VacationsViewSet
+
+LIST_URL = '/api/v1/vacations/'
+
+
+@override_settings(
+    ALLOWED_HOSTS=['*'],
+    CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}},
+)
+class ResponseCacheTest(TestCase):
+    """Cached list pages of vacations, keyed on the model generation."""
+
+    response_cache = VacationsViewSet.response_cache
+
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.user = User.objects.create(username='anna', email='anna@example.com', role=User.Role.EMPLOYER)
+        with impersonate(cls.user):
+            cls.vacations = Vacations.objects.bulk_create([
+                Vacations(title=f'Vacation {number}') for number in range(3)
+            ])
+
+    def setUp(self) -> None:
+        cache.clear()
+        self.client = APIClient()
+
+    def get(self, path: str = LIST_URL, **kwargs) -> str:
+        response = self.client.get(path, **kwargs)
+        self.assertEqual(response.status_code, 200)
+        return response['X-Cache']
+
+    def assert_write_invalidates(self, write) -> None:
+        self.assertEqual(self.get(), 'MISS')
+        self.assertEqual(self.get(), 'HIT')
+        with self.captureOnCommitCallbacks(execute=True), impersonate(self.user):
+            write()
+        self.assertEqual(self.get(), 'MISS')
+
+    def test_counters(self) -> None:
+        before = self.response_cache.stats()
+        self.assertEqual([self.get(), self.get(), self.get()], ['MISS', 'HIT', 'HIT'])
+        after = self.response_cache.stats()
+        self.assertEqual((after['hits'] - before['hits'], after['misses'] - before['misses']), (2, 1))
+
+    def test_hit_is_the_cached_body(self) -> None:
+        first = self.client.get(LIST_URL, {'ordering': 'created_at'})
+        second = self.client.get(LIST_URL, {'ordering': 'created_at', 'search': ''})
+        self.assertEqual(second['X-Cache'], 'HIT')
+        self.assertEqual(second.content, first.content)
+
+    def test_query_params(self) -> None:
+        self.assertEqual(self.get(LIST_URL, data={'ordering': 'created_at'}), 'MISS')
+        self.assertEqual(self.get(LIST_URL, data={'ordering': '-created_at'}), 'MISS')
+        self.assertEqual(self.get(LIST_URL, data={'ordering': 'created_at'}), 'HIT')
+
+    def test_host_and_scheme(self) -> None:
+        # Cached pages hold absolute links.
+        self.assertEqual(self.get(headers={'host': 'a.example.com'}), 'MISS')
+        self.assertEqual(self.get(headers={'host': 'b.example.com'}), 'MISS')
+        self.assertEqual(self.get(headers={'host': 'a.example.com'}, secure=True), 'MISS')
+        self.assertEqual(self.get(headers={'host': 'a.example.com'}), 'HIT')
+        self.assertEqual(self.get(headers={'host': 'a.example.com'}, secure=True), 'HIT')
+
+    def test_role_separation(self) -> None:
+        self.assertEqual(self.get(), 'MISS')
+        self.client.force_authenticate(self.user)
+        self.assertEqual(self.get(), 'MISS')
+        self.assertEqual(self.get(), 'HIT')
+        self.client.force_authenticate(User.objects.create(username='boris', role=User.Role.EMPLOYER))
+        self.assertEqual(self.get(), 'HIT')
+        self.client.force_authenticate(User.objects.create(username='eve', role=User.Role.EMPLOYEE))
+        self.assertEqual(self.get(), 'MISS')
+
+    def test_save(self) -> None:
+        vacation = self.vacations[0]
+        vacation.title = 'Edited'
+        self.assert_write_invalidates(vacation.save)
+
+    def test_delete(self) -> None:
+        self.assert_write_invalidates(self.vacations[0].delete)
+
+    def test_queryset_update(self) -> None:
+        self.assert_write_invalidates(lambda: Vacations.objects.filter(pk=self.vacations[0].pk).update(title='Edited'))
+
+    def test_queryset_delete(self) -> None:
+        self.assert_write_invalidates(lambda: Vacations.objects.filter(pk=self.vacations[0].pk).delete())
+
+    def test_bulk_create(self) -> None:
+        self.assert_write_invalidates(lambda: Vacations.objects.bulk_create([Vacations(title='New')]))
+
+    def test_bulk_update(self) -> None:
+        def write() -> None:
+            for vacation in self.vacations:
+                vacation.title = 'Edited'
+            Vacations.objects.bulk_update(self.vacations, ['title'])
+
+        self.assert_write_invalidates(write)
+
+    def test_bumped_on_commit(self) -> None:
+        self.assertEqual(self.get(), 'MISS')
+        # The transaction of the test case is never committed.
+        with self.captureOnCommitCallbacks(execute=False):
+            Vacations.objects.filter(pk=self.vacations[0].pk).update(title='Edited')
+        self.assertEqual(self.get(), 'HIT')
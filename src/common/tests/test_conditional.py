@@ -0,0 +1,106 @@
+import datetime
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+from django.utils.http import http_date
+from rest_framework.test import APIClient
+
+from common.current import impersonate
+from users.models.users import User
+from vacations.models import Vacations
+
+LIST_URL = '/api/v1/vacations/'
+
+
+class ConditionalGetTest(TestCase):
+    """Read actions answer 304 from the validators of their queryset."""
+
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.user = User.objects.create(username='anna', email='anna@example.com', role=User.Role.EMPLOYER)
+        now = timezone.now()
+        with impersonate(cls.user):
+            cls.vacations = Vacations.objects.bulk_create([
+                Vacations(title=f'Vacation {number}', updated_at=now - datetime.timedelta(days=3 - number))
+                for number in range(3)
+            ])
+
+    def setUp(self) -> None:
+        cache.clear()
+        self.client = APIClient()
+
+    def detail_url(self, vacation) -> str:
+        return f'{LIST_URL}{vacation.pk}/'
+
+    def test_list_if_none_match(self) -> None:
+        response = self.client.get(LIST_URL)
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+
+        response = self.client.get(LIST_URL, headers={'if-none-match': etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+        self.assertEqual(response.content, b'')
+
+    def test_list_has_no_last_modified(self) -> None:
+        response = self.client.get(LIST_URL)
+        self.assertNotIn('Last-Modified', response)
+
+        since = http_date(timezone.now().timestamp() + 60)
+        self.assertEqual(self.client.get(LIST_URL, headers={'if-modified-since': since}).status_code, 200)
+
+    def test_list_etag_changes_on_older_row_delete(self) -> None:
+        etag = self.client.get(LIST_URL)['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            self.vacations[0].delete()
+
+        response = self.client.get(LIST_URL, headers={'if-none-match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(len(response.json()), 2)
+
+    def test_retrieve_if_none_match(self) -> None:
+        url = self.detail_url(self.vacations[1])
+        etag = self.client.get(url)['ETag']
+        self.assertEqual(self.client.get(url, headers={'if-none-match': etag}).status_code, 304)
+
+    def test_retrieve_if_modified_since(self) -> None:
+        vacation = self.vacations[1]
+        url = self.detail_url(vacation)
+        response = self.client.get(url)
+        self.assertEqual(response['Last-Modified'], http_date(vacation.updated_at.timestamp()))
+
+        response = self.client.get(url, headers={'if-modified-since': response['Last-Modified']})
+        self.assertEqual(response.status_code, 304)
+
+        vacation.title = 'Edited'
+        with self.captureOnCommitCallbacks(execute=True):
+            vacation.save()
+        response = self.client.get(url, headers={'if-modified-since': http_date(vacation.updated_at.timestamp() - 60)})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['title'], 'Edited')
+
+    def test_not_modified_loads_no_rows(self) -> None:
+        url = self.detail_url(self.vacations[1])
+        etag = self.client.get(url)['ETag']
+        cache.clear()
+        # Only the aggregate of the validators, no row is selected.
+        with self.assertNumQueries(1) as queries:
+            self.assertEqual(self.client.get(url, headers={'if-none-match': etag}).status_code, 304)
+        self.assertIn('MAX(', queries.captured_queries[0]['sql'])
+
+        # Cached validators of the model generation answer without a query.
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(url, headers={'if-none-match': etag}).status_code, 304)
+
+    def test_retrieve_missing_row(self) -> None:
+        response = self.client.get(f'{LIST_URL}999999/', headers={'if-none-match': '*'})
+        self.assertEqual(response.status_code, 404)
+        self.assertNotIn('ETag', response)
+
+    def test_retrieve_malformed_lookup(self) -> None:
+        for lookup in ('abc', '1.5', '%20'):
+            with self.subTest(lookup=lookup):
+                response = self.client.get(f'{LIST_URL}{lookup}/', headers={'if-none-match': '*'})
+                self.assertEqual(response.status_code, 404)
@@ -0,0 +1,116 @@
+from datetime import datetime, timezone
+
+from django.test import SimpleTestCase
+from phonenumber_field.phonenumber import PhoneNumber
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from common.renderers import ORJSONRenderer
+from common.serializers.converters import FastReadConverter
+from users.models.users import User
+from users.serializers.api.users import UserListSearchSerializer, UserSerializer
+from vacations.models import Vacations
+from vacations.serializers.vacations import VacationsSerializers
+
+
+def values_row(converter: FastReadConverter, instance, annotations: frozenset) -> dict:
+    """Build the `values()` row of an instance, as the database returns it."""
+    model = type(instance)
+    row = {}
+    for key in converter.columns:
+        if key in annotations:
+            row[key] = getattr(instance, key)
+        else:
+            row[key] = model._meta.get_field(key).value_from_object(instance)
+    for key, expression in converter.expressions.items():
+        field = model._meta.get_field(expression.expression.name)
+        # Raw columns are the stored strings.
+        row[key] = field.get_prep_value(field.value_from_object(instance))
+    return row
+
+
+class FastReadParityTest(SimpleTestCase):
+    """`FastReadConverter` renders the same bytes as the DRF serializers."""
+
+    renderer = ORJSONRenderer()
+
+    def assert_parity(self, serializer, instance, annotations: frozenset = frozenset()) -> None:
+        converter = FastReadConverter.compile(type(serializer), tuple(serializer.fields), annotations)
+        self.assertIsNotNone(converter)
+        expected = self.renderer.render(serializer.to_representation(instance))
+        actual = self.renderer.render(converter.convert(values_row(converter, instance, annotations)))
+        self.assertEqual(actual, expected)
+
+    def make_vacation(self, **kwargs) -> Vacations:
+        return Vacations(**{
+            'id': 7,
+            'title': 'Старший разработчик Python',
+            'address': 'Москва, ул. Ленина, 1',
+            'company_name': 'ООО «Вектор»',
+            'phone_number': PhoneNumber.from_string('+79161234567'),
+            'description': 'Line\nbreaks, "quotes" and   separators',
+            'type_vacation': Vacations.TypeChoices.REMOTE_TIME,
+            'requirements': 'Django',
+            'responsibilities': 'Code review',
+            'created_at': datetime(2026, 1, 2, 3, 4, 5, 678901, tzinfo=timezone.utc),
+            'updated_at': datetime(2026, 2, 3, 4, 5, 6, tzinfo=timezone.utc),
+            'created_by_id': 3,
+            'updated_by_id': 4,
+            **kwargs,
+        })
+
+    def test_vacation(self) -> None:
+        self.assert_parity(VacationsSerializers(), self.make_vacation())
+
+    def test_vacation_us_phone_number(self) -> None:
+        vacation = self.make_vacation(phone_number=PhoneNumber.from_string('+12125551234'))
+        self.assert_parity(VacationsSerializers(), vacation)
+
+    def test_vacation_nulls(self) -> None:
+        vacation = self.make_vacation(
+            title=None, address=None, company_name=None, phone_number=None, description=None,
+            type_vacation=None, requirements=None, responsibilities=None, created_at=None,
+            updated_at=None, created_by_id=None, updated_by_id=None,
+        )
+        self.assert_parity(VacationsSerializers(), vacation)
+
+    def test_vacation_search_annotations(self) -> None:
+        vacation = self.make_vacation()
+        vacation.search_rank = 0.607927
+        vacation.search_headline = '<b>Python</b> разработчик'
+        self.assert_parity(
+            VacationsSerializers(), vacation,
+            annotations=frozenset(('search_rank', 'search_headline')),
+        )
+
+    def test_vacation_sparse_fieldset(self) -> None:
+        request = Request(APIRequestFactory().get('/', {'fields': 'id,phone_number,created_at'}))
+        serializer = VacationsSerializers(context={'request': request})
+        self.assertEqual(list(serializer.fields), ['id', 'phone_number', 'created_at'])
+        self.assert_parity(serializer, self.make_vacation())
+
+    def make_user(self, **kwargs) -> User:
+        return User(**{
+            'id': 11,
+            'first_name': 'Анна',
+            'last_name': 'Иванова',
+            'email': 'anna.ivanova@example.com',
+            'username': 'anna',
+            'date_joined': datetime(2025, 12, 31, 23, 59, 59, tzinfo=timezone.utc),
+            'role': User.Role.EMPLOYER,
+            **kwargs,
+        })
+
+    def test_user(self) -> None:
+        self.assert_parity(UserSerializer(), self.make_user())
+
+    def test_user_nulls(self) -> None:
+        user = self.make_user(first_name=None, last_name=None, email=None, username=None)
+        self.assert_parity(UserSerializer(), user)
+
+    def test_user_list_search(self) -> None:
+        self.assert_parity(UserListSearchSerializer(), self.make_user())
+
+    def test_user_list_search_nulls(self) -> None:
+        user = self.make_user(first_name=None, last_name=None, email=None, username=None)
+        self.assert_parity(UserListSearchSerializer(), user)
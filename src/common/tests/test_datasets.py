@@ -0,0 +1,16 @@
+from datetime import datetime, timezone
+
+from django.test import SimpleTestCase
+
+from common.benchmarks.datasets import VACATION_FIELDS, make_vacation_row
+
+
+class VacationRowTest(SimpleTestCase):
+    """Generated vacation rows are consistent in time."""
+
+    def test_updated_at_not_in_the_future(self) -> None:
+        now = datetime(2026, 1, 1, tzinfo=timezone.utc)
+        for number in range(2000):
+            row = dict(zip(VACATION_FIELDS, make_vacation_row(number, 42, 1, now)))
+            self.assertLessEqual(row['created_at'], row['updated_at'])
+            self.assertLessEqual(row['updated_at'], now)
@@ -0,0 +1,58 @@
+import asyncio
+from unittest import mock
+
+import httpx
+from django.test import SimpleTestCase
+
+from common.http import CircuitOpenError, HTTPClient, OutboundError
+
+
+class CircuitBreakerTest(SimpleTestCase):
+    """The half-open trial of `HTTPClient` calls."""
+
+    def setUp(self) -> None:
+        self.client = HTTPClient('test', retries=0, failure_threshold=1, reset_timeout=0.0)
+        self.transport = mock.Mock()
+        self.client._client = self.transport
+
+    def open_circuit(self) -> None:
+        self.transport.request.side_effect = httpx.ConnectError('refused')
+        with self.assertRaises(OutboundError):
+            self.client.get('/')
+        self.assertIsNotNone(self.client.breaker.opened_at)
+
+    def test_failed_trial_opens_again(self) -> None:
+        self.client.breaker.reset_timeout = 60.0
+        self.open_circuit()
+        with self.assertRaises(CircuitOpenError):
+            self.client.get('/')
+
+    def test_successful_trial_closes(self) -> None:
+        self.open_circuit()
+        self.transport.request.side_effect = None
+        self.transport.request.return_value = httpx.Response(200)
+        self.assertEqual(self.client.get('/').status_code, 200)
+        self.assertEqual(self.client.breaker.state, 'closed')
+
+    def test_trial_error_releases_the_trial(self) -> None:
+        self.open_circuit()
+        self.transport.request.side_effect = RuntimeError('bug')
+        with self.assertRaises(RuntimeError):
+            self.client.get('/')
+
+        self.transport.request.side_effect = None
+        self.transport.request.return_value = httpx.Response(200)
+        self.assertEqual(self.client.get('/').status_code, 200)
+
+    def test_cancelled_trial_releases_the_trial(self) -> None:
+        self.open_circuit()
+
+        async def cancelled_trial() -> None:
+            transport = mock.AsyncMock()
+            transport.request.side_effect = asyncio.CancelledError
+            self.client._async_clients[asyncio.get_running_loop()] = transport
+            with self.assertRaises(asyncio.CancelledError):
+                await self.client.aget('/')
+
+        asyncio.run(cancelled_trial())
+        self.assertTrue(self.client.breaker.allow())
@@ -0,0 +1,43 @@
+import copy
+import io
+import json
+import logging
+import logging.config
+from queue import Queue
+
+from django.conf import settings
+from django.test import SimpleTestCase
+
+from common.logs import BatchQueueHandler
+
+
+class BatchQueueHandlerTest(SimpleTestCase):
+    """`BatchQueueHandler` built by `dictConfig` from the `LOGGING` setting."""
+
+    def setUp(self) -> None:
+        self.stream = io.StringIO()
+        config = copy.deepcopy(settings.LOGGING)
+        config['handlers']['requests']['stream'] = self.stream
+        logging.config.dictConfig(config)
+        self.addCleanup(logging.config.dictConfig, settings.LOGGING)
+        self.handler = logging.getLogger('api.requests').handlers[0]
+
+    def test_configured_from_settings(self) -> None:
+        options = settings.LOGGING['handlers']['requests']
+        self.assertIsInstance(self.handler, BatchQueueHandler)
+        self.assertIs(self.handler.stream, self.stream)
+        self.assertEqual(self.handler.queue.maxsize, options['queue_size'])
+        self.assertEqual(self.handler.batch_size, options['batch_size'])
+
+    def test_writes_on_close(self) -> None:
+        logging.getLogger('api.requests').info('request', extra={'status': 200})
+        self.handler.close()
+        record = json.loads(self.stream.getvalue())
+        self.assertEqual((record['message'], record['status']), ('request', 200))
+
+    def test_queue_argument(self) -> None:
+        # What `dictConfig` passes to `QueueHandler` subclasses given by class.
+        queue = Queue()
+        handler = BatchQueueHandler(queue, stream=self.stream)
+        self.assertIs(handler.queue, queue)
+        handler.close()
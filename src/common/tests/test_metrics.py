@@ -0,0 +1,71 @@
+from django.conf import settings
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from rest_framework import mixins, serializers
+from rest_framework.test import APIRequestFactory
+
+from common.metrics import get_timings, reset_timings, start_timings
+from common.views.metrics import MetricsView
+from common.views.mixins import ExtendedGenericViewSet
+
+
+class RowSerializer(serializers.Serializer):
+    id = serializers.IntegerField()
+
+
+class RowViewSet(ExtendedGenericViewSet, mixins.ListModelMixin, mixins.CreateModelMixin):
+    serializer_class = RowSerializer
+    conditional_field = None
+    pagination_class = None
+
+    def get_queryset(self) -> list[dict]:
+        return [{'id': 1}, {'id': 2}]
+
+    def perform_create(self, serializer) -> None:
+        serializer.instance = serializer.validated_data
+
+
+class MetricsViewTest(SimpleTestCase):
+    """`/metrics` only answers scrapes carrying the configured token."""
+
+    factory = RequestFactory()
+
+    def get(self, **headers) -> int:
+        return MetricsView.as_view()(self.factory.get('/metrics', headers=headers)).status_code
+
+    @override_settings(METRICS={**settings.METRICS, 'TOKEN': ''})
+    def test_disabled_without_token(self) -> None:
+        self.assertEqual(self.get(), 404)
+        self.assertEqual(self.get(authorization='Bearer '), 404)
+
+    @override_settings(METRICS={**settings.METRICS, 'TOKEN': 'scrape-token'})
+    def test_token(self) -> None:
+        self.assertEqual(self.get(), 404)
+        self.assertEqual(self.get(authorization='Bearer another-token'), 404)
+        self.assertEqual(self.get(authorization='Bearer scrape-token'), 200)
+
+
+class RequestPhasesTest(SimpleTestCase):
+    """`ExtendedView` times the output of DRF serializers into `serialize`."""
+
+    factory = APIRequestFactory()
+
+    def call(self, request, action: str):
+        token = start_timings()
+        self.addCleanup(reset_timings, token)
+        response = RowViewSet.as_view({request.method.lower(): action})(request)
+        return response, get_timings()
+
+    def test_list(self) -> None:
+        response, timings = self.call(self.factory.get('/'), 'list')
+        self.assertEqual(response.data, [{'id': 1}, {'id': 2}])
+        self.assertEqual(timings.get('serialize')[1], 1)
+        self.assertEqual(timings.get('handler')[1], 1)
+
+    def test_create(self) -> None:
+        response, timings = self.call(self.factory.post('/', {'id': 3}, format='json'), 'create')
+        self.assertEqual((response.status_code, response.data), (201, {'id': 3}))
+        self.assertGreaterEqual(timings.get('serialize')[1], 1)
+
+    def test_serializer_outside_the_handler(self) -> None:
+        view = RowViewSet(request=None, format_kwarg=None)
+        self.assertIsInstance(view.get_serializer([], many=True), serializers.ListSerializer)
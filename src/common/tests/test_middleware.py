@@ -0,0 +1,62 @@
+import json
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from common.middleware import RequestLoggingMiddleware
+
+
+@override_settings(REQUEST_LOGGING={'SAMPLE_RATE': 1.0, 'LOG_HEADERS': False})
+class RequestLoggingMiddlewareTest(SimpleTestCase):
+    """Request bodies are only read when they are logged as text."""
+
+    factory = RequestFactory()
+
+    def view(self, request) -> HttpResponse:
+        self.body_read = hasattr(request, '_body')
+        if request.content_type == 'multipart/form-data':
+            self.files = {name: upload.size for name, upload in request.FILES.items()}
+        return HttpResponse('ok', content_type='text/plain')
+
+    def log(self, request) -> tuple[HttpResponse, dict]:
+        middleware = RequestLoggingMiddleware(self.view)
+        with self.assertLogs('api.requests') as logs:
+            response = middleware(request)
+        return response, logs.records[0].__dict__
+
+    def test_json_body_is_redacted(self) -> None:
+        body = json.dumps({'username': 'anna', 'password': 'secret'})
+        response, record = self.log(self.factory.post('/login', body, content_type='application/json'))
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(self.body_read)
+        self.assertIn('"username": "anna"', record['request_body'])
+        self.assertNotIn('secret', record['request_body'])
+
+    def test_binary_body_is_not_read(self) -> None:
+        body = b'\0' * (3 * 1024 * 1024)
+        request = self.factory.post('/upload', body, content_type='application/octet-stream')
+        response, record = self.log(request)
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(self.body_read)
+        self.assertEqual(record['request_body'], f'(application/octet-stream, {len(body)} bytes)')
+
+    def test_multipart_upload_is_left_to_the_parser(self) -> None:
+        upload = SimpleUploadedFile('cv.pdf', b'%PDF' * 1024, content_type='application/pdf')
+        response, record = self.log(self.factory.post('/upload', {'file': upload}))
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(self.body_read)
+        self.assertEqual(self.files, {'file': 4096})
+        self.assertRegex(record['request_body'], r'^\(multipart/form-data, \d+ bytes\)$')
+
+    @override_settings(DATA_UPLOAD_MAX_MEMORY_SIZE=100)
+    def test_text_body_over_upload_limit_is_not_read(self) -> None:
+        body = json.dumps({'description': 'x' * 200})
+        response, record = self.log(self.factory.post('/vacations', body, content_type='application/json'))
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(self.body_read)
+        self.assertEqual(record['request_body'], f'(application/json, {len(body)} bytes)')
+
+    def test_empty_body(self) -> None:
+        response, record = self.log(self.factory.get('/vacations'))
+        self.assertEqual(record['request_body'], '')
@@ -0,0 +1,108 @@
+import datetime
+from unittest import mock
+
+from django.contrib.auth.models import AnonymousUser
+from django.test import TestCase
+from django.utils import timezone
+
+from common.current import get_current_user, impersonate
+from users.models.users import User
+from vacations.models import Vacations
+
+
+class AuditStampTest(TestCase):
+    """`InfoQuerySet` stamps bulk writes like `InfoMixin.save()` does."""
+
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.author = User.objects.create(username='anna', email='anna@example.com', role=User.Role.EMPLOYER)
+        cls.editor = User.objects.create(username='boris', email='boris@example.com', role=User.Role.EMPLOYER)
+        cls.past = timezone.now() - datetime.timedelta(days=1)
+
+    def create(self, count: int = 3) -> list[Vacations]:
+        with impersonate(self.author):
+            Vacations.objects.bulk_create([Vacations(title=str(number)) for number in range(count)])
+        return list(Vacations.objects.order_by('pk'))
+
+    def count_user_lookups(self):
+        return mock.patch('common.models.mixins.get_current_user', side_effect=get_current_user)
+
+    def test_bulk_create(self) -> None:
+        started = timezone.now()
+        with impersonate(self.author), self.count_user_lookups() as lookups:
+            Vacations.objects.bulk_create([Vacations(title=str(number)) for number in range(3)])
+        self.assertEqual(lookups.call_count, 1)
+
+        vacations = list(Vacations.objects.all())
+        self.assertEqual(len({vacation.created_at for vacation in vacations}), 1)
+        for vacation in vacations:
+            self.assertEqual((vacation.created_by, vacation.updated_by), (self.author, self.author))
+            self.assertGreaterEqual(vacation.created_at, started)
+            self.assertEqual(vacation.updated_at, vacation.created_at)
+
+    def test_bulk_create_keeps_explicit_values(self) -> None:
+        with impersonate(self.author):
+            Vacations.objects.bulk_create([
+                Vacations(title='Imported', created_at=self.past, updated_at=self.past, created_by=self.editor),
+            ])
+        vacation = Vacations.objects.get()
+        self.assertEqual((vacation.created_at, vacation.updated_at), (self.past, self.past))
+        self.assertEqual((vacation.created_by, vacation.updated_by), (self.editor, self.author))
+
+    def test_without_user(self) -> None:
+        for user in (None, AnonymousUser()):
+            with self.subTest(user=user), impersonate(user):
+                vacation = Vacations.objects.bulk_create([Vacations(title='Anonymous')])[0]
+                self.assertIsNotNone(vacation.created_at)
+                self.assertEqual((vacation.created_by, vacation.updated_by), (None, None))
+
+    def test_bulk_update(self) -> None:
+        vacations = self.create()
+        for vacation in vacations:
+            vacation.title = 'Edited'
+        with impersonate(self.editor), self.count_user_lookups() as lookups:
+            Vacations.objects.bulk_update(vacations, ['title'])
+        self.assertEqual(lookups.call_count, 1)
+
+        updated = list(Vacations.objects.order_by('pk'))
+        self.assertEqual(len({vacation.updated_at for vacation in updated}), 1)
+        for before, after in zip(vacations, updated):
+            self.assertEqual(after.title, 'Edited')
+            self.assertEqual((after.created_by, after.updated_by), (self.author, self.editor))
+            self.assertGreater(after.updated_at, after.created_at)
+            self.assertEqual(after.updated_at, before.updated_at)
+
+    def test_bulk_update_keeps_explicit_fields(self) -> None:
+        vacations = self.create(count=1)
+        vacations[0].updated_at, vacations[0].updated_by = self.past, self.author
+        with impersonate(self.editor):
+            Vacations.objects.bulk_update(vacations, ['updated_at', 'updated_by'])
+        vacation = Vacations.objects.get()
+        self.assertEqual((vacation.updated_at, vacation.updated_by), (self.past, self.author))
+
+    def test_update(self) -> None:
+        vacation = self.create(count=1)[0]
+        with impersonate(self.editor), self.count_user_lookups() as lookups:
+            Vacations.objects.filter(pk=vacation.pk).update(title='Edited')
+        self.assertEqual(lookups.call_count, 1)
+
+        updated = Vacations.objects.get()
+        self.assertEqual((updated.title, updated.created_by, updated.updated_by), ('Edited', self.author, self.editor))
+        self.assertGreater(updated.updated_at, vacation.updated_at)
+        self.assertEqual(updated.created_at, vacation.created_at)
+
+    def test_update_keeps_explicit_values(self) -> None:
+        self.create(count=1)
+        for values in ({'updated_by': self.author}, {'updated_by_id': self.author.pk}):
+            with self.subTest(values=values), impersonate(self.editor):
+                Vacations.objects.update(updated_at=self.past, **values)
+                vacation = Vacations.objects.get()
+                self.assertEqual((vacation.updated_at, vacation.updated_by), (self.past, self.author))
+
+    def test_save(self) -> None:
+        with impersonate(self.author):
+            vacation = Vacations.objects.create(title='Saved')
+        with impersonate(self.editor):
+            vacation.save()
+        vacation.refresh_from_db()
+        self.assertEqual((vacation.created_by, vacation.updated_by), (self.author, self.editor))
@@ -0,0 +1,167 @@
+import datetime
+from urllib.parse import parse_qs, urlparse
+
+from django.core import signing
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory
+
+from common.pagination import KeysetPagination
+from vacations.models import Vacations
+
+LIST_URL = '/api/v1/vacations/'
+
+
+class KeysetPaginationTest(TestCase):
+    """Cursor pages of vacations against the same ordering in Python."""
+
+    @classmethod
+    def setUpTestData(cls) -> None:
+        now = timezone.now().replace(microsecond=0)
+        rows = [
+            (now, 'Beta'),
+            (now, None),
+            (now, 'Alpha'),
+            (now - datetime.timedelta(days=1), 'Beta'),
+            (now - datetime.timedelta(days=1), None),
+            (now - datetime.timedelta(days=2), 'Gamma'),
+            (now - datetime.timedelta(days=2), 'Alpha'),
+        ]
+        Vacations.objects.bulk_create([
+            Vacations(title=f'Vacation {number}', created_at=created_at, company_name=company_name)
+            for number, (created_at, company_name) in enumerate(rows)
+        ])
+        cls.vacations = list(Vacations.objects.all())
+
+    def setUp(self) -> None:
+        cache.clear()
+        self.client = APIClient()
+
+    def get_expected(self, ordering: str) -> list[int]:
+        """Order the rows like PostgreSQL: NULL is the largest value."""
+        keys = [(item.lstrip('-'), item.startswith('-')) for item in ordering.split(',')]
+        keys.append(('id', keys[-1][1]))
+        rows = self.vacations
+        for name, descending in reversed(keys):
+            rows = sorted(
+                rows,
+                key=lambda row: (getattr(row, name) is None, getattr(row, name) or 0),
+                reverse=descending,
+            )
+        return [row.pk for row in rows]
+
+    @staticmethod
+    def get_cursor(link: str) -> str:
+        return parse_qs(urlparse(link).query)['cursor'][0]
+
+    def get_page(self, url: str, **params) -> dict:
+        response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200, response.data)
+        return response.data
+
+    def walk(self, ordering: str, page_size: int) -> tuple[list[int], list[int]]:
+        """Follow `next` to the last page, then `previous` back to the first."""
+        page = self.get_page(LIST_URL, ordering=ordering, page_size=page_size)
+        self.assertIsNone(page['previous'])
+        forward = [row['id'] for row in page['results']]
+        while page['next'] is not None:
+            page = self.get_page(page['next'])
+            forward += [row['id'] for row in page['results']]
+
+        backward = [row['id'] for row in page['results']]
+        while page['previous'] is not None:
+            page = self.get_page(page['previous'])
+            backward = [row['id'] for row in page['results']] + backward
+        return forward, backward
+
+    def test_orderings(self) -> None:
+        orderings = (
+            '-created_at', 'created_at', 'company_name', '-company_name',
+            'company_name,-created_at', '-company_name,created_at', 'created_at,-company_name',
+        )
+        for ordering in orderings:
+            for page_size in (1, 3):
+                with self.subTest(ordering=ordering, page_size=page_size):
+                    expected = self.get_expected(ordering)
+                    forward, backward = self.walk(ordering, page_size)
+                    self.assertEqual(forward, expected)
+                    self.assertEqual(backward, expected)
+
+    def test_last_page(self) -> None:
+        page = self.get_page(LIST_URL, page_size=len(self.vacations))
+        self.assertEqual(len(page['results']), len(self.vacations))
+        self.assertEqual(set(page), {'next', 'previous', 'results'})
+        self.assertIsNone(page['next'])
+
+    def test_tampered_cursor(self) -> None:
+        cursor = self.get_cursor(self.get_page(LIST_URL, page_size=2)['next'])
+        self.assertEqual(self.client.get(LIST_URL, {'page_size': 2, 'cursor': cursor}).status_code, 200)
+        response = self.client.get(LIST_URL, {'page_size': 2, 'cursor': cursor[:-2] + 'xx'})
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response.data['detail'], KeysetPagination.invalid_cursor_message)
+
+    def test_cursor_of_another_ordering(self) -> None:
+        cursor = self.get_cursor(self.get_page(LIST_URL, page_size=2)['next'])
+        response = self.client.get(LIST_URL, {'page_size': 2, 'cursor': cursor, 'ordering': 'company_name'})
+        self.assertEqual(response.status_code, 404)
+
+    def test_cursor_with_wrong_values(self) -> None:
+        payloads = (
+            {'o': ['-created_at', '-id'], 'v': [None], 'r': False},
+            {'o': ['-created_at', '-id'], 'v': ['yesterday', 1], 'r': False},
+            {'o': ['-created_at', '-id'], 'v': [None, 1]},
+        )
+        for payload in payloads:
+            with self.subTest(payload=payload):
+                cursor = signing.dumps(payload, salt=KeysetPagination.cursor_salt, compress=True)
+                response = self.client.get(LIST_URL, {'page_size': 2, 'cursor': cursor})
+                self.assertEqual(response.status_code, 404)
+
+    def test_page_number_fallback(self) -> None:
+        for ordering in ('-created_at', 'company_name'):
+            with self.subTest(ordering=ordering):
+                page = self.get_page(LIST_URL, page=2, page_size=2, ordering=ordering)
+                self.assertEqual((page['count'], page['pages']), (len(self.vacations), 4))
+                self.assertEqual([row['id'] for row in page['results']], self.get_expected(ordering)[2:4])
+                self.assertIn('page=3', page['next'])
+                self.assertNotIn('cursor=', page['next'])
+
+    def test_cursor_takes_precedence_over_page(self) -> None:
+        cursor = self.get_cursor(self.get_page(LIST_URL, page_size=2)['next'])
+        page = self.get_page(LIST_URL, page=3, page_size=2, cursor=cursor)
+        self.assertNotIn('count', page)
+        self.assertEqual([row['id'] for row in page['results']], self.get_expected('-created_at')[2:4])
+        self.assertNotIn('page=', page['next'])
+
+    def test_values_queryset(self) -> None:
+        paginator = KeysetPagination()
+        factory = APIRequestFactory()
+        request = Request(factory.get(LIST_URL, {'page_size': 3}))
+        rows = paginator.paginate_queryset(Vacations.objects.values('title'), request)
+        self.assertEqual([row['id'] for row in rows], self.get_expected('-created_at')[:3])
+        self.assertEqual(set(rows[0]), {'title', 'created_at', 'id'})
+
+        cursor = self.get_cursor(paginator.get_next_link())
+        request = Request(factory.get(LIST_URL, {'page_size': 3, 'cursor': cursor}))
+        rows = KeysetPagination().paginate_queryset(Vacations.objects.values('title'), request)
+        self.assertEqual([row['id'] for row in rows], self.get_expected('-created_at')[3:6])
+
+    def test_following(self) -> None:
+        following = KeysetPagination._following
+
+        def names(condition) -> list:
+            return sorted(
+                Vacations.objects.filter(condition).values_list('company_name', flat=True),
+                key=lambda name: (name is None, name or ''),
+            )
+
+        # NULL is larger than any value.
+        self.assertEqual(names(following('company_name', 'Beta', False, False)), ['Gamma', None, None])
+        self.assertEqual(names(following('company_name', 'Beta', False, True)), ['Beta', 'Beta', 'Gamma', None, None])
+        self.assertEqual(names(following('company_name', 'Beta', True, False)), ['Alpha', 'Alpha'])
+        self.assertIsNone(following('company_name', None, False, False))
+        self.assertEqual(names(following('company_name', None, False, True)), [None, None])
+        self.assertEqual(len(names(following('company_name', None, True, False))), 5)
+        self.assertEqual(len(names(following('company_name', None, True, True))), 7)
@@ -0,0 +1,37 @@
+import time
+
+from django.test import SimpleTestCase
+
+from common.throttling import LocalBucketBackend
+
+
+class LocalBucketBackendTest(SimpleTestCase):
+    """Buckets in process memory, bounded by `max_entries`."""
+
+    def test_burst_then_rate(self) -> None:
+        backend = LocalBucketBackend()
+        results = [backend.consume('key', 60.0, 2)[0] for _ in range(3)]
+        self.assertEqual(results, [True, True, False])
+        allowed, wait = backend.consume('key', 60.0, 2)
+        self.assertFalse(allowed)
+        self.assertAlmostEqual(wait, 60.0, delta=1.0)
+
+    def test_full_table_evicts_the_oldest_buckets(self) -> None:
+        backend = LocalBucketBackend(max_entries=1000)
+        started = time.perf_counter()
+        for number in range(20_000):
+            self.assertTrue(backend.consume(f'account:user{number}', 60.0, 5)[0])
+        elapsed = time.perf_counter() - started
+        self.assertEqual(len(backend), 1000)
+        # A scan of the table per new key would take seconds.
+        self.assertLess(elapsed, 1.0)
+        self.assertTrue(backend.consume('account:user0', 60.0, 1)[0])
+
+    def test_flood_keeps_throttling_an_active_key(self) -> None:
+        backend = LocalBucketBackend(max_entries=100)
+        backend.consume('account:victim', 60.0, 1)
+        for number in range(1000):
+            backend.consume(f'account:user{number}', 60.0, 1)
+            if number % 50 == 0:
+                self.assertFalse(backend.consume('account:victim', 60.0, 1)[0])
+        self.assertEqual(len(backend), 100)
@@ -0,0 +1,292 @@
+"""
+Token-bucket throttling.
+
+A throttle owns a bucket per key (user, IP address, action or scope)
+holding up to `limit` tokens and refilled at `limit` per period, so bursts
+of `limit` requests pass and sustained traffic is held to the rate.
+Buckets are kept as GCRA theoretical arrival times: one number per key.
+
+Rates come from `DEFAULT_THROTTLE_RATES` by the `scope` of the throttle,
+e.g. `'login': '10/min'`. Denied requests get a 429 with `Retry-After`.
+The bucket backend is chosen by the `THROTTLING` setting:
+
+    THROTTLING = {
+        'BACKEND': 'common.throttling.RedisBucketBackend',
+        'OPTIONS': {'url': REDIS_URL},
+    }
+
+Views pick throttles per action with `multi_throttle_classes` of
+`ExtendedView`, which checks them in order and stops at the first denial
+(`OrderedThrottlesMixin`): list shared budgets after per-client throttles.
+"""
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+from weakref import WeakKeyDictionary
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.signals import setting_changed
+from django.utils.module_loading import import_string
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+DEFAULTS = {
+    'BACKEND': 'common.throttling.LocalBucketBackend',
+    'OPTIONS': {},
+}
+
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+def parse_rate(rate: Optional[str]) -> tuple[Optional[int], Optional[int]]:
+    """Parse `'<limit>/<period>'` (period `s`, `m`, `h` or `d` first letter)."""
+    if rate is None:
+        return None, None
+    limit, period = rate.split('/')
+    return int(limit), PERIODS[period[0]]
+
+
+class BucketBackend:
+    """Base class of bucket backends."""
+
+    def consume(self, key: str, interval: float, burst: int) -> tuple[bool, Optional[float]]:
+        """
+        Take a token of the bucket `key`.
+
+        `interval` is the refill time of one token and `burst` the bucket
+        size. Return whether a token was taken, else the seconds to wait.
+        """
+        raise NotImplementedError
+
+    async def aconsume(self, key: str, interval: float, burst: int) -> tuple[bool, Optional[float]]:
+        """Take a token from async code."""
+        return self.consume(key, interval, burst)
+
+
+class LocalBucketBackend(BucketBackend):
+    """
+    Buckets in the memory of the process.
+
+    Buckets are kept in the order they were last asked for a token; past
+    `max_entries` the least recently used ones are evicted, in constant
+    time per request. Their clients start again with a full bucket, so
+    size the table above the keys active within a period: a burst of new
+    keys, e.g. usernames of credential stuffing, then only evicts idle
+    buckets. Limits apply per process; use the Redis backend to share them
+    between workers.
+
+    Attributes:
+        * `max_entries` (int): buckets kept before the oldest are evicted
+    """
+
+    def __init__(self, max_entries: int = 100_000) -> None:
+        self.max_entries = max_entries
+        self._tats: OrderedDict[str, float] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def consume(self, key: str, interval: float, burst: int) -> tuple[bool, Optional[float]]:
+        now = time.monotonic()
+        with self._lock:
+            tat = max(self._tats.get(key, now), now) + interval
+            allow_at = tat - interval * burst
+            if now < allow_at:
+                # Denied keys stay recent, a flood of new keys evicts them last.
+                self._tats.move_to_end(key)
+                return False, allow_at - now
+            self._tats[key] = tat
+            self._tats.move_to_end(key)
+            while len(self._tats) > self.max_entries:
+                self._tats.popitem(last=False)
+        return True, None
+
+    def clear(self) -> None:
+        with self._lock:
+            self._tats.clear()
+
+    def __len__(self) -> int:
+        return len(self._tats)
+
+
+class RedisBucketBackend(BucketBackend):
+    """
+    Buckets in Redis, shared by all workers.
+
+    A bucket is updated atomically by a Lua script using the Redis clock,
+    so workers with drifting clocks agree. Keys expire once the bucket is
+    full again.
+
+    Attributes:
+        * `url` (str): Redis URL, `REDIS_URL` by default
+        * `key_prefix` (str)
+    """
+
+    script = """
+        local now = redis.call('TIME')
+        now = tonumber(now[1]) + tonumber(now[2]) / 1000000
+        local interval = tonumber(ARGV[1])
+        local burst = tonumber(ARGV[2])
+        local tat = tonumber(redis.call('GET', KEYS[1]) or now)
+        tat = math.max(tat, now) + interval
+        local allow_at = tat - interval * burst
+        if now < allow_at then
+            return {0, tostring(allow_at - now)}
+        end
+        redis.call('SET', KEYS[1], tostring(tat), 'PX', math.ceil((tat - now) * 1000))
+        return {1, '0'}
+    """
+
+    def __init__(self, url: Optional[str] = None, key_prefix: str = 'throttle') -> None:
+        import redis
+
+        self.url = url or settings.REDIS_URL
+        self.key_prefix = key_prefix
+        self.client = redis.Redis.from_url(self.url)
+        self._consume = self.client.register_script(self.script)
+        self._async_scripts = WeakKeyDictionary()
+
+    def get_key(self, key: str) -> str:
+        return f'{self.key_prefix}:{key}'
+
+    @staticmethod
+    def parse(result: list) -> tuple[bool, Optional[float]]:
+        allowed, wait = result
+        return (True, None) if int(allowed) else (False, float(wait))
+
+    def consume(self, key: str, interval: float, burst: int) -> tuple[bool, Optional[float]]:
+        return self.parse(self._consume(keys=[self.get_key(key)], args=[interval, burst]))
+
+    async def aconsume(self, key: str, interval: float, burst: int) -> tuple[bool, Optional[float]]:
+        # Async clients are bound to an event loop, keep one per loop.
+        loop = asyncio.get_running_loop()
+        script = self._async_scripts.get(loop)
+        if script is None:
+            from redis import asyncio as aioredis
+
+            script = aioredis.Redis.from_url(self.url).register_script(self.script)
+            self._async_scripts[loop] = script
+        return self.parse(await script(keys=[self.get_key(key)], args=[interval, burst]))
+
+
+_backend: Optional[BucketBackend] = None
+_backend_lock = threading.Lock()
+
+
+def get_bucket_backend() -> BucketBackend:
+    """Get the shared backend of the `THROTTLING` setting."""
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                config = {**DEFAULTS, **getattr(settings, 'THROTTLING', {})}
+                _backend = import_string(config['BACKEND'])(**config['OPTIONS'])
+    return _backend
+
+
+def reset_bucket_backend(**kwargs) -> None:
+    """Drop the shared backend, e.g. when `THROTTLING` changes in tests."""
+    global _backend
+    if kwargs.get('setting', 'THROTTLING') != 'THROTTLING':
+        return
+    with _backend_lock:
+        _backend = None
+
+
+setting_changed.connect(reset_bucket_backend)
+
+
+class BucketThrottle(BaseThrottle):
+    """
+    Base token-bucket throttle.
+
+    Subclasses set `scope` and implement `get_bucket_ident()`; a `None`
+    ident or rate disables the throttle for the request.
+
+    Attributes:
+        * `scope` (str): key of the rate in `DEFAULT_THROTTLE_RATES`
+        * `rate` (str | None): rate overriding the setting
+    """
+
+    scope = None
+    rate = None
+
+    def __init__(self) -> None:
+        if self.rate is None:
+            self.rate = self.get_rate()
+        self.limit, self.period = parse_rate(self.rate)
+        self.wait_seconds = None
+
+    def get_rate(self) -> Optional[str]:
+        if not self.scope:
+            raise ImproperlyConfigured(f'{self.__class__.__name__} must set `scope` or `rate`.')
+        try:
+            return api_settings.DEFAULT_THROTTLE_RATES[self.scope]
+        except KeyError:
+            raise ImproperlyConfigured(f'No throttle rate set for scope {self.scope!r}.')
+
+    def get_bucket_ident(self, request: Request, view) -> Optional[str]:
+        """Identify the bucket of the request within the scope."""
+        raise NotImplementedError
+
+    def get_bucket_key(self, request: Request, view) -> Optional[str]:
+        if self.limit is None:
+            return None
+        ident = self.get_bucket_ident(request, view)
+        return None if ident is None else f'{self.scope}:{ident}'
+
+    def allow_request(self, request: Request, view) -> bool:
+        key = self.get_bucket_key(request, view)
+        if key is None:
+            return True
+        allowed, self.wait_seconds = get_bucket_backend().consume(
+            key, self.period / self.limit, self.limit
+        )
+        return allowed
+
+    async def aallow_request(self, request: Request, view) -> bool:
+        """`allow_request()` for async views."""
+        key = self.get_bucket_key(request, view)
+        if key is None:
+            return True
+        allowed, self.wait_seconds = await get_bucket_backend().aconsume(
+            key, self.period / self.limit, self.limit
+        )
+        return allowed
+
+    def wait(self) -> Optional[float]:
+        return self.wait_seconds
+
+
+class IPThrottle(BucketThrottle):
+    """Bucket per client IP address (see `NUM_PROXIES`)."""
+
+    def get_bucket_ident(self, request: Request, view) -> Optional[str]:
+        return f'ip:{self.get_ident(request)}'
+
+
+class UserThrottle(BucketThrottle):
+    """Bucket per authenticated user, per IP address for anonymous requests."""
+
+    def get_bucket_ident(self, request: Request, view) -> Optional[str]:
+        user = request.user
+        if user and user.is_authenticated:
+            return f'user:{user.pk}'
+        return f'ip:{self.get_ident(request)}'
+
+
+class ActionThrottle(BucketThrottle):
+    """Bucket per view action, shared by all clients, capping its total rate."""
+
+    def get_bucket_ident(self, request: Request, view) -> Optional[str]:
+        action = getattr(view, 'action', None) or request.method
+        return f'action:{view.__class__.__name__}.{action}'
+
+
+class ScopeThrottle(BucketThrottle):
+    """One bucket per scope, shared by every view and client using it."""
+
+    def get_bucket_ident(self, request: Request, view) -> Optional[str]:
+        return 'all'
@@ -0,0 +1,346 @@
+"""
+Async counterparts of the view classes of `common.views.mixins`.
+
+Under ASGI these views are awaited directly by Django, so a request does not
+pay a thread hop for the view itself. Authentication, permission checks,
+conditional GET validators, the response cache and pagination run on the
+event loop with the async ORM and cache APIs:
+
+* authenticators implementing `aauthenticate` (`AsyncJWTAuthentication`) are
+  awaited, others run in a thread;
+* permissions implementing `ahas_permission`/`ahas_object_permission` are
+  awaited, others are called directly and must not query the database;
+* paginators implementing `apaginate_queryset` are awaited, others run in a
+  thread.
+
+Output built by a `FastReadConverter` is produced on the loop. DRF
+serializers may load deferred columns and relations lazily, so their
+validation, saving and output run in a thread, as do sync handlers (e.g.
+extra `@action`s) of an async viewset.
+"""
+import time
+from typing import Optional
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.core.exceptions import ValidationError
+from django.db.models import QuerySet
+from django.http import Http404
+from rest_framework import exceptions, mixins, status
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.viewsets import GenericViewSet
+
+from common.conditional import aget_validators, has_field
+from common.metrics import timed
+from common.serializers.converters import ConvertedData
+from common.views.mixins import ExtendedView, ShortCircuit
+
+
+class AsyncExtendedView(ExtendedView):
+    """
+    Extended View dispatching requests asynchronously.
+
+    Put it before the DRF view class; handlers may be coroutines or plain
+    functions.
+    """
+
+    @classmethod
+    def as_view(cls, *args, **initkwargs):
+        """Mark the view as a coroutine function for Django's handlers."""
+        view = super().as_view(*args, **initkwargs)
+        return markcoroutinefunction(view)
+
+    async def dispatch(self, request, *args, **kwargs):
+        """Same as `APIView.dispatch`, awaiting the request checks and handler."""
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await self.ainitial(request, *args, **kwargs)
+
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(self, request.method.lower(), self.http_method_not_allowed)
+            else:
+                handler = self.http_method_not_allowed
+
+            if iscoroutinefunction(handler):
+                response = await handler(request, *args, **kwargs)
+            else:
+                response = await sync_to_async(handler)(request, *args, **kwargs)
+
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
+
+    async def ainitial(self, request: Request, *args, **kwargs) -> None:
+        """Run the request checks, then answer 304 or from the response cache."""
+        self.format_kwarg = self.get_format_suffix(**kwargs)
+
+        neg = self.perform_content_negotiation(request)
+        request.accepted_renderer, request.accepted_media_type = neg
+
+        version, scheme = self.determine_version(request, *args, **kwargs)
+        request.version, request.versioning_scheme = version, scheme
+
+        with timed('auth'):
+            await self.aperform_authentication(request)
+        with timed('permissions'):
+            await self.acheck_permissions(request)
+        await self.acheck_throttles(request)
+        await self.acheck_conditions(request)
+
+        cache = self.response_cache
+        if cache and cache.is_cacheable(self, request):
+            self.response_cache_key = await cache.aget_cache_key(self, request)
+            response = await cache.alookup(self.response_cache_key)
+            if response is not None:
+                raise ShortCircuit(response)
+        self.handler_started = time.perf_counter()
+
+    async def aperform_authentication(self, request: Request) -> None:
+        """Authenticate the request before anything reads `request.user`."""
+        for authenticator in request.authenticators:
+            try:
+                if hasattr(authenticator, 'aauthenticate'):
+                    user_auth_tuple = await authenticator.aauthenticate(request)
+                else:
+                    user_auth_tuple = await sync_to_async(authenticator.authenticate)(request)
+            except exceptions.APIException:
+                request._not_authenticated()
+                raise
+
+            if user_auth_tuple is not None:
+                request._authenticator = authenticator
+                request.user, request.auth = user_auth_tuple
+                return
+
+        request._not_authenticated()
+
+    async def acheck_permissions(self, request: Request) -> None:
+        """Check the view permissions."""
+        for permission in self.get_permissions():
+            if hasattr(permission, 'ahas_permission'):
+                allowed = await permission.ahas_permission(request, self)
+            else:
+                allowed = permission.has_permission(request, self)
+            if not allowed:
+                self.permission_denied(
+                    request,
+                    message=getattr(permission, 'message', None),
+                    code=getattr(permission, 'code', None),
+                )
+
+    async def acheck_object_permissions(self, request: Request, obj) -> None:
+        """Check the object permissions."""
+        with timed('permissions'):
+            for permission in self.get_permissions():
+                if hasattr(permission, 'ahas_object_permission'):
+                    allowed = await permission.ahas_object_permission(request, self, obj)
+                else:
+                    allowed = permission.has_object_permission(request, self, obj)
+                if not allowed:
+                    self.permission_denied(
+                        request,
+                        message=getattr(permission, 'message', None),
+                        code=getattr(permission, 'code', None),
+                    )
+
+    async def acheck_throttles(self, request: Request) -> None:
+        """`check_throttles()` awaiting the throttles implementing `aallow_request`."""
+        for throttle in self.get_throttles():
+            if hasattr(throttle, 'aallow_request'):
+                allowed = await throttle.aallow_request(request, self)
+            else:
+                allowed = await sync_to_async(throttle.allow_request)(request, self)
+            if not allowed:
+                self.throttled(request, throttle.wait())
+
+    async def acheck_conditions(self, request: Request) -> None:
+        """Compute the validators with the async ORM and answer 304 when they match."""
+        if request.method not in ('GET', 'HEAD') or not self.conditional_field:
+            return
+
+        queryset = self.get_conditional_queryset()
+        if queryset is None or not has_field(queryset, self.conditional_field):
+            return
+
+        self.apply_validators(request, await aget_validators(queryset, self.conditional_field))
+
+    async def apaginate_queryset(self, queryset: QuerySet) -> Optional[list]:
+        """Paginate, fetching `values()` rows on the fast read path."""
+        if self.paginator is None:
+            return None
+
+        converter = self.get_fast_converter(queryset)
+        if converter is not None:
+            queryset = converter.values(queryset)
+
+        with timed('paginate'):
+            if hasattr(self.paginator, 'apaginate_queryset'):
+                page = await self.paginator.apaginate_queryset(queryset, self.request, view=self)
+            else:
+                page = await sync_to_async(self.paginator.paginate_queryset)(
+                    queryset, self.request, view=self
+                )
+        if page is None or converter is None:
+            return page
+        return converter.convert_rows(page, serializer=self.get_serializer())
+
+    async def afetch_list(self, queryset: QuerySet) -> list:
+        """Fetch an unpaginated list, converted on the fast read path."""
+        converter = self.get_fast_converter(queryset)
+        if converter is None:
+            return [obj async for obj in queryset]
+
+        rows = [row async for row in converter.values(queryset)]
+        return converter.convert_rows(rows, serializer=self.get_serializer())
+
+    async def aget_object(self):
+        """Same as `get_object`, with the async ORM."""
+        queryset = self.filter_queryset(self.get_queryset())
+
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        assert lookup_url_kwarg in self.kwargs, (
+                'Expected view %s to be called with a URL keyword argument '
+                'named "%s". Fix your URL conf, or set the `.lookup_field` '
+                'attribute on the view correctly.' %
+                (self.__class__.__name__, lookup_url_kwarg)
+        )
+        filter_kwargs = {self.lookup_field: self.kwargs[lookup_url_kwarg]}
+
+        converter = None
+        if (
+                getattr(self, 'action', None) in self.fast_read_actions
+                and self.has_row_object_permissions()
+        ):
+            converter = self.get_fast_converter(queryset)
+        if converter is not None:
+            queryset = converter.values(queryset)
+
+        try:
+            obj = await queryset.aget(**filter_kwargs)
+        except (queryset.model.DoesNotExist, TypeError, ValueError, ValidationError):
+            raise Http404(
+                'No %s matches the given query.' % queryset.model._meta.object_name
+            )
+
+        await self.acheck_object_permissions(self.request, obj)
+        if converter is not None:
+            return converter.convert_row(obj, serializer=self.get_serializer())
+        return obj
+
+    @staticmethod
+    async def aserialize(serializer):
+        """Get the serializer output, building DRF output in a thread."""
+        if isinstance(serializer, ConvertedData):
+            return serializer.data
+        # A `TimedSerializer`: the thread adds to `serialize` itself.
+        return await sync_to_async(lambda: serializer.data)()
+
+
+class AsyncListModelMixin(mixins.ListModelMixin):
+    """List a queryset."""
+
+    async def list(self, request: Request, *args, **kwargs) -> Response:
+        queryset = self.filter_queryset(self.get_queryset())
+
+        page = await self.apaginate_queryset(queryset)
+        if page is not None:
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(await self.aserialize(serializer))
+
+        serializer = self.get_serializer(await self.afetch_list(queryset), many=True)
+        return Response(await self.aserialize(serializer))
+
+
+class AsyncRetrieveModelMixin(mixins.RetrieveModelMixin):
+    """Retrieve a model instance."""
+
+    async def retrieve(self, request: Request, *args, **kwargs) -> Response:
+        instance = await self.aget_object()
+        serializer = self.get_serializer(instance)
+        return Response(await self.aserialize(serializer))
+
+
+class AsyncCreateModelMixin(mixins.CreateModelMixin):
+    """Create a model instance."""
+
+    async def create(self, request: Request, *args, **kwargs) -> Response:
+        serializer = self.get_serializer(data=request.data)
+        await sync_to_async(serializer.is_valid)(raise_exception=True)
+        await self.aperform_create(serializer)
+        data = await self.aserialize(serializer)
+        headers = self.get_success_headers(data)
+        return Response(data, status=status.HTTP_201_CREATED, headers=headers)
+
+    async def aperform_create(self, serializer) -> None:
+        await sync_to_async(self.perform_create)(serializer)
+
+
+class AsyncUpdateModelMixin(mixins.UpdateModelMixin):
+    """Update a model instance."""
+
+    async def update(self, request: Request, *args, **kwargs) -> Response:
+        partial = kwargs.pop('partial', False)
+        instance = await self.aget_object()
+        serializer = self.get_serializer(instance, data=request.data, partial=partial)
+        await sync_to_async(serializer.is_valid)(raise_exception=True)
+        await self.aperform_update(serializer)
+
+        if getattr(instance, '_prefetched_objects_cache', None):
+            # If 'prefetch_related' has been applied to a queryset, we need to
+            # forcibly invalidate the prefetch cache on the instance.
+            instance._prefetched_objects_cache = {}
+
+        return Response(await self.aserialize(serializer))
+
+    async def aperform_update(self, serializer) -> None:
+        await sync_to_async(self.perform_update)(serializer)
+
+    async def partial_update(self, request: Request, *args, **kwargs) -> Response:
+        kwargs['partial'] = True
+        return await self.update(request, *args, **kwargs)
+
+
+class AsyncDestroyModelMixin(mixins.DestroyModelMixin):
+    """Destroy a model instance."""
+
+    async def destroy(self, request: Request, *args, **kwargs) -> Response:
+        instance = await self.aget_object()
+        await self.aperform_destroy(instance)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+    async def aperform_destroy(self, instance) -> None:
+        await instance.adelete()
+
+
+class AsyncExtendedGenericViewSet(AsyncExtendedView, GenericViewSet):
+    """Async Extended Generic ViewSet."""
+    pass
+
+
+class AsyncListViewSet(AsyncExtendedGenericViewSet, AsyncListModelMixin):
+    """Async view class including List behavior."""
+    pass
+
+
+class AsyncRetrieveListViewSet(AsyncExtendedGenericViewSet,
+                               AsyncRetrieveModelMixin,
+                               AsyncListModelMixin):
+    """Async view class including List and Retrieve behaviors."""
+    pass
+
+
+class AsyncCRUDListViewSet(AsyncExtendedGenericViewSet,
+                           AsyncCreateModelMixin,
+                           AsyncRetrieveModelMixin,
+                           AsyncUpdateModelMixin,
+                           AsyncDestroyModelMixin,
+                           AsyncListModelMixin):
+    """Async view class including full CRUD behaviors."""
+    pass
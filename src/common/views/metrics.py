@@ -0,0 +1,29 @@
+import hmac
+
+from django.conf import settings
+from django.http import HttpRequest, HttpResponse, HttpResponseNotFound
+from django.views import View
+
+from common.metrics import registry
+
+
+class MetricsView(View):
+    """
+    Prometheus scrape endpoint of the request histograms.
+
+    Scrapes must send `METRICS['TOKEN']` as a bearer token. Without a token
+    configured the endpoint is disabled: every request gets a 404.
+    """
+
+    content_type = 'text/plain; version=0.0.4; charset=utf-8'
+
+    def is_authorized(self, request: HttpRequest) -> bool:
+        token = getattr(settings, 'METRICS', {}).get('TOKEN')
+        if not token:
+            return False
+        return hmac.compare_digest(request.headers.get('Authorization', ''), f'Bearer {token}')
+
+    def get(self, request: HttpRequest) -> HttpResponse:
+        if not self.is_authorized(request):
+            return HttpResponseNotFound()
+        return HttpResponse(registry.render(), content_type=self.content_type)
@@ -1,26 +1,117 @@
+import time
 from typing import Optional, TypeVar
 
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import BooleanField, Case, Q, QuerySet, Value, When
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
 from djoser.views import UserViewSet
-from rest_framework import mixins, authentication
-from rest_framework.generics import CreateAPIView
-from rest_framework.permissions import AllowAny
+from rest_framework import mixins, authentication, status
+from rest_framework.exceptions import MethodNotAllowed, NotFound, PermissionDenied
+from rest_framework.generics import CreateAPIView, get_object_or_404
+from rest_framework.permissions import AllowAny, BasePermission
+from rest_framework.request import Request
+from rest_framework.response import Response
 from rest_framework.viewsets import GenericViewSet
 
+from common.conditional import Validators, get_validators, has_field
+from common.metrics import record, timed
+from common.serializers.converters import (
+    ConvertedData,
+    ConvertedDict,
+    ConvertedList,
+    FastReadConverter,
+)
+from common.serializers.mixins import SparseFieldsMixin
+
 TAuth = TypeVar('TAuth')
 TPermission = TypeVar('TPermission')
+TThrottle = TypeVar('TThrottle')
 TSerializer = TypeVar('TSerializer')
 
-class ExtendedView:
-    """Extended View"""
+
+class ShortCircuit(Exception):
+    """Carries a ready response out of `initial()`."""
+
+    def __init__(self, response) -> None:
+        super().__init__()
+        self.response = response
+
+
+class TimedSerializer:
+    """Stands in for a serializer, adding the build of its output to `serialize`."""
+
+    def __init__(self, serializer) -> None:
+        object.__setattr__(self, 'serializer', serializer)
+
+    @property
+    def data(self):
+        with timed('serialize'):
+            return self.serializer.data
+
+    def __getattr__(self, name: str):
+        return getattr(self.serializer, name)
+
+    def __setattr__(self, name: str, value) -> None:
+        setattr(self.serializer, name, value)
+
+
+class OrderedThrottlesMixin:
+    """
+    Checks the throttles in order, answering 429 at the first denial.
+
+    DRF asks every throttle, so each one takes a token even when another
+    denies the request. Here the throttles after a denial are not asked:
+    a shared budget listed last only pays for requests the per-client
+    throttles let through.
+    """
+
+    def check_throttles(self, request: Request) -> None:
+        for throttle in self.get_throttles():
+            if not throttle.allow_request(request, self):
+                self.throttled(request, throttle.wait())
+
+
+class ExtendedView(OrderedThrottlesMixin):
+    """
+    Extended View
+
+    Read actions answer conditional requests: `ETag` and `Last-Modified` are
+    derived from `conditional_field` of the queryset, matching
+    `If-None-Match`/`If-Modified-Since` get a 304 before any serialization.
+    Lists only get the `ETag`: their latest modification stays the same
+    when a row other than the newest is deleted, their row count does not.
+
+    With a `SparseFieldsMixin` serializer, read actions only fetch the columns
+    the output needs. Actions in `fast_read_actions` go further and build the
+    output from `values()` rows with a `FastReadConverter`.
+
+    Authentication, permission checks, pagination, serialization and the
+    handler are timed into the request phases of `common.metrics`.
+    """
     authentication_classes = (authentication.BasicAuthentication,)
     multi_authentication_classes = None
 
     permission_classes = (AllowAny,)
     multi_permission_classes = None
 
+    multi_throttle_classes = None
+
     multi_serializer_class = None
     serializer_class = None
 
+    conditional_field = 'updated_at'
+    conditional_actions = ('list', 'retrieve')
+    validators = None
+
+    sparse_actions = ('list', 'retrieve')
+    fast_read_actions = ()
+
+    response_cache = None
+    response_cache_key = None
+
+    handler_started = None
+
     request = None
     action_map = None
 
@@ -89,6 +180,14 @@ class ExtendedView:
             return self.__permission_initialize(permissions=permissions)
         return self.__permission_initialize()
 
+    def get_throttles(self) -> list[TThrottle]:
+        """Get the throttle classes."""
+        if self.multi_throttle_classes:
+            throttles = self.multi_throttle_classes.get(self.__get_action_or_method())
+            if throttles is not None:
+                return [throttle() for throttle in throttles]
+        return [throttle() for throttle in self.throttle_classes]
+
     def get_serializer_class(self) -> TSerializer:
         """Get the serializer class."""
         assert self.serializer_class or self.multi_serializer_class, (
@@ -103,6 +202,341 @@ class ExtendedView:
         # Get the serializer for the action or fallback to default.
         return self.multi_serializer_class.get(action) or self.serializer_class
 
+    def get_ordering_fields(self, queryset: QuerySet) -> list[str]:
+        """Get the model fields the queryset and the pagination order by."""
+        ordering = list(queryset.query.order_by)
+        ordering += getattr(self.pagination_class, 'ordering', None) or ()
+        names = []
+        for item in ordering:
+            if not isinstance(item, str) or '__' in item:
+                continue
+            try:
+                names.append(queryset.model._meta.get_field(item.lstrip('-')).name)
+            except FieldDoesNotExist:
+                continue
+        return names
+
+    def select_fields(self, queryset: QuerySet) -> QuerySet:
+        """Restrict the queryset to the columns of the serializer output."""
+        if not isinstance(queryset, QuerySet) or queryset._fields is not None:
+            return queryset
+        if not issubclass(self.get_serializer_class(), SparseFieldsMixin):
+            return queryset
+
+        serializer = self.get_serializer()
+        names = serializer.get_model_fields(queryset.model, queryset.query.annotations)
+        if names is None:
+            return queryset
+        names += self.get_ordering_fields(queryset)
+        return queryset.only(*dict.fromkeys(names))
+
+    def filter_queryset(self, queryset: QuerySet) -> QuerySet:
+        """Filter the queryset, then defer columns the read action does not render."""
+        queryset = super().filter_queryset(queryset)
+        if (
+                getattr(self, 'action', None) in self.sparse_actions
+                and self.request.method in ('GET', 'HEAD')
+        ):
+            queryset = self.select_fields(queryset)
+        return queryset
+
+    def get_fast_converter(self, queryset: QuerySet) -> Optional[FastReadConverter]:
+        """Get the converter of the current read action, if it opted in."""
+        if (
+                getattr(self, 'action', None) not in self.fast_read_actions
+                or self.request.method not in ('GET', 'HEAD')
+                or not isinstance(queryset, QuerySet)
+                or queryset._fields is not None
+        ):
+            return None
+        return FastReadConverter.for_serializer(self.get_serializer(), queryset)
+
+    def has_row_object_permissions(self) -> bool:
+        """Check that no permission needs a model instance."""
+        return all(
+            type(permission).has_object_permission is BasePermission.has_object_permission
+            for permission in self.get_permissions()
+        )
+
+    def paginate_queryset(self, queryset: QuerySet):
+        """Paginate `values()` rows and convert them on the fast read path."""
+        converter = self.get_fast_converter(queryset)
+        if converter is None:
+            with timed('paginate'):
+                return super().paginate_queryset(queryset)
+
+        with timed('paginate'):
+            rows = super().paginate_queryset(converter.values(queryset))
+        if rows is None:
+            return None
+        return converter.convert_rows(rows, serializer=self.get_serializer())
+
+    def get_paginated_response(self, data) -> Response:
+        with timed('paginate'):
+            return super().get_paginated_response(data)
+
+    def get_object(self):
+        """Look up a `values()` row and convert it on the fast read path."""
+        if (
+                getattr(self, 'action', None) not in self.fast_read_actions
+                or not self.has_row_object_permissions()
+        ):
+            return super().get_object()
+
+        queryset = self.filter_queryset(self.get_queryset())
+        converter = self.get_fast_converter(queryset)
+        if converter is None:
+            return super().get_object()
+
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        filter_kwargs = {self.lookup_field: self.kwargs[lookup_url_kwarg]}
+        row = get_object_or_404(converter.values(queryset), **filter_kwargs)
+        self.check_object_permissions(self.request, row)
+        return converter.convert_row(row, serializer=self.get_serializer())
+
+    def get_serializer(self, *args, **kwargs):
+        """
+        Pass converted output through, convert unpaginated lists.
+
+        Serializers the handler builds for instances or data are wrapped in
+        a `TimedSerializer`, their `data` is timed into `serialize`.
+        """
+        instance = args[0] if args else kwargs.get('instance')
+        if isinstance(instance, (ConvertedList, ConvertedDict)):
+            return ConvertedData(instance)
+
+        if kwargs.get('many') and isinstance(instance, QuerySet):
+            converter = self.get_fast_converter(instance)
+            if converter is not None:
+                return ConvertedData(converter.convert_rows(
+                    converter.values(instance), serializer=super().get_serializer()
+                ))
+        serializer = super().get_serializer(*args, **kwargs)
+        if self.handler_started is not None and (args or kwargs):
+            return TimedSerializer(serializer)
+        return serializer
+
+    def get_conditional_queryset(self) -> Optional[QuerySet]:
+        """Get the queryset a read action builds its response from."""
+        action = getattr(self, 'action', None)
+        if action not in self.conditional_actions or not hasattr(self, 'get_queryset'):
+            return None
+
+        queryset = self.filter_queryset(self.get_queryset())
+        if action == 'retrieve':
+            lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+            if lookup_url_kwarg not in self.kwargs:
+                return None
+            try:
+                queryset = queryset.filter(**{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+            except (TypeError, ValueError, ValidationError):
+                # A malformed lookup is answered 404 by the action.
+                return None
+        return queryset
+
+    def check_conditions(self, request: Request) -> None:
+        """Compute the validators and answer 304 when they match."""
+        if request.method not in ('GET', 'HEAD') or not self.conditional_field:
+            return
+
+        queryset = self.get_conditional_queryset()
+        if queryset is None or not has_field(queryset, self.conditional_field):
+            return
+
+        self.apply_validators(request, get_validators(queryset, self.conditional_field))
+
+    def apply_validators(self, request: Request, validators: Validators) -> None:
+        """Keep the validators for the response and answer 304 when they match."""
+        if self.action == 'retrieve':
+            if not validators.count:
+                return
+        else:
+            validators = validators._replace(last_modified=None)
+
+        self.validators = validators
+        last_modified = validators.last_modified
+        response = get_conditional_response(
+            request._request,
+            etag=validators.etag,
+            last_modified=last_modified and int(last_modified.timestamp()),
+        )
+        if response is not None:
+            raise ShortCircuit(response)
+
+    def perform_authentication(self, request: Request) -> None:
+        with timed('auth'):
+            super().perform_authentication(request)
+
+    def check_permissions(self, request: Request) -> None:
+        with timed('permissions'):
+            super().check_permissions(request)
+
+    def check_object_permissions(self, request: Request, obj) -> None:
+        with timed('permissions'):
+            super().check_object_permissions(request, obj)
+
+    def initial(self, request: Request, *args, **kwargs) -> None:
+        """Run the request checks, then answer 304 or from the response cache."""
+        super().initial(request, *args, **kwargs)
+        self.check_conditions(request)
+
+        cache = self.response_cache
+        if cache and cache.is_cacheable(self, request):
+            self.response_cache_key = cache.get_cache_key(self, request)
+            response = cache.lookup(self.response_cache_key)
+            if response is not None:
+                raise ShortCircuit(response)
+        self.handler_started = time.perf_counter()
+
+    def handle_exception(self, exc: Exception):
+        """Return short-circuited responses as they are."""
+        if isinstance(exc, ShortCircuit):
+            return exc.response
+        return super().handle_exception(exc)
+
+    def finalize_response(self, request: Request, response, *args, **kwargs):
+        """Set the validators and store GET responses in the response cache."""
+        if self.handler_started is not None:
+            record('handler', time.perf_counter() - self.handler_started)
+            self.handler_started = None
+        response = super().finalize_response(request, response, *args, **kwargs)
+        if self.validators and response.status_code in (200, 304):
+            response.setdefault('ETag', self.validators.etag)
+            if self.validators.last_modified:
+                response.setdefault(
+                    'Last-Modified', http_date(self.validators.last_modified.timestamp())
+                )
+
+        if (
+                self.response_cache_key
+                and request.method == 'GET'
+                and response.status_code == 200
+                and isinstance(response, Response)
+        ):
+            self.response_cache.store(self.response_cache_key, response)
+        return response
+
+
+class OwnerScopedMixin:
+    """
+    Row-level ownership enforced in SQL.
+
+    Actions in `owner_scoped_actions` are write actions on owned rows: the
+    detail lookup resolves 403 vs 404 with a single query, update is a
+    conditional `UPDATE ... WHERE owner = user` and destroy an optimistic
+    conditional `DELETE` that only looks the row up again when nothing was
+    deleted. Querysets of `owner_filtered_actions` only contain the rows of
+    the user. Put the mixin before the view base class.
+
+    Attributes:
+        * `owner_field` (str): foreign key to the owning user
+        * `owner_scoped_actions` (tuple[str]): actions denied on foreign rows
+        * `owner_filtered_actions` (tuple[str]): actions seeing own rows only
+        * `owner_superuser_bypass` (bool): superusers act on any row
+        * `owner_denied_message` (str)
+    """
+
+    owner_field = 'created_by'
+    owner_scoped_actions = ('update', 'partial_update', 'destroy')
+    owner_filtered_actions = ()
+    owner_superuser_bypass = True
+    owner_denied_message = 'You can only modify your own objects.'
+    owner_annotation = '_is_owner'
+
+    def is_owner_bypassed(self) -> bool:
+        """Check whether the user may act on rows of others."""
+        return self.owner_superuser_bypass and self.request.user.is_superuser
+
+    def is_owner_scoped(self, actions: Optional[tuple[str, ...]] = None) -> bool:
+        """Check whether ownership applies to the current action."""
+        actions = self.owner_scoped_actions if actions is None else actions
+        return getattr(self, 'action', None) in actions and not self.is_owner_bypassed()
+
+    def get_owner_filter(self) -> Q:
+        """Rows owned by the current user."""
+        return Q(**{self.owner_field: self.request.user.pk})
+
+    def annotate_owner(self, queryset: QuerySet) -> QuerySet:
+        """Annotate whether each row is owned by the current user."""
+        return queryset.annotate(**{
+            self.owner_annotation: Case(
+                When(self.get_owner_filter(), then=Value(True)),
+                default=Value(False),
+                output_field=BooleanField(),
+            ),
+        })
+
+    def get_queryset(self) -> QuerySet:
+        """Filter the queryset of `owner_filtered_actions` to the rows of the user."""
+        queryset = super().get_queryset()
+        if self.is_owner_scoped(self.owner_filtered_actions):
+            queryset = queryset.filter(self.get_owner_filter())
+        return queryset
+
+    def get_object(self):
+        """Get the object, telling foreign rows (403) from missing ones (404)."""
+        if not self.is_owner_scoped():
+            return super().get_object()
+
+        queryset = self.annotate_owner(self.filter_queryset(self.get_queryset()))
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        obj = get_object_or_404(queryset, **{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+        if not getattr(obj, self.owner_annotation):
+            raise PermissionDenied(self.owner_denied_message)
+        self.check_object_permissions(self.request, obj)
+        return obj
+
+    @staticmethod
+    def is_column_update(model, values: dict) -> bool:
+        """Check that every value maps to a column of the model."""
+        for name in values:
+            try:
+                field = model._meta.get_field(name)
+            except FieldDoesNotExist:
+                return False
+            if not field.concrete or field.many_to_many:
+                return False
+        return True
+
+    def perform_update(self, serializer) -> None:
+        """Write the validated data with an owner-conditional `UPDATE`."""
+        instance = serializer.instance
+        values = dict(serializer.validated_data)
+        if not self.is_owner_scoped() or not self.is_column_update(type(instance), values):
+            return super().perform_update(serializer)
+
+        queryset = self.get_queryset().filter(self.get_owner_filter(), pk=instance.pk)
+        stamp_values = getattr(queryset, 'stamp_values', None)
+        if stamp_values is not None:
+            # Stamp here as well, so the response shows the audit values.
+            values = stamp_values(values)
+        if not queryset.update(**values):
+            # Deleted or handed over since `get_object()`.
+            raise NotFound
+        for attr, value in values.items():
+            setattr(instance, attr, value)
+
+    def destroy(self, request: Request, *args, **kwargs) -> Response:
+        """Delete with an owner-conditional `DELETE`."""
+        if not isinstance(self, mixins.DestroyModelMixin):
+            raise MethodNotAllowed(request.method)
+        if not self.is_owner_scoped() or not self.has_row_object_permissions():
+            return super().destroy(request, *args, **kwargs)
+
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        try:
+            queryset = self.filter_queryset(self.get_queryset()).filter(
+                **{self.lookup_field: self.kwargs[lookup_url_kwarg]}
+            )
+        except (TypeError, ValueError, ValidationError):
+            raise NotFound
+        deleted, _ = queryset.filter(self.get_owner_filter()).delete()
+        if not deleted:
+            if queryset.exists():
+                raise PermissionDenied(self.owner_denied_message)
+            raise NotFound
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
 
 class ExtendedGenericViewSet(ExtendedView, GenericViewSet):
     """Extended Generic ViewSet."""
@@ -25,6 +25,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
 
     # packages
     'rest_framework',
@@ -51,6 +52,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # First, so the request timings cover the whole chain.
+    'common.middleware.MetricsMiddleware',
     'debug_toolbar.middleware.DebugToolbarMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -64,8 +67,8 @@ MIDDLEWARE = [
 
     # package middlewares
     'corsheaders.middleware.CorsMiddleware',
-    'crum.CurrentRequestUserMiddleware',
-    'request_logging.middleware.LoggingMiddleware',
+    'common.middleware.CurrentRequestMiddleware',
+    'common.middleware.RequestLoggingMiddleware',
 
 ]
 
@@ -106,18 +109,37 @@ DATABASES = {
 }
 # endregion -------------------------------------------------------------------------
 
+# region ------------------------------ CACHES --------------------------------------
+# Local memory per process; set REDIS_URL to share caches and generation
+# counters between workers.
+REDIS_URL = env.str(var='REDIS_URL', default='')
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': REDIS_URL,
+    } if REDIS_URL else {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    },
+}
+# endregion -------------------------------------------------------------------------
+
 # region --------------------- DJANGO REST FRAMEWORK --------------------------------
 REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
     ),
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'users.jwt.authentication.CachedJWTAuthentication',
         'rest_framework.authentication.BasicAuthentication',
     ],
 
+    'DEFAULT_RENDERER_CLASSES': [
+        'common.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
     'DEFAULT_PARSER_CLASSES': [
-        'rest_framework.parsers.JSONParser',
+        'common.parsers.ORJSONParser',
         'rest_framework.parsers.FormParser',
         'rest_framework.parsers.MultiPartParser',
         'rest_framework.parsers.FileUploadParser',
@@ -125,6 +147,24 @@ REST_FRAMEWORK = {
     'DEFAULT_FILTER_BACKENDS': ['django_filters.rest_framework.DjangoFilterBackend'],
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
     'DEFAULT_PAGINATION_CLASS': 'common.pagination.BasePagination',
+    'DEFAULT_THROTTLE_RATES': {
+        'login': '10/min',
+        'login_account': '5/min',
+        'password_hashing': '20/s',
+        'registration': '10/hour',
+        'password_change': '5/hour',
+        'vacation_write': '60/min',
+        'user_search': '120/min',
+    },
+}
+
+# Token buckets of `common.throttling`, shared between workers with Redis.
+THROTTLING = {
+    'BACKEND': 'common.throttling.RedisBucketBackend',
+    'OPTIONS': {'url': REDIS_URL},
+} if REDIS_URL else {
+    'BACKEND': 'common.throttling.LocalBucketBackend',
+    'OPTIONS': {},
 }
 # endregion -------------------------------------------------------------------------
 
@@ -242,6 +282,22 @@ SIMPLE_JWT = {
     'SLIDING_TOKEN_REFRESH_EXP_CLAIM': 'refresh_exp',
     'SLIDING_TOKEN_LIFETIME': timedelta(minutes=1),
     'SLIDING_TOKEN_REFRESH_LIFETIME': timedelta(days=1),
+
+    'TOKEN_OBTAIN_SERIALIZER': 'users.jwt.serializers.UserTokenObtainPairSerializer',
+    'TOKEN_REFRESH_SERIALIZER': 'users.jwt.serializers.UserTokenRefreshSerializer',
+    'TOKEN_VERIFY_SERIALIZER': 'users.jwt.serializers.UserTokenVerifySerializer',
+}
+
+# Revoked refresh tokens (rotation and logout), see `users.jwt.revocation`.
+# The default cache shares them between workers when REDIS_URL is set.
+TOKEN_REVOCATION = {
+    'BACKEND': 'users.jwt.revocation.CacheRevocationStore',
+    'OPTIONS': {'cache_alias': 'default'},
+    'BLOOM': {
+        'capacity': env.int(var='TOKEN_REVOCATION_BLOOM_CAPACITY', default=100_000),
+        'error_rate': 0.001,
+        'sync_interval': env.float(var='TOKEN_REVOCATION_BLOOM_SYNC', default=1.0),
+    } if env.bool(var='TOKEN_REVOCATION_BLOOM', default=False) else None,
 }
 
 DJOSER = {
@@ -264,12 +320,52 @@ AUTHENTICATION_BACKENDS = (
     # 'social_core.backends.google.GoogleOAuth2',
     'users.backends.AuthBackend', 
 )
+
+# Users resolved by `CachedJWTAuthentication`: a per-process LRU in front of
+# the default cache. Process entries may stay stale in other workers for up
+# to `local_timeout` seconds after a change.
+AUTH_USER_CACHE = {
+    'local_size': env.int(var='AUTH_USER_CACHE_LOCAL_SIZE', default=1024),
+    'local_timeout': env.float(var='AUTH_USER_CACHE_LOCAL_TIMEOUT', default=10.0),
+    'timeout': env.int(var='AUTH_USER_CACHE_TIMEOUT', default=300),
+}
 # endregion -------------------------------------------------------------------------
 # region ------------------------------ GOOGLE ---------------------------------------
 GOOGLE_OAUTH_CLIENT_ID = env.str(var="GOOGLE_OAUTH_CLIENT_ID")
 GOOGLE_OAUTH_CLIENT_SECRET = env.str(var="GOOGLE_OAUTH_CLIENT_SECRET")
 GOOGLE_OAUTH_CALLBACK_URL = env.str(var="GOOGLE_OAUTH_CALLBACK_URL")
 BACKEND_URL = env.str(var="BACKEND_URL", default="http://localhost:8000")
+GOOGLE_OAUTH_TOKEN_URL = env.str(
+    var="GOOGLE_OAUTH_TOKEN_URL", default="https://oauth2.googleapis.com/token"
+)
+GOOGLE_OAUTH_USERINFO_URL = env.str(
+    var="GOOGLE_OAUTH_USERINFO_URL", default="https://www.googleapis.com/oauth2/v2/userinfo"
+)
+GOOGLE_OAUTH_JWKS_URL = env.str(
+    var="GOOGLE_OAUTH_JWKS_URL", default="https://www.googleapis.com/oauth2/v3/certs"
+)
+# Leeway in seconds for the `exp`/`iat` checks of Google id_tokens.
+GOOGLE_OAUTH_CLOCK_SKEW = env.int(var="GOOGLE_OAUTH_CLOCK_SKEW", default=30)
+# endregion -------------------------------------------------------------------------
+
+# region --------------------------- OUTBOUND HTTP ----------------------------------
+# Shared pooled clients of `common.http`, per upstream; `default` applies to all.
+OUTBOUND_HTTP = {
+    'default': {
+        'connect_timeout': 3.0,
+        'read_timeout': 10.0,
+        'max_connections': 20,
+        'max_keepalive_connections': 10,
+        'retries': 2,
+        'backoff': 0.2,
+        'max_backoff': 2.0,
+        'failure_threshold': 5,
+        'reset_timeout': 30.0,
+    },
+    'google': {
+        'read_timeout': env.float(var='GOOGLE_OAUTH_READ_TIMEOUT', default=5.0),
+    },
+}
 # endregion -------------------------------------------------------------------------
 
 # django-allauth (social)
@@ -305,7 +401,48 @@ LOGGING = {
             'format': '%(levelname)s %(asctime)s %(message)s',
         },
     },
+    'handlers': {
+        # Formats and writes in a background thread, see `common.logs`.
+        'requests': {
+            '()': 'common.logs.BatchQueueHandler',
+            'formatter': 'json',
+            'stream': 'ext://sys.stdout',
+            'queue_size': 10_000,
+            'batch_size': 256,
+            'flush_interval': 1.0,
+        },
+    },
+    'loggers': {
+        'api.requests': {
+            'handlers': ['requests'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+    },
+}
+
+# Sampled request logging of `common.middleware.RequestLoggingMiddleware`.
+REQUEST_LOGGING = {
+    'SAMPLE_RATE': env.float(var='REQUEST_LOGGING_SAMPLE_RATE', default=1.0),
+    # By view name or route; hot read endpoints are sampled down.
+    'ROUTE_SAMPLE_RATES': {
+        'api:user-list': 0.1,
+        'api:user-autocomplete': 0.01,
+    },
+    'ERROR_SAMPLE_RATE': 1.0,
+    'MAX_BODY_LENGTH': 2048,
+    'REDACTED_COOKIES': (
+        SIMPLE_JWT['AUTH_COOKIE'], SIMPLE_JWT['REFRESH_COOKIE'], 'sessionid', 'csrftoken',
+    ),
+}
 
+# Request phase timings of `common.metrics`: `Server-Timing` headers for
+# superusers and `SERVER_TIMING_ROLES`, histograms scraped at `/metrics`.
+METRICS = {
+    'SERVER_TIMING': True,
+    'SERVER_TIMING_ROLES': ('ADM',),
+    # Bearer token of the scrapes; `/metrics` answers 404 while it is empty.
+    'TOKEN': env.str(var='METRICS_TOKEN', default=''),
 }
 
 # endregion -------------------------------------------------------------------------
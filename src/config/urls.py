@@ -3,12 +3,15 @@ from django.contrib import admin
 from django.urls import path, include
 from drf_spectacular.views import SpectacularAPIView
 
+from common.views.metrics import MetricsView
+
 from config import settings
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/v1/', include('api.urls')),
     path('schema/', SpectacularAPIView.as_view(), name='schema'),
+    path('metrics', MetricsView.as_view(), name='metrics'),
 
 
 
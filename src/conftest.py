@@ -0,0 +1,46 @@
+"""Set up Django for running the test suites with pytest."""
+import os
+import sys
+
+import django
+from django.db import connections
+
+sys.path.insert(0, os.path.dirname(__file__))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+django.setup()
+
+from django.conf import settings  # noqa: E402
+from django.test import TransactionTestCase  # noqa: E402
+from django.test.utils import (  # noqa: E402
+    setup_databases,
+    setup_test_environment,
+    teardown_databases,
+    teardown_test_environment,
+)
+
+# The sampled request logs of test requests are noise.
+settings.REQUEST_LOGGING = {**settings.REQUEST_LOGGING, 'SAMPLE_RATE': 0.0, 'ERROR_SAMPLE_RATE': 0.0}
+
+_environment = False
+_databases = None
+
+
+def pytest_collection_finish(session) -> None:
+    """Create the test databases like `manage.py test`, when database tests were collected."""
+    global _environment, _databases
+    setup_test_environment()
+    _environment = True
+    aliases = set()
+    for item in session.items:
+        cls = getattr(item, 'cls', None)
+        if cls is not None and issubclass(cls, TransactionTestCase):
+            aliases.update(connections if cls.databases == '__all__' else cls.databases)
+    if aliases:
+        _databases = setup_databases(verbosity=0, interactive=False, aliases=aliases)
+
+
+def pytest_sessionfinish(session) -> None:
+    if _databases is not None:
+        teardown_databases(_databases, verbosity=0)
+    if _environment:
+        teardown_test_environment()
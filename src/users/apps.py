@@ -4,3 +4,10 @@ from django.apps import AppConfig
 class UsersConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'users'
+
+    def ready(self) -> None:
+        from common.generations import track_generations
+        from users.jwt.cache import track_user_cache
+
+        track_generations(self.get_model('User'))
+        track_user_cache(self.get_model('User'))
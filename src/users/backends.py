@@ -1,18 +1,24 @@
-
-
 from typing import Optional
 
 from django.contrib.auth import get_user_model
-from django.db.models import Q
+from django.contrib.auth.hashers import make_password
+from django.db.models.functions import Lower
 from rest_framework.request import Request
 
+from users.jwt.cache import user_cache
+
 User = get_user_model()
 
 
 class AuthBackend(object):
     """
     Backend authentication.
-    
+
+    The identifier is routed by its shape to one indexed lookup: an email
+    (containing `@`) is matched case-insensitively on the `lower(email)`
+    index, anything else on the unique `username` index. Usernames
+    containing `@` are tried after the email.
+
     Attributes:
         * `supports_object_permissions` (bool): supports object permissions.
         * `supports_anonymous_user` (bool): supports anonymous users.
@@ -25,25 +31,49 @@ class AuthBackend(object):
 
     @staticmethod
     def get_user(user_id: int) -> Optional[User]:
-        """Get user by ID."""
+        """Get user by ID, through the cache of authenticated users."""
 
         try:
-            return User.objects.get(pk=user_id)
+            return user_cache.get_user(user_id)
         except User.DoesNotExist:
             return None
 
     @staticmethod
+    def get_by_email(email: str) -> Optional[User]:
+        """Get the user of an email, preferring an exact match on case conflicts."""
+        users = list(User.objects.alias(email_lower=Lower('email')).filter(email_lower=email.lower())[:2])
+        if len(users) == 1:
+            return users[0]
+        return next((user for user in users if user.email == email), None)
+
+    @staticmethod
+    def get_by_username(username: str) -> Optional[User]:
+        return User.objects.filter(username=username).first()
+
+    @classmethod
+    def get_by_identifier(cls, identifier: str) -> Optional[User]:
+        """Get the user of a username or an email."""
+        if '@' in identifier:
+            return cls.get_by_email(identifier) or cls.get_by_username(identifier)
+        return cls.get_by_username(identifier)
+
+    @classmethod
     def authenticate(
+            cls,
             request: Request,
-            username: str,
-            password: str,
+            username: Optional[str] = None,
+            password: Optional[str] = None,
+            **kwargs,
     ) -> Optional[User]:
         """Check one of the authentication choices and password."""
 
-        try:
-            user = User.objects.get(
-                Q(username=username) |
-                Q(email=username))
-        except User.DoesNotExist:
+        if not username or password is None:
+            return None
+
+        user = cls.get_by_identifier(username)
+        if user is None:
+            # Hash anyway so the response time does not reveal whether
+            # the account exists.
+            make_password(password)
             return None
         return user if user.check_password(password) else None
@@ -0,0 +1,117 @@
+from typing import Optional
+
+from django.utils.translation import gettext_lazy as _
+from rest_framework.request import Request
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import Token
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from users.jwt.cache import user_cache
+from users.jwt.tokens import USER_CLAIMS, ClaimsUser
+
+
+class AsyncJWTAuthentication(JWTAuthentication):
+    """
+    `JWTAuthentication` with a native async path.
+
+    Async views (see `common.views.async_mixins`) call `aauthenticate`, which
+    loads the user with `aget` instead of hopping to a thread. Sync views
+    keep using `authenticate`.
+    """
+
+    async def aauthenticate(self, request: Request) -> Optional[tuple]:
+        """Authenticate the request without blocking the event loop."""
+        header = self.get_header(request)
+        if header is None:
+            return None
+
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+
+        validated_token = self.get_validated_token(raw_token)
+        return await self.aget_user(validated_token), validated_token
+
+    @staticmethod
+    def get_user_id(validated_token: Token):
+        """Get the user identifier claim of the token."""
+        try:
+            return validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_('Token contained no recognizable user identification'))
+
+    @staticmethod
+    def check_user(user, validated_token: Token) -> None:
+        """Reject inactive users and tokens issued before a password change."""
+        if not user.is_active:
+            raise AuthenticationFailed(_('User is inactive'), code='user_inactive')
+
+        if api_settings.CHECK_REVOKE_TOKEN and validated_token.get(
+                api_settings.REVOKE_TOKEN_CLAIM
+        ) != get_md5_hash_password(user.password):
+            raise AuthenticationFailed(
+                _("The user's password has been changed."), code='password_changed'
+            )
+
+    async def aget_user(self, validated_token: Token):
+        """Find the user of the token with the async ORM."""
+        user_id = self.get_user_id(validated_token)
+        try:
+            user = await self.user_model.objects.aget(**{api_settings.USER_ID_FIELD: user_id})
+        except self.user_model.DoesNotExist:
+            raise AuthenticationFailed(_('User not found'), code='user_not_found')
+
+        self.check_user(user, validated_token)
+        return user
+
+
+class CachedJWTAuthentication(AsyncJWTAuthentication):
+    """
+    JWT authentication resolving users through `users.jwt.cache.user_cache`.
+
+    Cache hits cost no query; the active and password checks still run on
+    the cached user, which is dropped on every save of the user.
+    """
+
+    def get_user(self, validated_token: Token):
+        try:
+            user = user_cache.get_user(self.get_user_id(validated_token))
+        except self.user_model.DoesNotExist:
+            raise AuthenticationFailed(_('User not found'), code='user_not_found')
+
+        self.check_user(user, validated_token)
+        return user
+
+    async def aget_user(self, validated_token: Token):
+        try:
+            user = await user_cache.aget_user(self.get_user_id(validated_token))
+        except self.user_model.DoesNotExist:
+            raise AuthenticationFailed(_('User not found'), code='user_not_found')
+
+        self.check_user(user, validated_token)
+        return user
+
+
+class ClaimsJWTAuthentication(CachedJWTAuthentication):
+    """
+    JWT authentication trusting the signed `USER_CLAIMS` of the token.
+
+    `request.user` is a `ClaimsUser`, so permission checks on `role` and
+    `is_superuser` never touch the database. Deactivation, password and
+    role changes only take effect at the next refresh, so use it on read
+    endpoints only. Tokens without the claims fall back to the cache.
+    """
+
+    def get_user(self, validated_token: Token):
+        if all(claim in validated_token for claim in USER_CLAIMS):
+            self.get_user_id(validated_token)
+            return ClaimsUser(validated_token)
+        return super().get_user(validated_token)
+
+    async def aget_user(self, validated_token: Token):
+        if all(claim in validated_token for claim in USER_CLAIMS):
+            self.get_user_id(validated_token)
+            return ClaimsUser(validated_token)
+        return await super().aget_user(validated_token)
@@ -0,0 +1,166 @@
+"""
+Two-tier cache of authenticated users.
+
+The first tier is a per-process LRU, the second the shared cache backend.
+Saving or deleting a user drops its entry from both tiers once the
+transaction commits. That covers role and password changes made with
+`save()`. Writes with `QuerySet.update()` bypass the signals and must call
+`user_cache.invalidate()` themselves.
+
+Other processes only learn about an invalidation through the shared tier,
+so their local entries stay usable for at most `local_timeout` seconds.
+"""
+import copy
+import threading
+import time
+from collections import OrderedDict
+from functools import partial
+from typing import Any, Optional
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.db import models, transaction
+from django.db.models.signals import post_delete, post_save
+
+User = get_user_model()
+
+
+class UserCache:
+    """
+    Users by primary key, in a process LRU backed by a shared cache.
+
+    Cached instances are copied on the way out, so a request modifying its
+    user does not change what other requests see.
+
+    Attributes:
+        * `local_size` (int): maximum entries of the process LRU
+        * `local_timeout` (float): seconds a process entry is trusted
+        * `timeout` (int): TTL of shared entries in seconds
+        * `cache_alias` (str)
+    """
+
+    key_prefix = 'auth:user'
+
+    def __init__(
+            self,
+            local_size: int = 1024,
+            local_timeout: float = 10.0,
+            timeout: int = 300,
+            cache_alias: str = 'default',
+    ) -> None:
+        self.local_size = local_size
+        self.local_timeout = local_timeout
+        self.timeout = timeout
+        self.cache_alias = cache_alias
+        self._local: OrderedDict[Any, tuple[float, User]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def cache(self):
+        return caches[self.cache_alias]
+
+    def get_cache_key(self, pk: Any) -> str:
+        return f'{self.key_prefix}:{pk}'
+
+    def get_local(self, pk: Any) -> Optional[User]:
+        """Get a fresh entry of the process LRU."""
+        with self._lock:
+            entry = self._local.get(pk)
+            if entry is None:
+                return None
+            if entry[0] <= time.monotonic():
+                del self._local[pk]
+                return None
+            self._local.move_to_end(pk)
+            return entry[1]
+
+    def set_local(self, user: User) -> None:
+        """Store a user in the process LRU, evicting the oldest entries."""
+        if self.local_size <= 0 or self.local_timeout <= 0:
+            return
+        with self._lock:
+            self._local[user.pk] = (time.monotonic() + self.local_timeout, user)
+            self._local.move_to_end(user.pk)
+            while len(self._local) > self.local_size:
+                self._local.popitem(last=False)
+
+    def get(self, pk: Any) -> Optional[User]:
+        """Get a cached user."""
+        user = self.get_local(pk)
+        if user is None:
+            user = self.cache.get(self.get_cache_key(pk))
+            if user is None:
+                return None
+            self.set_local(user)
+        return copy.copy(user)
+
+    async def aget(self, pk: Any) -> Optional[User]:
+        """Get a cached user from async code."""
+        user = self.get_local(pk)
+        if user is None:
+            user = await self.cache.aget(self.get_cache_key(pk))
+            if user is None:
+                return None
+            self.set_local(user)
+        return copy.copy(user)
+
+    def set(self, user: User) -> None:
+        """Cache a user in both tiers."""
+        self.cache.set(self.get_cache_key(user.pk), user, self.timeout)
+        self.set_local(copy.copy(user))
+
+    async def aset(self, user: User) -> None:
+        """Cache a user in both tiers from async code."""
+        await self.cache.aset(self.get_cache_key(user.pk), user, self.timeout)
+        self.set_local(copy.copy(user))
+
+    def get_user(self, pk: Any) -> User:
+        """Get a user from the cache or the database; raises `DoesNotExist`."""
+        user = self.get(pk)
+        if user is None:
+            user = User.objects.get(pk=pk)
+            self.set(user)
+        return user
+
+    async def aget_user(self, pk: Any) -> User:
+        """Get a user from the cache or the database from async code."""
+        user = await self.aget(pk)
+        if user is None:
+            user = await User.objects.aget(pk=pk)
+            await self.aset(user)
+        return user
+
+    def discard(self, pk: Any) -> None:
+        """Drop a user from both tiers now."""
+        with self._lock:
+            self._local.pop(pk, None)
+        self.cache.delete(self.get_cache_key(pk))
+
+    def invalidate(self, pk: Any, using: Optional[str] = None) -> None:
+        """Drop a user now and again after the current transaction commits."""
+        self.discard(pk)
+        # A concurrent request may cache the old row before the commit.
+        transaction.on_commit(partial(self.discard, pk), using=using)
+
+    def clear_local(self) -> None:
+        with self._lock:
+            self._local.clear()
+
+
+user_cache = UserCache(**getattr(settings, 'AUTH_USER_CACHE', {}))
+
+
+def _on_write(sender: type[models.Model], instance: models.Model, using: str = None, **kwargs) -> None:
+    """Signal receiver invalidating a saved or deleted user."""
+    if kwargs.get('created'):
+        # Nothing can be cached for a new primary key.
+        return
+    user_cache.invalidate(instance.pk, using=using)
+
+
+def track_user_cache(model: type[models.Model]) -> None:
+    """Invalidate cached users on instance saves and deletes through signals."""
+    uid = f'user_cache:{model._meta.label}'
+    post_save.connect(_on_write, sender=model, dispatch_uid=uid)
+    post_delete.connect(_on_write, sender=model, dispatch_uid=uid)
@@ -0,0 +1,370 @@
+"""
+Revoked refresh tokens, by `jti`.
+
+Rotation revokes every refresh token used once, and logging out revokes
+the token of the cookie. Entries only live until the token expires: an
+expired token is rejected by its `exp` claim anyway. The store is chosen
+by the `TOKEN_REVOCATION` setting:
+
+    TOKEN_REVOCATION = {
+        'BACKEND': 'users.jwt.revocation.CacheRevocationStore',
+        'OPTIONS': {'cache_alias': 'default'},
+        'BLOOM': {'capacity': 100_000, 'error_rate': 0.001},
+    }
+
+`BLOOM` puts a `BloomRevocationStore` in front of the backend, answering
+most lookups of tokens that were never revoked in process.
+
+    from users.jwt.revocation import get_revocation_store
+
+    get_revocation_store().revoke(jti, expires_at)
+"""
+import hashlib
+import math
+import threading
+import time
+from typing import Optional
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.signals import setting_changed
+from django.utils.module_loading import import_string
+
+DEFAULTS = {
+    'BACKEND': 'users.jwt.revocation.CacheRevocationStore',
+    'OPTIONS': {},
+    'BLOOM': None,
+}
+
+
+def get_timeout(expires_at: int) -> int:
+    """Seconds an entry of a token expiring at `expires_at` must live."""
+    return max(int(expires_at - time.time()), 1)
+
+
+class RevocationStore:
+    """Base class of revocation stores."""
+
+    def revoke(self, jti: str, expires_at: int) -> bool:
+        """
+        Revoke a token until it expires.
+
+        Returns whether the token was newly revoked: of concurrent calls
+        for one token only a single one gets `True`.
+        """
+        raise NotImplementedError
+
+    def is_revoked(self, jti: str, expires_at: int) -> bool:
+        """Check whether a token was revoked."""
+        raise NotImplementedError
+
+    def purge(self) -> int:
+        """Drop the entries of expired tokens, returning their number."""
+        return 0
+
+
+class MemoryRevocationStore(RevocationStore):
+    """
+    Revocations kept in a dict of the process.
+
+    Only suitable for a single worker and tests: other processes do not see
+    the revocations. Expired entries are dropped by `purge()`, which runs
+    every `purge_every` revocations.
+    """
+
+    def __init__(self, purge_every: int = 1000) -> None:
+        self.purge_every = purge_every
+        self._entries: dict[str, int] = {}
+        self._revoked = 0
+        self._lock = threading.Lock()
+
+    def revoke(self, jti: str, expires_at: int) -> bool:
+        with self._lock:
+            if self._entries.get(jti, 0) > time.time():
+                return False
+            self._entries[jti] = expires_at
+            self._revoked += 1
+            purge = self._revoked % self.purge_every == 0
+        if purge:
+            self.purge()
+        return True
+
+    def is_revoked(self, jti: str, expires_at: int) -> bool:
+        return self._entries.get(jti, 0) > time.time()
+
+    def purge(self) -> int:
+        now = time.time()
+        with self._lock:
+            expired = [jti for jti, expires_at in self._entries.items() if expires_at <= now]
+            for jti in expired:
+                del self._entries[jti]
+        return len(expired)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class CacheRevocationStore(RevocationStore):
+    """
+    Revocations kept in a cache backend, one key per `jti`.
+
+    With the Redis cache the revocations are shared by all workers and
+    every key expires with its token, so there is nothing to purge.
+
+    Attributes:
+        * `cache_alias` (str)
+        * `key_prefix` (str)
+    """
+
+    def __init__(self, cache_alias: str = 'default', key_prefix: str = 'revoked') -> None:
+        self.cache_alias = cache_alias
+        self.key_prefix = key_prefix
+
+    @property
+    def cache(self):
+        return caches[self.cache_alias]
+
+    def get_cache_key(self, jti: str) -> str:
+        return f'{self.key_prefix}:{jti}'
+
+    def revoke(self, jti: str, expires_at: int) -> bool:
+        return self.cache.add(self.get_cache_key(jti), expires_at, get_timeout(expires_at))
+
+    def is_revoked(self, jti: str, expires_at: int) -> bool:
+        return self.cache.get(self.get_cache_key(jti)) is not None
+
+
+class BloomFilter:
+    """
+    Bloom filter of strings.
+
+    Sized for `capacity` items at a false positive rate of `error_rate`;
+    positions come from double hashing one BLAKE2b digest.
+    """
+
+    def __init__(self, capacity: int, error_rate: float) -> None:
+        self.size = max(int(-capacity * math.log(error_rate) / math.log(2) ** 2), 8)
+        self.hashes = max(round(self.size / capacity * math.log(2)), 1)
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def get_positions(self, item: str) -> list[int]:
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], 'little')
+        second = int.from_bytes(digest[8:], 'little') | 1
+        return [(first + i * second) % self.size for i in range(self.hashes)]
+
+    def add(self, item: str) -> None:
+        for position in self.get_positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, item: str) -> bool:
+        return all(
+            self.bits[position >> 3] & (1 << (position & 7))
+            for position in self.get_positions(item)
+        )
+
+
+class BloomRevocationStore(RevocationStore):
+    """
+    In-process Bloom filter in front of a revocation store.
+
+    A token missing from the filter was never revoked, so most lookups cost
+    no cache round trip; only filter hits ask the store. There is a filter
+    per `window` seconds of token expiry, dropped once its tokens expired.
+
+    Revocations of other workers reach the filter through a log in the
+    shared cache: a counter and one entry per revocation, expiring with
+    the token. The filter reads new entries at most every `sync_interval`
+    seconds, so a token revoked by another worker may still be accepted
+    here for that long. Entries missing when read may still be being
+    written, so they are retried until a `purge()` run proves them expired.
+
+    Attributes:
+        * `store` (RevocationStore): the authoritative store
+        * `capacity` (int): revocations per window at `error_rate`
+        * `error_rate` (float): false positive rate of a full filter
+        * `window` (int): seconds of token expiry per filter
+        * `sync_interval` (float): seconds between log reads
+        * `cache_alias` (str): cache of the log
+    """
+
+    key_prefix = 'revoked:log'
+    batch_size = 1000
+
+    def __init__(
+            self,
+            store: RevocationStore,
+            capacity: int = 100_000,
+            error_rate: float = 0.001,
+            window: int = 86400,
+            sync_interval: float = 1.0,
+            cache_alias: str = 'default',
+    ) -> None:
+        self.store = store
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.window = window
+        self.sync_interval = sync_interval
+        self.cache_alias = cache_alias
+        self.filters: dict[int, BloomFilter] = {}
+        self.seq = None
+        self.pending: set[int] = set()
+        self.synced_at = None
+        self._lock = threading.Lock()
+
+    @property
+    def cache(self):
+        return caches[self.cache_alias]
+
+    @property
+    def seq_key(self) -> str:
+        return f'{self.key_prefix}:seq'
+
+    @property
+    def floor_key(self) -> str:
+        return f'{self.key_prefix}:floor'
+
+    @property
+    def mark_key(self) -> str:
+        return f'{self.key_prefix}:mark'
+
+    def get_entry_key(self, seq: int) -> str:
+        return f'{self.key_prefix}:{seq}'
+
+    def get_filter(self, expires_at: int, create: bool = False) -> Optional[BloomFilter]:
+        """Get the filter of the expiry window of a token."""
+        index = expires_at // self.window
+        bloom = self.filters.get(index)
+        if bloom is None and create:
+            bloom = self.filters[index] = BloomFilter(self.capacity, self.error_rate)
+        return bloom
+
+    def add(self, jti: str, expires_at: int) -> None:
+        if expires_at > time.time():
+            self.get_filter(expires_at, create=True).add(jti)
+
+    def append_log(self, jti: str, expires_at: int) -> None:
+        """Publish a revocation to the filters of other workers."""
+        cache = self.cache
+        cache.add(self.seq_key, 0, None)
+        seq = cache.incr(self.seq_key)
+        cache.set(self.get_entry_key(seq), (jti, expires_at), get_timeout(expires_at))
+
+    def read_log(self, seqs: list[int]) -> set[int]:
+        """Add logged revocations to the filters, returning the missing `seqs`."""
+        missing = set()
+        for start in range(0, len(seqs), self.batch_size):
+            batch = seqs[start:start + self.batch_size]
+            entries = self.cache.get_many([self.get_entry_key(seq) for seq in batch])
+            for seq in batch:
+                entry = entries.get(self.get_entry_key(seq))
+                if entry is None:
+                    missing.add(seq)
+                else:
+                    self.add(*entry)
+        return missing
+
+    def sync(self, force: bool = False) -> None:
+        """Read the revocations logged by other workers since the last sync."""
+        now = time.monotonic()
+        if not force and self.synced_at is not None and now - self.synced_at < self.sync_interval:
+            return
+        with self._lock:
+            floor, head, mark = self.get_log_bounds()
+            start = floor if self.seq is None else max(self.seq, floor)
+            pending = sorted(seq for seq in self.pending if seq > max(floor, mark))
+            self.pending = self.read_log(pending + list(range(start + 1, head + 1)))
+            self.seq = max(start, head)
+            self.drop_expired()
+            self.synced_at = now
+
+    def get_log_bounds(self) -> tuple[int, int, int]:
+        """Get the floor, the head and the purge mark sequences of the log."""
+        values = self.cache.get_many([self.floor_key, self.seq_key, self.mark_key])
+        return values.get(self.floor_key, 0), values.get(self.seq_key, 0), values.get(self.mark_key, 0)
+
+    def drop_expired(self) -> None:
+        """Drop the filters whose tokens all expired."""
+        current = int(time.time()) // self.window
+        for index in [index for index in self.filters if index < current]:
+            del self.filters[index]
+
+    def revoke(self, jti: str, expires_at: int) -> bool:
+        if not self.store.revoke(jti, expires_at):
+            return False
+        with self._lock:
+            self.add(jti, expires_at)
+        self.append_log(jti, expires_at)
+        return True
+
+    def is_revoked(self, jti: str, expires_at: int) -> bool:
+        self.sync()
+        bloom = self.get_filter(expires_at)
+        if bloom is None or jti not in bloom:
+            return False
+        return self.store.is_revoked(jti, expires_at)
+
+    def purge(self) -> int:
+        """
+        Move the log floor past its expired entries.
+
+        Entries missing below the head seen by the previous purge are
+        expired; later ones may still be being written.
+        """
+        purged = self.store.purge()
+        cache = self.cache
+        floor, head, mark = self.get_log_bounds()
+        mark = min(mark, head)
+        seq = floor
+        while seq < mark:
+            batch = range(seq + 1, min(seq + self.batch_size, mark) + 1)
+            entries = cache.get_many([self.get_entry_key(number) for number in batch])
+            missing = 0
+            for number in batch:
+                if self.get_entry_key(number) in entries:
+                    break
+                missing += 1
+            seq += missing
+            if missing < len(batch):
+                break
+        if seq > floor:
+            cache.set(self.floor_key, seq, None)
+        cache.set(self.mark_key, head, None)
+        with self._lock:
+            self.drop_expired()
+        return purged + seq - floor
+
+
+_store: Optional[RevocationStore] = None
+_store_lock = threading.Lock()
+
+
+def build_revocation_store(config: dict) -> RevocationStore:
+    """Build the store of a `TOKEN_REVOCATION` configuration."""
+    config = {**DEFAULTS, **config}
+    store = import_string(config['BACKEND'])(**config['OPTIONS'])
+    if config['BLOOM'] is not None:
+        store = BloomRevocationStore(store, **config['BLOOM'])
+    return store
+
+
+def get_revocation_store() -> RevocationStore:
+    """Get the shared store of the `TOKEN_REVOCATION` setting."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = build_revocation_store(getattr(settings, 'TOKEN_REVOCATION', {}))
+    return _store
+
+
+def reset_revocation_store(**kwargs) -> None:
+    """Drop the shared store, e.g. when `TOKEN_REVOCATION` changes in tests."""
+    global _store
+    if kwargs.get('setting', 'TOKEN_REVOCATION') != 'TOKEN_REVOCATION':
+        return
+    with _store_lock:
+        _store = None
+
+
+setting_changed.connect(reset_revocation_store)
@@ -0,0 +1,54 @@
+from typing import Any
+
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.serializers import (
+    TokenObtainPairSerializer,
+    TokenRefreshSerializer,
+    TokenVerifySerializer,
+)
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import UntypedToken
+
+from users.jwt.authentication import AsyncJWTAuthentication
+from users.jwt.cache import User, user_cache
+from users.jwt.tokens import UserRefreshToken, set_user_claims
+
+
+class UserTokenObtainPairSerializer(TokenObtainPairSerializer):
+    """Login issuing tokens with the user claims."""
+
+    token_class = UserRefreshToken
+
+
+class UserTokenRefreshSerializer(TokenRefreshSerializer):
+    """
+    Refresh stamping the current user claims into the new tokens.
+
+    A role change thus reaches claims-authenticated endpoints at the next
+    refresh, at most `ACCESS_TOKEN_LIFETIME` later.
+    """
+
+    token_class = UserRefreshToken
+
+    def validate(self, attrs: dict[str, Any]) -> dict[str, str]:
+        refresh = self.token_class(attrs['refresh'])
+        try:
+            user = user_cache.get_user(AsyncJWTAuthentication.get_user_id(refresh))
+        except User.DoesNotExist:
+            raise AuthenticationFailed(_('User not found'), code='user_not_found')
+        if not user.is_active:
+            raise AuthenticationFailed(_('User is inactive'), code='user_inactive')
+
+        set_user_claims(refresh, user)
+        return super().validate({**attrs, 'refresh': str(refresh)})
+
+
+class UserTokenVerifySerializer(TokenVerifySerializer):
+    """Verification also rejecting revoked refresh tokens."""
+
+    def validate(self, attrs: dict[str, Any]) -> dict:
+        token = UntypedToken(attrs['token'])
+        if token.get(api_settings.TOKEN_TYPE_CLAIM) == UserRefreshToken.token_type:
+            UserRefreshToken(attrs['token'], verify=False).check_blacklist()
+        return {}
@@ -1,6 +1,18 @@
+from typing import Optional
+
+from django.contrib.auth import get_user_model
+from django.utils.functional import cached_property
+from django.utils.translation import gettext_lazy as _
 from rest_framework.response import Response
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken, Token
 
 from config import settings
+from users.jwt.revocation import get_revocation_store
+
+User = get_user_model()
 
 
 def set_refresh_cookie(response: Response, refresh_token: str) -> None:
@@ -12,3 +24,71 @@ def set_refresh_cookie(response: Response, refresh_token: str) -> None:
         secure=False,  # Меняйте на True в продакшене
         samesite='Lax',
     )
+
+
+def get_refresh_cookie(request) -> Optional[str]:
+    """Получает refresh_token из cookie"""
+    return request.COOKIES.get(settings.SIMPLE_JWT.get('REFRESH_COOKIE', 'refresh_token'))
+
+
+def delete_refresh_cookie(response: Response) -> None:
+    """Удаляет cookie с refresh_token"""
+    response.delete_cookie(
+        settings.SIMPLE_JWT.get('REFRESH_COOKIE', 'refresh_token'), samesite='Lax'
+    )
+
+
+# Claims read by `ClaimsJWTAuthentication` instead of loading the user.
+USER_CLAIMS = ('role', 'is_superuser')
+
+
+def set_user_claims(token: Token, user) -> None:
+    """Copy the permission-relevant fields of the user into the token."""
+    token['role'] = user.role
+    token['is_superuser'] = user.is_superuser
+
+
+class UserRefreshToken(RefreshToken):
+    """
+    Refresh token whose access tokens carry `USER_CLAIMS`.
+
+    Revocation goes through `users.jwt.revocation` instead of the
+    `token_blacklist` app, so rotation with `BLACKLIST_AFTER_ROTATION`
+    rejects reused refresh tokens. The revocation itself is the check:
+    of concurrent refreshes with one token only the first one rotates.
+    """
+
+    def verify(self, *args, **kwargs) -> None:
+        super().verify(*args, **kwargs)
+        self.check_blacklist()
+
+    def check_blacklist(self) -> None:
+        """Raise `TokenError` if the token was revoked."""
+        if get_revocation_store().is_revoked(self[api_settings.JTI_CLAIM], self['exp']):
+            raise TokenError(_('Token is blacklisted'))
+
+    def blacklist(self) -> None:
+        """Revoke the token until it expires, raising `TokenError` if it already was."""
+        if not get_revocation_store().revoke(self[api_settings.JTI_CLAIM], self['exp']):
+            raise TokenError(_('Token is blacklisted'))
+
+    @classmethod
+    def for_user(cls, user) -> 'UserRefreshToken':
+        token = super().for_user(user)
+        set_user_claims(token, user)
+        return token
+
+
+class ClaimsUser(TokenUser):
+    """
+    Stateless user built from the claims of a validated token.
+
+    Enough for permission checks (`role`, `is_superuser`, `pk`), not for
+    writes: it cannot be assigned to foreign keys.
+    """
+
+    Role = User.Role
+
+    @cached_property
+    def role(self) -> str:
+        return self.token.get('role', '')
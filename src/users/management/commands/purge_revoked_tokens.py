@@ -0,0 +1,18 @@
+from django.core.management import BaseCommand
+
+from users.jwt.revocation import get_revocation_store
+
+
+class Command(BaseCommand):
+    """
+    Drop the revocations of expired refresh tokens.
+
+    Run it periodically (cron, celery beat). Cache entries expire on their
+    own; with the Bloom front it also moves the floor of the revocation log.
+    """
+
+    help = 'Purge revocations of expired refresh tokens.'
+
+    def handle(self, *args, **options) -> None:
+        purged = get_revocation_store().purge()
+        self.stdout.write(f'Purged {purged} expired revocations.')
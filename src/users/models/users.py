@@ -1,5 +1,7 @@
 from django.contrib.auth.models import AbstractUser
+from django.contrib.postgres.indexes import GinIndex
 from django.db import models
+from django.db.models.functions import Lower
 from django.utils.translation import gettext_lazy as _
 
 from users.managers.users import CustomUserManager
@@ -55,6 +57,15 @@ class User(AbstractUser):
     class Meta:
         verbose_name = 'User'
         verbose_name_plural = 'Users'
+        indexes = [
+            # Case-insensitive login by email, see `users.backends.AuthBackend`.
+            models.Index(Lower('email'), name='users_email_lower_idx'),
+            # Prefix and fuzzy autocomplete, see `common.filters.TrigramAutocompleteFilter`.
+            GinIndex(fields=['username'], name='users_username_trgm_idx', opclasses=['gin_trgm_ops']),
+            GinIndex(fields=['email'], name='users_email_trgm_idx', opclasses=['gin_trgm_ops']),
+            GinIndex(fields=['first_name'], name='users_first_name_trgm_idx', opclasses=['gin_trgm_ops']),
+            GinIndex(fields=['last_name'], name='users_last_name_trgm_idx', opclasses=['gin_trgm_ops']),
+        ]
 
 
     def __str__(self) -> str:
@@ -1,15 +1,36 @@
-from crum import get_current_user
+from contextlib import nullcontext
+from functools import lru_cache
+
+from asgiref.sync import sync_to_async
 from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
 from django.contrib.auth.password_validation import validate_password
-from django.db import transaction
+from django.db import IntegrityError, connections, models, router, transaction
 from djoser import serializers as djoser_serializers
 from rest_framework import serializers
 from rest_framework.exceptions import ParseError
-from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+
+from common.current import get_current_user
+from common.serializers.mixins import SparseFieldsMixin
+from users.jwt.serializers import UserTokenObtainPairSerializer
 
 User = get_user_model()
 
 
+@lru_cache(maxsize=None)
+def get_unique_fields(model: type[models.Model], using: str) -> dict[str, str]:
+    """Map the names of the single-column unique constraints of a table to their fields."""
+    connection = connections[using]
+    with connection.cursor() as cursor:
+        constraints = connection.introspection.get_constraints(cursor, model._meta.db_table)
+    fields = {field.column: field.name for field in model._meta.concrete_fields}
+    return {
+        name: fields[constraint['columns'][0]]
+        for name, constraint in constraints.items()
+        if constraint['unique'] and len(constraint['columns']) == 1 and constraint['columns'][0] in fields
+    }
+
+
 class RegistrationSerializer(djoser_serializers.UserCreateSerializer):
     """
     User registration serializer.
@@ -30,14 +51,18 @@ class RegistrationSerializer(djoser_serializers.UserCreateSerializer):
     class Meta(djoser_serializers.UserCreateSerializer.Meta):
         model = User
         fields = ('id', 'first_name', 'last_name', 'username', 'email', 'role', 'password', 'confirm_password')
+        # Uniqueness is enforced by the constraints on INSERT, see `insert()`.
+        extra_kwargs = {'username': {'validators': []}}
+
+    conflict_messages = {
+        'email': 'A user with this email is already registered.',
+        'username': 'A user with this username is already registered.',
+    }
 
     @staticmethod
     def validate_email(value: str) -> str:
-        """Ensure email uniqueness."""
-        email = value.lower()
-        if User.objects.filter(email=email).exists():
-            raise ParseError('A user with this email is already registered.')
-        return email
+        """Normalize the email; uniqueness is checked by the INSERT."""
+        return value.lower()
 
     def validate(self, attrs: dict[str, str]) -> dict[str, str]:
         """Validate that passwords match and meet security requirements."""
@@ -49,26 +74,59 @@ class RegistrationSerializer(djoser_serializers.UserCreateSerializer):
 
         return attrs
 
+    def get_conflict_error(self, exc: IntegrityError, using: str) -> ParseError:
+        """Map a unique violation to the error of the conflicting field."""
+        # Set by the PostgreSQL drivers, not by the text of the error.
+        constraint = getattr(getattr(exc.__cause__, 'diag', None), 'constraint_name', None)
+        field = get_unique_fields(User, using).get(constraint)
+        if field in self.conflict_messages:
+            return ParseError(self.conflict_messages[field])
+        return ParseError('A user with these credentials is already registered.')
+
+    def insert(self, user: User) -> None:
+        """Save a new user with a single INSERT."""
+        using = router.db_for_write(User, instance=user)
+        try:
+            # A savepoint is only needed to keep an outer transaction usable.
+            with transaction.atomic(using) if transaction.get_connection(using).in_atomic_block else nullcontext():
+                user.save(force_insert=True, using=using)
+        except IntegrityError as exc:
+            raise self.get_conflict_error(exc, using)
 
-    def create(self, validated_data):
-        password = validated_data.pop("password")  
-        user = User.objects.create(**validated_data)
-        user.set_password(password)  
-        user.save()  
-
-        tokens = TokenObtainPairSerializer().get_token(user)
-        access_token = str(tokens.access_token)
-        refresh_token = str(tokens)
-
+    @staticmethod
+    def get_tokens(user: User) -> dict:
+        tokens = UserTokenObtainPairSerializer.get_token(user)
         return {
             "user": user.id,
-            "access": access_token,
-            "refresh": refresh_token
+            "access": str(tokens.access_token),
+            "refresh": str(tokens),
         }
 
-
-
-class UserSerializer(serializers.ModelSerializer):
+    def create(self, validated_data):
+        password = validated_data.pop("password")
+        user = User(**validated_data)
+        user.password = make_password(password)
+        self.insert(user)
+        return self.get_tokens(user)
+
+    async def acreate(self, validated_data):
+        """`create()` for async views, hashing the password in a worker thread."""
+        password = validated_data.pop("password")
+        user = User(**validated_data)
+        # Hashing is CPU bound; it must neither block the event loop nor
+        # queue behind the single thread of thread-sensitive calls.
+        user.password = await sync_to_async(make_password, thread_sensitive=False)(password)
+        await sync_to_async(self.insert)(user)
+        return self.get_tokens(user)
+
+    async def asave(self, **kwargs):
+        """`save()` for async views."""
+        assert not self.errors, 'You cannot call `.asave()` on a serializer with invalid data.'
+        self.instance = await self.acreate({**self.validated_data, **kwargs})
+        return self.instance
+
+
+class UserSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """
     User serializer with profile information.
     """
@@ -151,7 +209,7 @@ class UserUpdateSerializer(serializers.ModelSerializer):
         return instance
 
 
-class UserListSearchSerializer(serializers.ModelSerializer):
+class UserListSearchSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Serializer for user search."""
 
     class Meta:
@@ -0,0 +1,276 @@
+"""
+Google OAuth 2.0 calls of the login callback.
+
+Requests go through the shared `google` client of `common.http`, so they
+are pooled, bounded by timeouts and fail fast while Google is down. Both a
+sync and an async variant are provided.
+
+The email is read from the `id_token` of the code exchange, verified
+locally against Google's signing keys (`GoogleKeys`), so a login costs one
+round trip to Google. The user info endpoint is only called when the
+exchange returns no `id_token` (the `openid` scope was not requested).
+"""
+import re
+import threading
+import time
+from typing import Any, Optional
+
+import httpx
+import jwt
+from django.conf import settings
+from django.core.cache import cache
+from jwt import PyJWK, PyJWKSet
+
+from common.http import OutboundError, get_client
+
+CLIENT_NAME = 'google'
+ISSUERS = ('https://accounts.google.com', 'accounts.google.com')
+ID_TOKEN_ALGORITHMS = ('RS256',)
+REQUIRED_CLAIMS = ('exp', 'iat', 'iss', 'aud', 'sub')
+
+MAX_AGE_RE = re.compile(r'max-age=(\d+)')
+
+
+class GoogleOAuthError(Exception):
+    """Google rejected the request or answered with something unusable."""
+
+    def __init__(self, error: str) -> None:
+        super().__init__(error)
+        self.error = error
+
+
+def get_token_data(code: str) -> dict[str, str]:
+    """Form of the authorization code exchange."""
+    return {
+        'code': code,
+        'client_id': settings.GOOGLE_OAUTH_CLIENT_ID,
+        'client_secret': settings.GOOGLE_OAUTH_CLIENT_SECRET,
+        'redirect_uri': settings.GOOGLE_OAUTH_CALLBACK_URL,
+        'grant_type': 'authorization_code',
+    }
+
+
+def parse_json(response: httpx.Response) -> dict[str, Any]:
+    """Decode a JSON object, treating server errors and garbage as outages."""
+    if response.status_code >= 500:
+        raise OutboundError(f'Google answered {response.status_code}')
+    try:
+        data = response.json()
+    except ValueError:
+        raise GoogleOAuthError('invalid_response')
+    if not isinstance(data, dict):
+        raise GoogleOAuthError('invalid_response')
+    return data
+
+
+def parse_token(response: httpx.Response) -> dict[str, Any]:
+    """Get the token data of the code exchange response."""
+    data = parse_json(response)
+    if 'error' in data:
+        raise GoogleOAuthError(data['error'])
+    if not data.get('access_token'):
+        raise GoogleOAuthError('invalid_response')
+    return data
+
+
+def parse_email(response: httpx.Response) -> str:
+    """Get the email of the user info response."""
+    data = parse_json(response)
+    if 'email' not in data:
+        raise GoogleOAuthError('Failed to retrieve user info')
+    return data['email']
+
+
+def get_max_age(response: httpx.Response, default: int) -> int:
+    """Get the freshness lifetime of a response from `Cache-Control`."""
+    match = MAX_AGE_RE.search(response.headers.get('Cache-Control', ''))
+    return int(match.group(1)) if match else default
+
+
+class GoogleKeys:
+    """
+    Google's id_token signing keys (JWKS).
+
+    Keys are kept in process and in the cache backend for the `max-age` of
+    the JWKS response, so processes share one fetch per rotation period. An
+    unknown `kid` means Google rotated its keys: the set is fetched again,
+    at most once per `refetch_interval` seconds so forged tokens cannot
+    make us hammer Google.
+
+    Attributes:
+        * `cache_key` (str)
+        * `default_max_age` (int): lifetime when `Cache-Control` has none
+        * `refetch_interval` (float): seconds between unknown-`kid` refetches
+    """
+
+    cache_key = 'google:jwks'
+
+    def __init__(self, default_max_age: int = 3600, refetch_interval: float = 60.0) -> None:
+        self.default_max_age = default_max_age
+        self.refetch_interval = refetch_interval
+        self.keys: dict[str, PyJWK] = {}
+        self.expires_at = 0.0
+        self.fetched_at = None
+        self._lock = threading.Lock()
+
+    def lookup(self, kid: str) -> Optional[PyJWK]:
+        """Get a key of the in-process set while it is fresh."""
+        if time.time() >= self.expires_at:
+            return None
+        return self.keys.get(kid)
+
+    def load(self, entry: Optional[dict]) -> None:
+        """Replace the in-process set with a fresh `{'jwks', 'expires_at'}` entry."""
+        if not entry or entry['expires_at'] <= time.time():
+            return
+        try:
+            keys = PyJWKSet.from_dict(entry['jwks']).keys
+        except jwt.PyJWKSetError:
+            return
+        with self._lock:
+            self.keys = {key.key_id: key for key in keys if key.key_id}
+            self.expires_at = entry['expires_at']
+
+    def may_fetch(self) -> bool:
+        """Check that the set expired or was not fetched recently."""
+        return (
+                time.time() >= self.expires_at
+                or self.fetched_at is None
+                or time.monotonic() - self.fetched_at >= self.refetch_interval
+        )
+
+    def build_entry(self, response: httpx.Response) -> tuple[dict, int]:
+        """Build the cache entry of a JWKS response and its lifetime."""
+        jwks = parse_json(response)
+        max_age = get_max_age(response, self.default_max_age)
+        self.fetched_at = time.monotonic()
+        return {'jwks': jwks, 'expires_at': time.time() + max_age}, max_age
+
+    def get_key(self, kid: str) -> PyJWK:
+        """Get the key of `kid`, fetching the set when needed."""
+        key = self.lookup(kid)
+        if key is None:
+            self.load(cache.get(self.cache_key))
+            key = self.lookup(kid)
+        if key is None and self.may_fetch():
+            response = get_client(CLIENT_NAME).get(settings.GOOGLE_OAUTH_JWKS_URL)
+            entry, max_age = self.build_entry(response)
+            cache.set(self.cache_key, entry, max_age)
+            self.load(entry)
+            key = self.lookup(kid)
+        if key is None:
+            raise GoogleOAuthError('unknown_signing_key')
+        return key
+
+    async def aget_key(self, kid: str) -> PyJWK:
+        """Get the key of `kid` from async code."""
+        key = self.lookup(kid)
+        if key is None:
+            self.load(await cache.aget(self.cache_key))
+            key = self.lookup(kid)
+        if key is None and self.may_fetch():
+            response = await get_client(CLIENT_NAME).aget(settings.GOOGLE_OAUTH_JWKS_URL)
+            entry, max_age = self.build_entry(response)
+            await cache.aset(self.cache_key, entry, max_age)
+            self.load(entry)
+            key = self.lookup(kid)
+        if key is None:
+            raise GoogleOAuthError('unknown_signing_key')
+        return key
+
+
+google_keys = GoogleKeys()
+
+
+def get_key_id(id_token: str) -> str:
+    """Get the `kid` of an id_token header."""
+    try:
+        header = jwt.get_unverified_header(id_token)
+    except jwt.PyJWTError:
+        raise GoogleOAuthError('invalid_id_token')
+    if header.get('alg') not in ID_TOKEN_ALGORITHMS or not header.get('kid'):
+        raise GoogleOAuthError('invalid_id_token')
+    return header['kid']
+
+
+def decode_id_token(id_token: str, key: PyJWK) -> dict[str, Any]:
+    """Verify the signature and claims of an id_token."""
+    try:
+        return jwt.decode(
+            id_token,
+            key=key,
+            algorithms=ID_TOKEN_ALGORITHMS,
+            audience=settings.GOOGLE_OAUTH_CLIENT_ID,
+            issuer=ISSUERS,
+            options={'require': list(REQUIRED_CLAIMS)},
+            leeway=settings.GOOGLE_OAUTH_CLOCK_SKEW,
+        )
+    except jwt.PyJWTError:
+        raise GoogleOAuthError('invalid_id_token')
+
+
+def get_claims_email(claims: dict[str, Any]) -> str:
+    """Get the verified email of the id_token claims."""
+    if not claims.get('email'):
+        raise GoogleOAuthError('Failed to retrieve user info')
+    if claims.get('email_verified') is not True:
+        raise GoogleOAuthError('email_not_verified')
+    return claims['email']
+
+
+def verify_id_token(id_token: str) -> dict[str, Any]:
+    """Verify an id_token with the cached signing keys."""
+    return decode_id_token(id_token, google_keys.get_key(get_key_id(id_token)))
+
+
+async def averify_id_token(id_token: str) -> dict[str, Any]:
+    """Verify an id_token with the cached signing keys from async code."""
+    return decode_id_token(id_token, await google_keys.aget_key(get_key_id(id_token)))
+
+
+def exchange_code(code: str) -> dict[str, Any]:
+    """Exchange an authorization code for Google tokens."""
+    response = get_client(CLIENT_NAME).post(settings.GOOGLE_OAUTH_TOKEN_URL, data=get_token_data(code))
+    return parse_token(response)
+
+
+def get_email(access_token: str) -> str:
+    """Get the email of the Google account."""
+    response = get_client(CLIENT_NAME).get(
+        settings.GOOGLE_OAUTH_USERINFO_URL,
+        headers={'Authorization': f'Bearer {access_token}'},
+    )
+    return parse_email(response)
+
+
+def get_login_email(code: str) -> str:
+    """Exchange the code and get the email of the account that logged in."""
+    token_data = exchange_code(code)
+    if token_data.get('id_token'):
+        return get_claims_email(verify_id_token(token_data['id_token']))
+    return get_email(token_data['access_token'])
+
+
+async def aexchange_code(code: str) -> dict[str, Any]:
+    """Exchange an authorization code for Google tokens from async code."""
+    response = await get_client(CLIENT_NAME).apost(
+        settings.GOOGLE_OAUTH_TOKEN_URL, data=get_token_data(code)
+    )
+    return parse_token(response)
+
+
+async def aget_email(access_token: str) -> str:
+    """Get the email of the Google account from async code."""
+    response = await get_client(CLIENT_NAME).aget(
+        settings.GOOGLE_OAUTH_USERINFO_URL,
+        headers={'Authorization': f'Bearer {access_token}'},
+    )
+    return parse_email(response)
+
+
+async def aget_login_email(code: str) -> str:
+    """Exchange the code and get the email of the account from async code."""
+    token_data = await aexchange_code(code)
+    if token_data.get('id_token'):
+        return get_claims_email(await averify_id_token(token_data['id_token']))
+    return await aget_email(token_data['access_token'])
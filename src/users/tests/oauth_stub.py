@@ -0,0 +1,200 @@
+"""
+Local stand-in for Google's OAuth token and user info endpoints.
+
+Tests point `GOOGLE_OAUTH_TOKEN_URL`/`GOOGLE_OAUTH_USERINFO_URL`/
+`GOOGLE_OAUTH_JWKS_URL` at a running `StubOAuthServer` to exercise the
+login callback against upstream errors, latency and timeouts without
+reaching Google:
+
+    with StubOAuthServer(mode='slow', delay=2) as stub, override_settings(
+        **stub.get_settings()
+    ):
+        ...
+
+The token response carries an `id_token` signed with a locally generated
+RSA key, published on the JWKS endpoint; `rotate_key()` switches to a new
+key id like Google's periodic rotation.
+
+Modes:
+    * `ok`: a token for any code, then the user info of `email`
+    * `error`: `{"error": "invalid_grant"}` with status 400
+    * `server_error`: status 503
+    * `garbage`: a 200 that is not JSON
+    * `slow`: `ok` after `delay` seconds
+"""
+import json
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+import jwt
+from cryptography.hazmat.primitives.asymmetric import rsa
+from django.conf import settings
+from jwt.algorithms import RSAAlgorithm
+
+MODES = ('ok', 'error', 'server_error', 'garbage', 'slow')
+
+
+class StubOAuthHandler(BaseHTTPRequestHandler):
+    # Keep-alive, like the real endpoints.
+    protocol_version = 'HTTP/1.1'
+    server: 'StubOAuthServer'
+
+    def log_message(self, format, *args) -> None:
+        pass
+
+    def send_json(self, status: int, payload: dict, headers: Optional[dict] = None) -> None:
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def answer(self, payload: dict) -> None:
+        stub = self.server
+        stub.hits[self.path] = stub.hits.get(self.path, 0) + 1
+        if stub.mode == 'slow':
+            time.sleep(stub.delay)
+        if stub.mode == 'error':
+            return self.send_json(400, {'error': 'invalid_grant'})
+        if stub.mode == 'server_error':
+            return self.send_json(503, {'error': 'backend_error'})
+        if stub.mode == 'garbage':
+            body = b'<html>oops</html>'
+            self.send_response(200)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+        self.send_json(200, payload)
+
+    def do_POST(self) -> None:
+        length = int(self.headers.get('Content-Length') or 0)
+        self.rfile.read(length)
+        if self.path == '/token':
+            payload = {'access_token': 'stub-access-token', 'token_type': 'Bearer'}
+            if self.server.issue_id_token:
+                payload['id_token'] = self.server.make_id_token()
+            return self.answer(payload)
+        self.send_json(404, {'error': 'not_found'})
+
+    def do_GET(self) -> None:
+        if self.path == '/userinfo':
+            return self.answer({'email': self.server.email, 'verified_email': True})
+        if self.path == '/certs':
+            stub = self.server
+            stub.hits[self.path] = stub.hits.get(self.path, 0) + 1
+            return self.send_json(200, stub.get_jwks(), headers={
+                'Cache-Control': f'public, max-age={stub.keys_max_age}, must-revalidate',
+            })
+        self.send_json(404, {'error': 'not_found'})
+
+
+class StubOAuthServer(ThreadingHTTPServer):
+    """
+    Stub OAuth server on a free local port, serving from a daemon thread.
+
+    Attributes:
+        * `mode` (str): one of `MODES`, may be changed while running
+        * `delay` (float): seconds of the `slow` mode
+        * `email` (str): email of the user info
+        * `hits` (dict[str, int]): requests per path
+        * `issue_id_token` (bool): add an `id_token` to the token response
+        * `keys_max_age` (int): `max-age` of the JWKS response
+        * `audience` (str): `aud` of id_tokens, the OAuth client id by default
+    """
+
+    daemon_threads = True
+
+    def __init__(self, mode: str = 'ok', delay: float = 1.0,
+                 email: str = 'stub.user@example.com', port: int = 0,
+                 issue_id_token: bool = True, keys_max_age: int = 3600,
+                 audience: Optional[str] = None) -> None:
+        assert mode in MODES, f'Unknown mode {mode!r}'
+        super().__init__(('127.0.0.1', port), StubOAuthHandler)
+        self.mode = mode
+        self.delay = delay
+        self.email = email
+        self.hits = {}
+        self.issue_id_token = issue_id_token
+        self.keys_max_age = keys_max_age
+        self.audience = audience
+        self.private_key = None
+        self.key_id = None
+        self.rotate_key()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f'http://{host}:{port}'
+
+    @property
+    def token_url(self) -> str:
+        return f'{self.base_url}/token'
+
+    @property
+    def userinfo_url(self) -> str:
+        return f'{self.base_url}/userinfo'
+
+    @property
+    def jwks_url(self) -> str:
+        return f'{self.base_url}/certs'
+
+    def get_settings(self) -> dict[str, str]:
+        """Settings pointing the Google service at the stub."""
+        return {
+            'GOOGLE_OAUTH_TOKEN_URL': self.token_url,
+            'GOOGLE_OAUTH_USERINFO_URL': self.userinfo_url,
+            'GOOGLE_OAUTH_JWKS_URL': self.jwks_url,
+        }
+
+    def rotate_key(self) -> str:
+        """Sign id_tokens with a new key, returning its id."""
+        self.private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        self.key_id = uuid.uuid4().hex
+        return self.key_id
+
+    def get_jwks(self) -> dict:
+        """Public key set, in the format of Google's JWKS endpoint."""
+        jwk = RSAAlgorithm.to_jwk(self.private_key.public_key(), as_dict=True)
+        jwk.update({'kid': self.key_id, 'alg': 'RS256', 'use': 'sig'})
+        return {'keys': [jwk]}
+
+    def make_id_token(self, **claims) -> str:
+        """Sign an id_token of `email`; `claims` override the defaults."""
+        now = int(time.time())
+        payload = {
+            'iss': 'https://accounts.google.com',
+            'aud': self.audience or settings.GOOGLE_OAUTH_CLIENT_ID,
+            'sub': uuid.uuid5(uuid.NAMESPACE_URL, self.email).hex,
+            'email': self.email,
+            'email_verified': True,
+            'iat': now,
+            'exp': now + 3600,
+            **claims,
+        }
+        return jwt.encode(payload, self.private_key, algorithm='RS256', headers={'kid': self.key_id})
+
+    def handle_error(self, request, client_address) -> None:
+        """Clients giving up on slow answers are expected, keep quiet."""
+
+    def start(self) -> 'StubOAuthServer':
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+
+    def __enter__(self) -> 'StubOAuthServer':
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
@@ -0,0 +1,117 @@
+import asyncio
+import time
+import uuid
+from unittest import mock
+
+import jwt
+from django.conf import settings
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+
+from users.services import google
+from users.tests.oauth_stub import StubOAuthServer
+
+
+class GoogleKeysTest(SimpleTestCase):
+    """id_token verification against a locally generated JWKS."""
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls.stub = StubOAuthServer().start()
+        cls.addClassCleanup(cls.stub.stop)
+
+    def setUp(self) -> None:
+        self.stub.rotate_key()
+        self.stub.keys_max_age = 3600
+        self.stub.hits.clear()
+        overrides = override_settings(**self.stub.get_settings())
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+        cache.delete(google.google_keys.cache_key)
+        google.google_keys.__init__()
+
+    def assert_invalid(self, id_token: str, error: str = 'invalid_id_token') -> None:
+        with self.assertRaises(google.GoogleOAuthError) as context:
+            google.verify_id_token(id_token)
+        self.assertEqual(context.exception.error, error)
+
+    def test_valid_token(self) -> None:
+        claims = google.verify_id_token(self.stub.make_id_token())
+        self.assertEqual(claims['email'], self.stub.email)
+        self.assertEqual(google.get_claims_email(claims), self.stub.email)
+        self.assertEqual(self.stub.hits, {'/certs': 1})
+
+    def test_keys_are_cached(self) -> None:
+        google.verify_id_token(self.stub.make_id_token())
+        google.verify_id_token(self.stub.make_id_token())
+        asyncio.run(google.averify_id_token(self.stub.make_id_token()))
+        self.assertEqual(self.stub.hits, {'/certs': 1})
+
+    def test_wrong_audience(self) -> None:
+        self.assert_invalid(self.stub.make_id_token(aud='another-client.apps.googleusercontent.com'))
+
+    def test_wrong_issuer(self) -> None:
+        self.assert_invalid(self.stub.make_id_token(iss='https://accounts.example.com'))
+
+    def test_expired(self) -> None:
+        now = int(time.time())
+        skew = settings.GOOGLE_OAUTH_CLOCK_SKEW
+        self.assert_invalid(self.stub.make_id_token(iat=now - 7200, exp=now - skew - 60))
+
+    def test_expiry_within_clock_skew(self) -> None:
+        now = int(time.time())
+        google.verify_id_token(self.stub.make_id_token(exp=now - settings.GOOGLE_OAUTH_CLOCK_SKEW // 2))
+
+    def test_foreign_signature(self) -> None:
+        id_token = self.stub.make_id_token()
+        google.verify_id_token(id_token)
+        self.stub.rotate_key()
+        forged = jwt.encode(
+            jwt.decode(id_token, options={'verify_signature': False}),
+            self.stub.private_key, algorithm='RS256',
+            headers={'kid': jwt.get_unverified_header(id_token)['kid']},
+        )
+        self.assert_invalid(forged)
+
+    def test_email_not_verified(self) -> None:
+        claims = google.verify_id_token(self.stub.make_id_token(email_verified=False))
+        with self.assertRaises(google.GoogleOAuthError) as context:
+            google.get_claims_email(claims)
+        self.assertEqual(context.exception.error, 'email_not_verified')
+
+    def test_refetch_on_unknown_kid(self) -> None:
+        google.google_keys.refetch_interval = 0.0
+        google.verify_id_token(self.stub.make_id_token())
+        self.stub.rotate_key()
+        claims = google.verify_id_token(self.stub.make_id_token())
+        self.assertEqual(claims['email'], self.stub.email)
+        self.assertEqual(self.stub.hits, {'/certs': 2})
+
+    def test_refetch_interval_limits_unknown_kids(self) -> None:
+        google.verify_id_token(self.stub.make_id_token())
+        for _ in range(3):
+            forged = jwt.encode(
+                {'sub': 'forged'}, self.stub.private_key, algorithm='RS256',
+                headers={'kid': uuid.uuid4().hex},
+            )
+            self.assert_invalid(forged, error='unknown_signing_key')
+        self.assertEqual(self.stub.hits, {'/certs': 1})
+
+    def test_max_age_rotation(self) -> None:
+        self.stub.keys_max_age = 600
+        old_token = self.stub.make_id_token()
+        google.verify_id_token(old_token)
+        self.stub.rotate_key()
+        new_token = self.stub.make_id_token()
+
+        # The old set is served until its max-age runs out.
+        self.assert_invalid(new_token, error='unknown_signing_key')
+        self.assertEqual(self.stub.hits, {'/certs': 1})
+
+        real_time = time.time
+        with mock.patch('users.services.google.time.time', lambda: real_time() + 601):
+            claims = google.verify_id_token(new_token)
+            self.assertEqual(claims['email'], self.stub.email)
+            self.assert_invalid(old_token, error='unknown_signing_key')
+        self.assertEqual(self.stub.hits, {'/certs': 2})
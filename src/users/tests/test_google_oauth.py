@@ -0,0 +1,108 @@
+import asyncio
+import time
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+from rest_framework.test import APIRequestFactory
+
+from common.http import OutboundTimeout, get_client
+from users.services import google
+from users.tests.oauth_stub import StubOAuthServer
+from users.views.auth import GoogleLoginCallback
+
+OUTBOUND_HTTP = {
+    'google': {
+        'connect_timeout': 1.0,
+        'read_timeout': 0.5,
+        'retries': 0,
+        'failure_threshold': 2,
+        'reset_timeout': 60.0,
+    },
+}
+
+
+class GoogleOAuthStubTest(SimpleTestCase):
+    """The login callback against upstream errors, latency and timeouts."""
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls.stub = StubOAuthServer().start()
+        cls.addClassCleanup(cls.stub.stop)
+
+    def setUp(self) -> None:
+        self.stub.mode = 'ok'
+        self.stub.issue_id_token = True
+        self.stub.hits.clear()
+        settings = override_settings(OUTBOUND_HTTP=OUTBOUND_HTTP, **self.stub.get_settings())
+        settings.enable()
+        self.addCleanup(settings.disable)
+        cache.delete(google.google_keys.cache_key)
+        google.google_keys.__init__()
+
+    def callback(self, code: str = 'code'):
+        request = APIRequestFactory().get('/api/v1/auth/google/callback/', {'code': code})
+        return GoogleLoginCallback.as_view()(request)
+
+    def test_id_token_email(self) -> None:
+        self.assertEqual(google.get_login_email('code'), self.stub.email)
+        self.assertEqual(self.stub.hits, {'/token': 1, '/certs': 1})
+
+    def test_userinfo_without_id_token(self) -> None:
+        self.stub.issue_id_token = False
+        self.assertEqual(google.get_login_email('code'), self.stub.email)
+        self.assertEqual(self.stub.hits, {'/token': 1, '/userinfo': 1})
+
+    def test_async_id_token_email(self) -> None:
+        self.assertEqual(asyncio.run(google.aget_login_email('code')), self.stub.email)
+
+    def test_invalid_grant(self) -> None:
+        self.stub.mode = 'error'
+        response = self.callback()
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data, {'error': 'invalid_grant'})
+
+    def test_garbage(self) -> None:
+        self.stub.mode = 'garbage'
+        response = self.callback()
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data, {'error': 'invalid_response'})
+
+    def test_server_error_is_not_retried(self) -> None:
+        self.stub.mode = 'server_error'
+        with override_settings(OUTBOUND_HTTP={'google': {**OUTBOUND_HTTP['google'], 'retries': 2}}):
+            response = self.callback()
+        self.assertEqual(response.status_code, 502)
+        # The code exchange is a POST, a 503 may have consumed the code.
+        self.assertEqual(self.stub.hits, {'/token': 1})
+
+    def test_latency_within_timeout(self) -> None:
+        self.stub.mode = 'slow'
+        self.stub.delay = 0.2
+        started = time.monotonic()
+        self.assertEqual(google.get_login_email('code'), self.stub.email)
+        self.assertGreaterEqual(time.monotonic() - started, 0.2)
+
+    def test_timeout(self) -> None:
+        self.stub.mode = 'slow'
+        self.stub.delay = 2.0
+        started = time.monotonic()
+        response = self.callback()
+        self.assertEqual(response.status_code, 504)
+        self.assertLess(time.monotonic() - started, 1.5)
+
+    def test_async_timeout(self) -> None:
+        self.stub.mode = 'slow'
+        self.stub.delay = 2.0
+        with self.assertRaises(OutboundTimeout):
+            asyncio.run(google.aget_login_email('code'))
+
+    def test_open_circuit_fails_fast(self) -> None:
+        self.stub.mode = 'server_error'
+        for _ in range(OUTBOUND_HTTP['google']['failure_threshold']):
+            self.assertEqual(self.callback().status_code, 502)
+        self.assertEqual(get_client('google').breaker.state, 'open')
+
+        response = self.callback()
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(self.stub.hits, {'/token': 2})
@@ -0,0 +1,77 @@
+from types import SimpleNamespace
+
+from django.db import IntegrityError, connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from common.throttling import get_bucket_backend
+from users.models.users import User
+from users.serializers.api.users import RegistrationSerializer, get_unique_fields
+
+URL = '/api/v1/users/registration/'
+
+
+class RegistrationTest(TestCase):
+    """Registration leaves uniqueness to the single INSERT of the user."""
+
+    @classmethod
+    def setUpTestData(cls) -> None:
+        User.objects.create(username='anna', email='anna@example.com')
+
+    def setUp(self) -> None:
+        get_bucket_backend().clear()
+        self.client = APIClient()
+
+    def register(self, **data):
+        data = {
+            'username': 'boris',
+            'email': 'boris@example.com',
+            'role': User.Role.EMPLOYEE,
+            'password': 'Correct-Horse-42',
+            'confirm_password': 'Correct-Horse-42',
+            **data,
+        }
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(URL, data, format='json')
+        inserts = [query for query in queries if query['sql'].startswith('INSERT')]
+        self.assertEqual(len(inserts), 1)
+        return response
+
+    def test_register(self) -> None:
+        response = self.register()
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(User.objects.get(pk=response.data['user']).username, 'boris')
+
+    def test_duplicate_email(self) -> None:
+        response = self.register(email='Anna@Example.com')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['detail'], RegistrationSerializer.conflict_messages['email'])
+
+    def test_duplicate_username(self) -> None:
+        response = self.register(username='anna')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['detail'], RegistrationSerializer.conflict_messages['username'])
+
+    def test_conflict_by_constraint_name(self) -> None:
+        constraints = {field: name for name, field in get_unique_fields(User, 'default').items()}
+        self.assertLessEqual({'email', 'username'}, set(constraints))
+
+        def get_error(message: str, constraint_name=None) -> str:
+            # What Django wraps: the driver error carrying the diagnostics.
+            cause = Exception(message)
+            cause.diag = SimpleNamespace(constraint_name=constraint_name)
+            exc = IntegrityError(message)
+            exc.__cause__ = cause
+            return str(RegistrationSerializer().get_conflict_error(exc, 'default').detail)
+
+        self.assertEqual(get_error('', constraints['email']), RegistrationSerializer.conflict_messages['email'])
+        # The text of the error is not parsed.
+        self.assertEqual(
+            get_error('Key (username)=(anna) already exists.', constraints['email']),
+            RegistrationSerializer.conflict_messages['email'],
+        )
+        self.assertEqual(
+            get_error('Key (username)=(anna) already exists.'),
+            'A user with these credentials is already registered.',
+        )
@@ -0,0 +1,83 @@
+import time
+import uuid
+from unittest import mock
+
+from django.test import SimpleTestCase, override_settings
+from rest_framework.test import APIRequestFactory
+
+from users.jwt.revocation import (
+    BloomRevocationStore,
+    CacheRevocationStore,
+    MemoryRevocationStore,
+    get_revocation_store,
+)
+from users.jwt.tokens import UserRefreshToken
+from users.models.users import User
+from users.views.auth import CustomTokenRefreshView, CustomTokenVerifyView, LogoutView
+
+
+class RevocationStoreTest(SimpleTestCase):
+    """`revoke()` tells whether a token was newly revoked."""
+
+    def assert_revokes_once(self, store) -> None:
+        jti, expires_at = uuid.uuid4().hex, int(time.time()) + 60
+        self.assertFalse(store.is_revoked(jti, expires_at))
+        self.assertTrue(store.revoke(jti, expires_at))
+        self.assertFalse(store.revoke(jti, expires_at))
+        self.assertTrue(store.is_revoked(jti, expires_at))
+
+    def test_memory(self) -> None:
+        self.assert_revokes_once(MemoryRevocationStore())
+
+    def test_memory_expired_entry(self) -> None:
+        store = MemoryRevocationStore()
+        self.assertTrue(store.revoke('jti', int(time.time()) - 1))
+        self.assertTrue(store.revoke('jti', int(time.time()) + 60))
+
+    def test_cache(self) -> None:
+        self.assert_revokes_once(CacheRevocationStore())
+
+    def test_bloom(self) -> None:
+        self.assert_revokes_once(BloomRevocationStore(MemoryRevocationStore()))
+
+
+@override_settings(TOKEN_REVOCATION={'BACKEND': 'users.jwt.revocation.MemoryRevocationStore'})
+class RefreshRevocationTest(SimpleTestCase):
+    """Rotation and verification against the revocation store."""
+
+    factory = APIRequestFactory()
+
+    def setUp(self) -> None:
+        self.user = User(id=5, username='anna', role=User.Role.EMPLOYEE, is_active=True)
+        patcher = mock.patch('users.jwt.serializers.user_cache.get_user', return_value=self.user)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def post(self, view, data: dict):
+        return view.as_view()(self.factory.post('/', data, format='json'))
+
+    def test_refresh_token_is_used_once(self) -> None:
+        refresh = str(UserRefreshToken.for_user(self.user))
+        response = self.post(CustomTokenRefreshView, {'refresh': refresh})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.data['refresh'], refresh)
+
+        response = self.post(CustomTokenRefreshView, {'refresh': refresh})
+        self.assertEqual(response.status_code, 401)
+
+    def test_rotation_loses_to_a_concurrent_revocation(self) -> None:
+        refresh = UserRefreshToken.for_user(self.user)
+        # Revoked between the `verify()` of the refresh and its rotation.
+        with mock.patch.object(UserRefreshToken, 'check_blacklist'):
+            get_revocation_store().revoke(refresh['jti'], refresh['exp'])
+            response = self.post(CustomTokenRefreshView, {'refresh': str(refresh)})
+        self.assertEqual(response.status_code, 401)
+
+    def test_verify_revoked_refresh_token(self) -> None:
+        refresh = UserRefreshToken.for_user(self.user)
+        self.assertEqual(self.post(CustomTokenVerifyView, {'token': str(refresh)}).status_code, 200)
+
+        self.assertEqual(self.post(LogoutView, {'refresh': str(refresh)}).status_code, 205)
+        self.assertEqual(self.post(CustomTokenVerifyView, {'token': str(refresh)}).status_code, 401)
+        access = str(refresh.access_token)
+        self.assertEqual(self.post(CustomTokenVerifyView, {'token': access}).status_code, 200)
@@ -0,0 +1,65 @@
+from django.conf import settings
+from django.test import SimpleTestCase, override_settings
+from rest_framework.response import Response
+from rest_framework.test import APIRequestFactory
+from rest_framework.views import APIView
+
+from common.throttling import get_bucket_backend
+from common.views.mixins import OrderedThrottlesMixin
+from users.throttling import LoginIPThrottle, PasswordChangeThrottle, PasswordHashingThrottle
+
+
+class LoginView(OrderedThrottlesMixin, APIView):
+    authentication_classes = ()
+    permission_classes = ()
+    throttle_classes = (LoginIPThrottle, PasswordHashingThrottle)
+
+    def post(self, request):
+        return Response()
+
+
+class PasswordChangeView(LoginView):
+    throttle_classes = (PasswordChangeThrottle, PasswordHashingThrottle)
+
+
+@override_settings(
+    THROTTLING={'BACKEND': 'common.throttling.LocalBucketBackend'},
+    REST_FRAMEWORK={
+        **settings.REST_FRAMEWORK,
+        'DEFAULT_THROTTLE_RATES': {
+            'login': '2/min',
+            'password_change': '2/min',
+            'password_hashing': '3/min',
+        },
+    },
+)
+class PasswordHashingThrottleTest(SimpleTestCase):
+    """The hashing budget is shared and only charged for admitted requests."""
+
+    factory = APIRequestFactory()
+
+    def setUp(self) -> None:
+        get_bucket_backend().clear()
+
+    def post(self, view, ip: str) -> int:
+        return view.as_view()(self.factory.post('/', REMOTE_ADDR=ip)).status_code
+
+    def test_denied_requests_are_not_charged(self) -> None:
+        statuses = [self.post(LoginView, '10.0.0.1') for _ in range(5)]
+        self.assertEqual(statuses, [200, 200, 429, 429, 429])
+        # One hashing token is left despite the five attempts.
+        self.assertEqual(self.post(LoginView, '10.0.0.2'), 200)
+        self.assertEqual(self.post(LoginView, '10.0.0.3'), 429)
+
+    def test_budget_is_shared_by_views(self) -> None:
+        self.assertEqual(self.post(LoginView, '10.0.0.1'), 200)
+        self.assertEqual(self.post(LoginView, '10.0.0.2'), 200)
+        self.assertEqual(self.post(PasswordChangeView, '10.0.0.3'), 200)
+        self.assertEqual(self.post(PasswordChangeView, '10.0.0.4'), 429)
+
+    def test_retry_after_of_the_denying_throttle(self) -> None:
+        self.post(LoginView, '10.0.0.1')
+        self.post(LoginView, '10.0.0.1')
+        response = LoginView.as_view()(self.factory.post('/', REMOTE_ADDR='10.0.0.1'))
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response['Retry-After'], '30')
@@ -0,0 +1,150 @@
+import copy
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework_simplejwt import tokens
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.tokens import AccessToken
+
+from users.jwt import authentication
+from users.jwt.authentication import CachedJWTAuthentication, ClaimsJWTAuthentication
+from users.jwt.cache import UserCache, user_cache
+from users.jwt.tokens import ClaimsUser, UserRefreshToken
+from users.models.users import User
+
+
+class UserCacheTest(TestCase):
+    """Cached users are dropped on every save or delete of the user."""
+
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.user = User.objects.create(username='anna', email='anna@example.com', role=User.Role.EMPLOYEE)
+
+    def setUp(self) -> None:
+        cache.clear()
+        user_cache.clear_local()
+        self.addCleanup(user_cache.clear_local)
+
+    def authenticate(self, token, authentication=CachedJWTAuthentication):
+        backend = authentication()
+        return backend.get_user(backend.get_validated_token(str(token).encode()))
+
+    def test_cached(self) -> None:
+        with self.assertNumQueries(1):
+            user_cache.get_user(self.user.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(user_cache.get_user(self.user.pk), self.user)
+
+    def test_shared_tier(self) -> None:
+        user_cache.get_user(self.user.pk)
+        user_cache.clear_local()
+        with self.assertNumQueries(0):
+            self.assertEqual(user_cache.get_user(self.user.pk), self.user)
+
+    def test_missing_user(self) -> None:
+        with self.assertRaises(User.DoesNotExist):
+            user_cache.get_user(999999)
+
+    def test_role_change(self) -> None:
+        user_cache.get_user(self.user.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.role = User.Role.EMPLOYER
+            self.user.save()
+        with self.assertNumQueries(1):
+            self.assertEqual(user_cache.get_user(self.user.pk).role, User.Role.EMPLOYER)
+
+    def test_cached_again_before_commit(self) -> None:
+        stale = user_cache.get_user(self.user.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.role = User.Role.EMPLOYER
+            self.user.save()
+            # A concurrent request still reads the committed row.
+            user_cache.set(stale)
+        self.assertIsNone(user_cache.get(self.user.pk))
+
+    def test_copy_on_read(self) -> None:
+        first = user_cache.get_user(self.user.pk)
+        first.role = User.Role.ADMIN
+        self.assertEqual(user_cache.get_user(self.user.pk).role, User.Role.EMPLOYEE)
+
+        user = copy.copy(self.user)
+        user_cache.set(user)
+        user.role = User.Role.ADMIN
+        self.assertEqual(user_cache.get(self.user.pk).role, User.Role.EMPLOYEE)
+
+    def test_local_size(self) -> None:
+        local = UserCache(local_size=1, cache_alias='default')
+        other = User.objects.create(username='boris', email='boris@example.com')
+        local.set(self.user)
+        local.set(other)
+        self.assertIsNone(local.get_local(self.user.pk))
+        self.assertEqual(local.get_local(other.pk), other)
+        # Still in the shared tier.
+        self.assertEqual(local.get(self.user.pk), self.user)
+
+    def test_async(self) -> None:
+        self.assertEqual(async_to_sync(user_cache.aget_user)(self.user.pk), self.user)
+        with self.assertNumQueries(0):
+            self.assertEqual(async_to_sync(user_cache.aget_user)(self.user.pk), self.user)
+
+    def test_password_change(self) -> None:
+        # simplejwt rebinds `api_settings` on `setting_changed`, which the
+        # modules that imported it never see.
+        for module in (authentication, tokens):
+            patcher = mock.patch.object(module.api_settings, 'CHECK_REVOKE_TOKEN', True)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        token = UserRefreshToken.for_user(self.user).access_token
+        self.assertEqual(self.authenticate(token), self.user)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.set_password('another-password')
+            self.user.save()
+        with self.assertRaises(AuthenticationFailed) as raised:
+            self.authenticate(token)
+        self.assertEqual(raised.exception.detail['code'], 'password_changed')
+        self.assertEqual(self.authenticate(UserRefreshToken.for_user(self.user).access_token), self.user)
+
+    def test_deactivation(self) -> None:
+        token = UserRefreshToken.for_user(self.user).access_token
+        self.authenticate(token)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.is_active = False
+            self.user.save()
+        with self.assertRaises(AuthenticationFailed) as raised:
+            self.authenticate(token)
+        self.assertEqual(raised.exception.detail['code'], 'user_inactive')
+
+    def test_delete(self) -> None:
+        token = UserRefreshToken.for_user(self.user).access_token
+        self.authenticate(token)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.delete()
+        with self.assertRaises(AuthenticationFailed) as raised:
+            self.authenticate(token)
+        self.assertEqual(raised.exception.detail['code'], 'user_not_found')
+
+    def test_claims(self) -> None:
+        token = UserRefreshToken.for_user(self.user).access_token
+        with self.assertNumQueries(0):
+            user = self.authenticate(token, ClaimsJWTAuthentication)
+        self.assertIsInstance(user, ClaimsUser)
+        self.assertEqual((user.pk, user.role, user.is_superuser), (self.user.pk, User.Role.EMPLOYEE, False))
+
+    def test_claims_fallback(self) -> None:
+        # Issued without `USER_CLAIMS`, e.g. before they were added.
+        token = AccessToken.for_user(self.user)
+        with self.assertNumQueries(1):
+            user = self.authenticate(token, ClaimsJWTAuthentication)
+        self.assertIsInstance(user, User)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.authenticate(token, ClaimsJWTAuthentication), self.user)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.is_active = False
+            self.user.save()
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate(token, ClaimsJWTAuthentication)
@@ -0,0 +1,46 @@
+from typing import Optional
+
+from rest_framework.request import Request
+
+from common.throttling import BucketThrottle, IPThrottle, ScopeThrottle, UserThrottle
+
+
+class LoginIPThrottle(IPThrottle):
+    """Login attempts per client IP address."""
+    scope = 'login'
+
+
+class LoginAccountThrottle(BucketThrottle):
+    """Login attempts per submitted account, against credential stuffing."""
+    scope = 'login_account'
+
+    def get_bucket_ident(self, request: Request, view) -> Optional[str]:
+        username = request.data.get('username')
+        if not isinstance(username, str) or not username:
+            return None
+        return f'account:{username.lower()}'
+
+
+class PasswordHashingThrottle(ScopeThrottle):
+    """
+    Total rate of password hashing, so bursts cannot saturate workers.
+
+    One budget for login, registration and password changes; list it last
+    so requests denied per client are not charged to it.
+    """
+    scope = 'password_hashing'
+
+
+class RegistrationIPThrottle(IPThrottle):
+    """Registrations per client IP address."""
+    scope = 'registration'
+
+
+class PasswordChangeThrottle(UserThrottle):
+    """Password changes per user."""
+    scope = 'password_change'
+
+
+class UserSearchThrottle(UserThrottle):
+    """Public user searches per client, the endpoints being open to anonymous traffic."""
+    scope = 'user_search'
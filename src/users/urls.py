@@ -4,6 +4,7 @@ from .views import auth, users
 urlpatterns = [
     path('auth/login/', auth.CustomTokenObtainPairView.as_view(), name='jwt-create'),
     path('auth/jwt/refresh/', auth.CustomTokenRefreshView.as_view(), name='jwt-refresh'),
+    path('auth/logout/', auth.LogoutView.as_view(), name='jwt-logout'),
     path('auth/jwt/verify/', auth.CustomTokenVerifyView.as_view(), name='jwt-verify'),
 
     path('users/registration/', users.CustomUserViewSet.as_view({'post': 'registration'}), name='user-registration'),
@@ -16,6 +17,7 @@ urlpatterns = [
     }), name='user-profile'),
 
     path('users/', users.UserListSearchView.as_view({'get': 'list'}), name='user-list'),
+    path('users/autocomplete/', users.UserListSearchView.as_view({'get': 'autocomplete'}), name='user-autocomplete'),
 
     path('users/<int:pk>/', users.UserRetrieveView.as_view({'get': 'retrieve'}), name='user-detail'),
 
@@ -5,16 +5,19 @@ from rest_framework import status
 from rest_framework.response import Response
 from rest_framework_simplejwt import views
 from rest_framework_simplejwt.views import TokenObtainPairView
-from users.jwt.tokens import set_refresh_cookie
+from common.http import CircuitOpenError, OutboundError, OutboundTimeout
+from common.views.mixins import OrderedThrottlesMixin
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from users.jwt.tokens import UserRefreshToken, delete_refresh_cookie, get_refresh_cookie, set_refresh_cookie
+from users.services import google
+from users.throttling import LoginAccountThrottle, LoginIPThrottle, PasswordHashingThrottle
 from allauth.socialaccount.providers.google.views import GoogleOAuth2Adapter
 from allauth.socialaccount.providers.oauth2.client import OAuth2Client
 from dj_rest_auth.registration.views import SocialLoginView
 from django.conf import settings
-import requests
 from rest_framework.views import APIView
 from rest_framework.permissions import AllowAny
 from django.contrib.auth import get_user_model
-from rest_framework_simplejwt.tokens import RefreshToken
 
 
 @extend_schema_view(
@@ -23,8 +26,9 @@ from rest_framework_simplejwt.tokens import RefreshToken
         tags=["Authentication"],
     ),
 )
-class CustomTokenObtainPairView(TokenObtainPairView):
+class CustomTokenObtainPairView(OrderedThrottlesMixin, TokenObtainPairView):
     """Кастомный вход с установкой refresh_token в cookie"""
+    throttle_classes = (LoginIPThrottle, LoginAccountThrottle, PasswordHashingThrottle)
 
     def post(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
@@ -45,8 +49,48 @@ class CustomTokenObtainPairView(TokenObtainPairView):
     ),
 )
 class CustomTokenRefreshView(views.TokenRefreshView):
-    """View for refreshing a token."""
-    pass
+    """
+    View for refreshing a token.
+    The refresh token is read from the body or the refresh cookie; the
+    rotated one replaces the cookie.
+    """
+
+    def post(self, request, *args, **kwargs):
+        data = request.data if 'refresh' in request.data else {'refresh': get_refresh_cookie(request)}
+        serializer = self.get_serializer(data=data)
+        try:
+            serializer.is_valid(raise_exception=True)
+        except TokenError as e:
+            raise InvalidToken(e.args[0])
+
+        response = Response(serializer.validated_data, status=status.HTTP_200_OK)
+        if 'refresh' in serializer.validated_data:
+            set_refresh_cookie(response, serializer.validated_data['refresh'])
+        return response
+
+
+@extend_schema_view(
+    post=extend_schema(
+        summary='Logout',
+        tags=['Authentication'],
+    ),
+)
+class LogoutView(APIView):
+    """Отзывает refresh_token из тела запроса или cookie и удаляет cookie"""
+    authentication_classes = []
+    permission_classes = [AllowAny]
+
+    def post(self, request, *args, **kwargs):
+        raw_token = request.data.get('refresh') or get_refresh_cookie(request)
+        if raw_token:
+            try:
+                UserRefreshToken(raw_token).blacklist()
+            except TokenError:
+                pass
+
+        response = Response(status=status.HTTP_205_RESET_CONTENT)
+        delete_refresh_cookie(response)
+        return response
 
 
 @extend_schema_view(
@@ -72,43 +116,29 @@ class GoogleLoginCallback(APIView):
 
     def get(self, request, *args, **kwargs):
         """
-        Получает код авторизации от Google, запрашивает access и refresh токены,
+        Получает код авторизации от Google, обменивает его на токены Google и
+        берет email из id_token, подпись которого проверяется локально по ключам Google (JWKS),
         затем создает и возвращает JWT access и refresh токены, которые используются в Django.
         """
         code = request.GET.get("code")
         if not code:
             return Response({"error": "Authorization code not provided"}, status=status.HTTP_400_BAD_REQUEST)
 
-        token_url = "https://oauth2.googleapis.com/token"
-
-        data = {
-            "code": code,
-            "client_id": settings.GOOGLE_OAUTH_CLIENT_ID,
-            "client_secret": settings.GOOGLE_OAUTH_CLIENT_SECRET,
-            "redirect_uri": settings.GOOGLE_OAUTH_CALLBACK_URL,
-            "grant_type": "authorization_code",
-        }
-
-        response = requests.post(token_url, data=data)
-        token_data = response.json()
-
-        if "error" in token_data:
-            return Response({"error": token_data["error"]}, status=status.HTTP_400_BAD_REQUEST)
-
-        google_access_token = token_data.get("access_token")
-
-        user_info_url = "https://www.googleapis.com/oauth2/v2/userinfo"
-        user_info_response = requests.get(user_info_url, headers={"Authorization": f"Bearer {google_access_token}"})
-        user_info = user_info_response.json()
-
-        if "email" not in user_info:
-            return Response({"error": "Failed to retrieve user info"}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            email = google.get_login_email(code)
+        except google.GoogleOAuthError as exc:
+            return Response({"error": exc.error}, status=status.HTTP_400_BAD_REQUEST)
+        except CircuitOpenError:
+            return Response({"error": "Google is unavailable"}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+        except OutboundTimeout:
+            return Response({"error": "Google did not respond in time"}, status=status.HTTP_504_GATEWAY_TIMEOUT)
+        except OutboundError:
+            return Response({"error": "Google request failed"}, status=status.HTTP_502_BAD_GATEWAY)
 
-        email = user_info["email"]
         User = get_user_model()
         user, created = User.objects.get_or_create(email=email)
 
-        refresh = RefreshToken.for_user(user)
+        refresh = UserRefreshToken.for_user(user)
         access = refresh.access_token
 
         response = Response({"access": str(access)}, status=status.HTTP_200_OK)
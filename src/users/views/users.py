@@ -1,7 +1,6 @@
 
 from typing import TypeAlias, Annotated, Any
 
-from crum import get_current_user
 from django.contrib.auth import get_user_model
 from djoser import permissions as djoser_permissions
 from drf_spectacular.utils import extend_schema_view, extend_schema
@@ -11,11 +10,22 @@ from rest_framework.filters import SearchFilter, OrderingFilter
 from rest_framework.permissions import AllowAny
 from rest_framework.request import Request
 from rest_framework.response import Response
-from rest_framework_simplejwt import authentication as jwt_authentication
+from users.jwt import authentication as jwt_authentication
 
+from common.caching import ResponseCache
+from common.counting import CachedCount, EstimatedCount
+from common.current import get_current_user
+from common.filters import TrigramAutocompleteFilter
+from common.pagination import KeysetPagination
 from common.views import mixins
 from users.jwt.tokens import set_refresh_cookie
 from users.serializers.api import users as user_s
+from users.throttling import (
+    PasswordChangeThrottle,
+    PasswordHashingThrottle,
+    RegistrationIPThrottle,
+    UserSearchThrottle,
+)
 
 User = get_user_model()
 
@@ -51,7 +61,7 @@ class CustomUserViewSet(mixins.ExtendedUserViewSet):
     """
     queryset = User.objects.all()
 
-    authentication_classes = (jwt_authentication.JWTAuthentication,)
+    authentication_classes = (jwt_authentication.CachedJWTAuthentication,)
     multi_authentication_classes = {
         'registration': (authentication.BasicAuthentication,),
     }
@@ -61,6 +71,11 @@ class CustomUserViewSet(mixins.ExtendedUserViewSet):
         'registration': (permissions.AllowAny,),
     }
 
+    multi_throttle_classes = {
+        'registration': (RegistrationIPThrottle, PasswordHashingThrottle),
+        'change_password': (PasswordChangeThrottle, PasswordHashingThrottle),
+    }
+
     serializer_class = user_s.UserSerializer
     multi_serializer_class = {
         'registration': user_s.RegistrationSerializer,
@@ -113,14 +128,43 @@ class CustomUserViewSet(mixins.ExtendedUserViewSet):
         tags=['Search'],
     )
 )
+@extend_schema_view(
+    autocomplete=extend_schema(
+        summary='User autocomplete',
+        tags=['User'],
+    ),
+)
 class UserListSearchView(mixins.ListViewSet):
-    """User list view."""
+    """
+    User list view.
+
+    `autocomplete` returns the best `autocomplete_limit` users matching the
+    `q` prefix or approximate text, ranked by trigram similarity unless
+    `ordering` is passed. Answers are cached briefly per query.
+    """
     permission_classes = [AllowAny]
     queryset = User.objects.exclude(is_superuser=True)
     serializer_class = user_s.UserListSearchSerializer
-    filter_backends = (SearchFilter, OrderingFilter)
+    fast_read_actions = ('list', 'autocomplete')
+    pagination_class = KeysetPagination
+    count_strategy = EstimatedCount(fallback=CachedCount())
+    filter_backends = (SearchFilter, OrderingFilter, TrigramAutocompleteFilter)
     search_fields = ('email', 'username')
     ordering = ('username', '-id')
+    autocomplete_fields = ('username', 'email', 'first_name', 'last_name')
+    autocomplete_min_length = 3
+    autocomplete_limit = 10
+    response_cache = ResponseCache(timeout=30, actions=('autocomplete',))
+    multi_throttle_classes = {
+        'list': (UserSearchThrottle,),
+        'autocomplete': (UserSearchThrottle,),
+    }
+
+    @action(methods=['GET'], detail=False, pagination_class=None)
+    def autocomplete(self, request: Request) -> Response:
+        queryset = self.filter_queryset(self.get_queryset())[:self.autocomplete_limit]
+        serializer = self.get_serializer(queryset, many=True)
+        return Response(serializer.data)
 
 
 @extend_schema_view(
@@ -134,3 +178,4 @@ class UserRetrieveView(mixins.RetrieveListViewSet):
     queryset = User.objects.all()
     permission_classes = [AllowAny]
     serializer_class = user_s.UserSerializer
+    fast_read_actions = ('retrieve',)
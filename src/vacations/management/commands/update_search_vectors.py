@@ -0,0 +1,60 @@
+from django.core.management import BaseCommand
+
+from common.generations import bump_generation
+from vacations.models import Vacations
+
+
+class Command(BaseCommand):
+    """
+    Command for filling `search_vector` of existing vacations.
+
+    New and edited rows are maintained by the database trigger, so this is
+    only needed once after the migration or after changing the weights.
+    Rows are written through `_base_manager`, a backfill is not an edit and
+    must not stamp `updated_at`/`updated_by`.
+    """
+
+    help = 'Fill the full-text search vector of existing vacations in batches.'
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=5000,
+            help='Number of rows updated per statement.',
+        )
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            help='Rebuild rows that already have a search vector.',
+        )
+
+    def handle(self, *args, **options) -> None:
+        """
+        Method to run a custom command.
+        """
+        batch_size = options['batch_size']
+        queryset = Vacations.objects.order_by('pk')
+        if not options['all']:
+            queryset = queryset.filter(search_vector__isnull=True)
+
+        expression = Vacations.search_vector_expression()
+        last_pk, total = 0, 0
+        while True:
+            pks = list(
+                queryset.filter(pk__gt=last_pk).values_list('pk', flat=True)[:batch_size]
+            )
+            if not pks:
+                break
+            total += Vacations._base_manager.filter(pk__in=pks).update(
+                search_vector=expression
+            )
+            last_pk = pks[-1]
+            self.stdout.write(f'Updated {total} vacations')
+
+        if total:
+            bump_generation(Vacations)
+
+        self.stdout.write(
+            self.style.SUCCESS(f'Search vectors are up to date ({total} rows updated)')
+        )
@@ -0,0 +1,59 @@
+# Generated by Django 5.1.3 on 2026-10-18 13:12
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.conf import settings
+from django.db import migrations
+
+SEARCH_VECTOR_SQL = '''
+CREATE FUNCTION vacations_search_vector_update() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector :=
+        setweight(to_tsvector('english', coalesce(NEW.title, '')), 'A') ||
+        setweight(to_tsvector('russian', coalesce(NEW.title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(NEW.company_name, '')), 'A') ||
+        setweight(to_tsvector('russian', coalesce(NEW.company_name, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(NEW.description, '')), 'B') ||
+        setweight(to_tsvector('russian', coalesce(NEW.description, '')), 'B') ||
+        setweight(to_tsvector('english', coalesce(NEW.requirements, '')), 'C') ||
+        setweight(to_tsvector('russian', coalesce(NEW.requirements, '')), 'C') ||
+        setweight(to_tsvector('english', coalesce(NEW.responsibilities, '')), 'C') ||
+        setweight(to_tsvector('russian', coalesce(NEW.responsibilities, '')), 'C');
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER vacations_search_vector_trigger
+    BEFORE INSERT OR UPDATE OF title, company_name, description, requirements, responsibilities
+    ON vacations_vacations
+    FOR EACH ROW EXECUTE FUNCTION vacations_search_vector_update();
+'''
+
+DROP_SEARCH_VECTOR_SQL = '''
+DROP TRIGGER IF EXISTS vacations_search_vector_trigger ON vacations_vacations;
+DROP FUNCTION IF EXISTS vacations_search_vector_update();
+'''
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vacations', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='vacations',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True, verbose_name='Search vector'),
+        ),
+        migrations.AddIndex(
+            model_name='vacations',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='vacations_search_vector_idx'),
+        ),
+        migrations.RunSQL(
+            sql=SEARCH_VECTOR_SQL,
+            reverse_sql=DROP_SEARCH_VECTOR_SQL,
+        ),
+    ]
@@ -1,3 +1,5 @@
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector, SearchVectorField
 from django.db import models
 from django.utils.translation import gettext_lazy as _
 from phonenumber_field.modelfields import PhoneNumberField
@@ -6,6 +8,24 @@ from common.models.mixins import InfoMixin
 
 
 class Vacations(InfoMixin):
+    """
+    Vacation model.
+
+    Attributes:
+        * `SEARCH_CONFIGS` (tuple[str]): text search configurations of `search_vector`
+        * `SEARCH_WEIGHTS` (dict[str, str]): indexed fields and their ranking weights
+    """
+
+    # Keep in sync with the `vacations_search_vector_update` trigger.
+    SEARCH_CONFIGS = ('english', 'russian')
+    SEARCH_WEIGHTS = {
+        'title': 'A',
+        'company_name': 'A',
+        'description': 'B',
+        'requirements': 'C',
+        'responsibilities': 'C',
+    }
+
     class TypeChoices(models.TextChoices):
         FULL_TIME = 'FULL', _('Full Time')
         PART_TIME = 'PART', _('Part Time')
@@ -59,10 +79,30 @@ class Vacations(InfoMixin):
         null=True,
         blank=True,
     )
+    # Maintained by a database trigger, see migration `0002`.
+    search_vector = SearchVectorField(
+        verbose_name='Search vector',
+        null=True,
+        editable=False,
+    )
 
     class Meta:
         verbose_name = 'Vacation'
         verbose_name_plural = 'Vacations'
+        indexes = [
+            models.Index(fields=['-created_at', '-id'], name='vacations_created_id_idx'),
+            GinIndex(fields=['search_vector'], name='vacations_search_vector_idx'),
+        ]
 
     def __str__(self) -> str:
         return f'{self.title}'
+
+    @classmethod
+    def search_vector_expression(cls) -> SearchVector:
+        """Build the weighted search vector expression for all configs."""
+        vector = None
+        for field, weight in cls.SEARCH_WEIGHTS.items():
+            for config in cls.SEARCH_CONFIGS:
+                part = SearchVector(field, config=config, weight=weight)
+                vector = part if vector is None else vector + part
+        return vector
@@ -1,5 +1,7 @@
 from django.utils import timezone
 from rest_framework import serializers
+
+from common.serializers.mixins import SparseFieldsMixin
 from vacations.models.vacations import Vacations
 
 
@@ -14,14 +16,19 @@ class CreateVacationSerializer(serializers.ModelSerializer):
 
 
 
-class VacationsSerializers(serializers.ModelSerializer):
+class VacationsSerializers(SparseFieldsMixin, serializers.ModelSerializer):
     """Сериализатор для создания вакансии"""
 
+    # Present only in search results, see `FullTextSearchFilter`.
+    search_rank = serializers.FloatField(read_only=True)
+    search_headline = serializers.CharField(read_only=True)
+
     class Meta:
         model = Vacations
         fields = ['id','title', 'address', 'company_name', 'phone_number',
             'description', 'type_vacation', 'requirements', 'responsibilities',
-            'created_at', 'updated_at', 'created_by', 'updated_by',]
+            'created_at', 'updated_at', 'created_by', 'updated_by',
+            'search_rank', 'search_headline',]
 
 
 class UpdateVacationSerializer(CreateVacationSerializer):
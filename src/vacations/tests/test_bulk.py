@@ -0,0 +1,165 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from common.current import impersonate
+from common.throttling import get_bucket_backend
+from users.models.users import User
+from vacations.models import Vacations
+from vacations.views.vacations import VacationsViewSet
+
+URL = '/api/v1/vacations/bulk/'
+
+
+class VacationsBulkTest(TestCase):
+    """Bulk create, update and delete of vacations."""
+
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.owner = User.objects.create(username='anna', email='anna@example.com', role=User.Role.EMPLOYER)
+        cls.other = User.objects.create(username='boris', email='boris@example.com', role=User.Role.EMPLOYER)
+        cls.admin = User.objects.create(
+            username='admin', email='admin@example.com', role=User.Role.ADMIN, is_superuser=True,
+        )
+        with impersonate(cls.owner):
+            cls.own = Vacations.objects.bulk_create([Vacations(title=f'Own {number}') for number in range(2)])
+        with impersonate(cls.other):
+            cls.foreign = Vacations.objects.create(title='Foreign')
+
+    def setUp(self) -> None:
+        cache.clear()
+        get_bucket_backend().clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.owner)
+
+    def test_create(self) -> None:
+        response = self.client.post(URL, [{'title': 'First'}, {'title': 'Second'}], format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['errors'], [])
+        created = Vacations.objects.filter(pk__in=[row['id'] for row in response.data['results']])
+        self.assertEqual(sorted(vacation.title for vacation in created), ['First', 'Second'])
+        for vacation in created:
+            self.assertEqual((vacation.created_by, vacation.updated_by), (self.owner, self.owner))
+            self.assertIsNotNone(vacation.created_at)
+            self.assertEqual(vacation.created_at, vacation.updated_at)
+
+    def test_create_rejects_invalid_items(self) -> None:
+        items = [{'title': 'Valid'}, {'title': 'x' * 201}, {'type_vacation': 'NIGHT'}]
+        response = self.client.post(URL, items, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual([error['index'] for error in response.data['errors']], [1, 2])
+        self.assertFalse(Vacations.objects.filter(title='Valid').exists())
+
+    def test_create_partial_success(self) -> None:
+        items = [{'title': 'Valid'}, {'title': 'x' * 201}]
+        response = self.client.post(f'{URL}?partial_success=true', items, format='json')
+        self.assertEqual(response.status_code, 207)
+        self.assertEqual([row['title'] for row in response.data['results']], ['Valid'])
+        self.assertEqual([error['index'] for error in response.data['errors']], [1])
+        self.assertTrue(Vacations.objects.filter(title='Valid').exists())
+
+    def test_create_payload(self) -> None:
+        self.assertEqual(self.client.post(URL, {'title': 'Not a list'}, format='json').status_code, 400)
+        self.assertEqual(self.client.post(URL, [], format='json').status_code, 400)
+        with mock.patch.object(VacationsViewSet, 'bulk_max_items', 2):
+            response = self.client.post(URL, [{'title': str(number)} for number in range(3)], format='json')
+        self.assertEqual(response.status_code, 400)
+
+    def test_employer_only(self) -> None:
+        self.client.force_authenticate(User.objects.create(username='eve', role=User.Role.EMPLOYEE))
+        self.assertEqual(self.client.post(URL, [{'title': 'First'}], format='json').status_code, 403)
+
+    def test_update(self) -> None:
+        before = {vacation.pk: vacation.updated_at for vacation in self.own}
+        items = [{'id': vacation.pk, 'title': f'Edited {vacation.pk}'} for vacation in self.own]
+        response = self.client.put(URL, items, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([row['id'] for row in response.data['results']], [vacation.pk for vacation in self.own])
+        for vacation in Vacations.objects.filter(pk__in=before):
+            self.assertEqual(vacation.title, f'Edited {vacation.pk}')
+            self.assertEqual(vacation.updated_by, self.owner)
+            self.assertGreater(vacation.updated_at, before[vacation.pk])
+
+    def test_update_foreign_row_is_forbidden(self) -> None:
+        items = [{'id': self.own[0].pk, 'title': 'Edited'}, {'id': self.foreign.pk, 'title': 'Edited'}]
+        response = self.client.put(URL, items, format='json')
+        self.assertEqual(response.status_code, 403)
+        self.assertFalse(Vacations.objects.filter(title='Edited').exists())
+
+    def test_update_partial_success(self) -> None:
+        items = [
+            {'id': self.own[0].pk, 'title': 'Edited'},
+            {'id': self.foreign.pk, 'title': 'Edited'},
+            {'id': 999999, 'title': 'Edited'},
+            {'id': 'abc', 'title': 'Edited'},
+            {'id': self.own[1].pk, 'title': 'x' * 201},
+        ]
+        response = self.client.put(f'{URL}?partial_success=1', items, format='json')
+        self.assertEqual(response.status_code, 207)
+        self.assertEqual([row['id'] for row in response.data['results']], [self.own[0].pk])
+        errors = {error['index']: error['errors'] for error in response.data['errors']}
+        self.assertEqual(sorted(errors), [1, 2, 3, 4])
+        self.assertEqual(errors[1]['id'], [VacationsViewSet.owner_denied_message])
+        self.assertEqual(errors[2]['id'], ['Not found.'])
+        self.assertEqual(errors[3]['id'], ['A valid integer is required.'])
+        self.assertIn('title', errors[4])
+        self.assertEqual(list(Vacations.objects.filter(title='Edited').values_list('pk', flat=True)), [self.own[0].pk])
+
+    def test_update_missing_rows(self) -> None:
+        response = self.client.put(URL, [{'id': 999999, 'title': 'Edited'}], format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['errors'], [{'index': 0, 'errors': {'id': ['Not found.']}}])
+
+    def test_update_loads_the_rows_once(self) -> None:
+        items = [{'id': vacation.pk, 'title': 'Edited'} for vacation in self.own]
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.client.put(URL, items, format='json').status_code, 200)
+        selects = [query['sql'] for query in queries if query['sql'].startswith('SELECT')]
+        self.assertEqual(len(selects), 1)
+
+    def test_superuser_updates_foreign_rows(self) -> None:
+        self.client.force_authenticate(self.admin)
+        response = self.client.put(URL, [{'id': self.foreign.pk, 'title': 'Moderated'}], format='json')
+        self.assertEqual(response.status_code, 200)
+        self.foreign.refresh_from_db()
+        self.assertEqual((self.foreign.title, self.foreign.updated_by), ('Moderated', self.admin))
+        self.assertEqual(self.foreign.created_by, self.other)
+
+    def test_destroy(self) -> None:
+        pks = [vacation.pk for vacation in self.own]
+        response = self.client.delete(URL, pks, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, {'results': pks, 'errors': []})
+        self.assertFalse(Vacations.objects.filter(pk__in=pks).exists())
+
+    def test_destroy_foreign_row_is_forbidden(self) -> None:
+        response = self.client.delete(URL, [self.own[0].pk, self.foreign.pk], format='json')
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(Vacations.objects.count(), 3)
+
+    def test_destroy_partial_success(self) -> None:
+        response = self.client.delete(f'{URL}?partial_success=yes', [{'id': self.foreign.pk}, self.own[1].pk], format='json')
+        self.assertEqual(response.status_code, 207)
+        self.assertEqual(response.data['results'], [self.own[1].pk])
+        self.assertEqual([error['index'] for error in response.data['errors']], [0])
+        self.assertTrue(Vacations.objects.filter(pk=self.foreign.pk).exists())
+
+    def test_destroy_reports_the_deleted_rows(self) -> None:
+        resolve_owned = VacationsViewSet.resolve_owned
+
+        def resolve_then_delete(view, *args, **kwargs):
+            result = resolve_owned(view, *args, **kwargs)
+            # Deleted by another request after the ownership check.
+            Vacations.objects.filter(pk=self.own[0].pk).delete()
+            return result
+
+        pks = [vacation.pk for vacation in self.own]
+        with mock.patch.object(VacationsViewSet, 'resolve_owned', resolve_then_delete):
+            response = self.client.delete(URL, pks, format='json')
+        self.assertEqual(response.status_code, 207)
+        self.assertEqual(response.data['results'], [self.own[1].pk])
+        self.assertEqual(response.data['errors'], [{'index': 0, 'errors': {'id': ['Not found.']}}])
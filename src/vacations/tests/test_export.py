@@ -0,0 +1,139 @@
+import csv
+import datetime
+import io
+import json
+
+from asgiref.sync import async_to_sync
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from common.current import impersonate
+from users.jwt.tokens import UserRefreshToken
+from users.models.users import User
+from vacations.models import Vacations
+from vacations.serializers.vacations import VacationsSerializers
+from vacations.views.vacations import VacationsViewSet
+
+URL = '/api/v1/vacations/export/'
+
+
+class VacationsExportTest(TestCase):
+    """`GET /vacations/export/` streams the filtered vacations."""
+
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.user = User.objects.create(username='anna', email='anna@example.com', role=User.Role.EMPLOYER)
+        now = timezone.now()
+        with impersonate(cls.user):
+            cls.vacations = Vacations.objects.bulk_create([
+                Vacations(
+                    title='Python developer', company_name='Vector', phone_number='+79161234567',
+                    description='Django, "quotes", commas', type_vacation=Vacations.TypeChoices.REMOTE_TIME,
+                    created_at=now - datetime.timedelta(days=10), updated_at=now - datetime.timedelta(days=10),
+                ),
+                Vacations(
+                    title='Go developer', company_name=None, description='Microservices',
+                    created_at=now - datetime.timedelta(days=2), updated_at=now - datetime.timedelta(days=2),
+                ),
+                Vacations(
+                    title='Python team lead', company_name='Alpha', description='Python\nmentoring',
+                    created_at=now - datetime.timedelta(hours=1), updated_at=now - datetime.timedelta(hours=1),
+                ),
+            ])
+
+    def setUp(self) -> None:
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def export(self, **params) -> list[dict]:
+        response = self.client.get(URL, params)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        content = b''.join(response.streaming_content).decode()
+        return [json.loads(line) for line in content.splitlines()]
+
+    def serialize(self, vacations) -> list[dict]:
+        return json.loads(json.dumps(VacationsSerializers(vacations, many=True).data, default=str))
+
+    def test_ndjson(self) -> None:
+        rows = self.export()
+        self.assertEqual([row['id'] for row in rows], [vacation.pk for vacation in self.vacations])
+        self.assertEqual(rows, self.serialize(self.vacations))
+        self.assertEqual(rows[0]['phone_number'], '+79161234567')
+        self.assertIsNone(rows[1]['company_name'])
+
+    def test_csv(self) -> None:
+        response = self.client.get(URL, {'export_format': 'csv'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="vacations.csv"')
+        content = b''.join(response.streaming_content).decode()
+        lines = list(csv.DictReader(io.StringIO(content)))
+        self.assertEqual([int(line['id']) for line in lines], [vacation.pk for vacation in self.vacations])
+        self.assertEqual(lines[0]['description'], 'Django, "quotes", commas')
+        self.assertEqual(lines[1]['company_name'], '')
+        self.assertEqual(lines[2]['description'], 'Python\nmentoring')
+
+    def test_unknown_format(self) -> None:
+        response = self.client.get(URL, {'export_format': 'xml'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('export_format', response.json())
+
+    def test_updated_since(self) -> None:
+        since = timezone.localtime(timezone.now() - datetime.timedelta(days=3))
+        expected = [vacation.pk for vacation in self.vacations[1:]]
+        for value in (since.isoformat(), since.replace(tzinfo=None).isoformat(), since.date().isoformat()):
+            with self.subTest(updated_since=value):
+                self.assertEqual([row['id'] for row in self.export(updated_since=value)], expected)
+
+    def test_invalid_updated_since(self) -> None:
+        for value in ('yesterday', '2026-13-01', '2026-02-30T10:00'):
+            with self.subTest(updated_since=value):
+                response = self.client.get(URL, {'updated_since': value})
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(response.json(), {'updated_since': 'Enter a valid date or datetime.'})
+
+    def test_filters_match_the_list(self) -> None:
+        for params in ({'search': 'python'}, {'ordering': 'company_name'}, {'ordering': '-created_at'}):
+            with self.subTest(**params):
+                listed = self.client.get('/api/v1/vacations/', params).json()
+                exported = self.export(**params)
+                self.assertEqual([row['id'] for row in exported], [row['id'] for row in listed])
+
+    def test_unauthenticated(self) -> None:
+        self.assertEqual(APIClient().get(URL).status_code, 401)
+
+    def test_asgi_streams_asynchronously(self) -> None:
+        token = str(UserRefreshToken.for_user(self.user).access_token)
+
+        async def export(export_format: str) -> tuple:
+            response = await self.async_client.get(
+                URL, {'export_format': export_format}, headers={'authorization': f'Bearer {token}'},
+            )
+            return response, b''.join([chunk async for chunk in response.streaming_content])
+
+        for export_format in ('ndjson', 'csv'):
+            with self.subTest(export_format=export_format):
+                response, content = async_to_sync(export)(export_format)
+                self.assertEqual(response.status_code, 200)
+                self.assertTrue(response.is_async)
+                sync_content = b''.join(self.client.get(URL, {'export_format': export_format}).streaming_content)
+                self.assertEqual(content, sync_content)
+
+    def test_asgi_serializer_fallback(self) -> None:
+        token = str(UserRefreshToken.for_user(self.user).access_token)
+        VacationsViewSet.export_chunk_size = 2
+        self.addCleanup(setattr, VacationsViewSet, 'export_chunk_size', 2000)
+
+        async def export() -> bytes:
+            response = await self.async_client.get(
+                URL, {'fields': 'id,title'}, headers={'authorization': f'Bearer {token}'},
+            )
+            return b''.join([chunk async for chunk in response.streaming_content])
+
+        rows = [json.loads(line) for line in async_to_sync(export)().splitlines()]
+        self.assertEqual(rows, [{'id': vacation.pk, 'title': vacation.title} for vacation in self.vacations])
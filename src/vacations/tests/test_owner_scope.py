@@ -0,0 +1,117 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from common.current import impersonate
+from common.throttling import get_bucket_backend
+from users.models.users import User
+from vacations.models import Vacations
+from vacations.views.vacations import VacationsViewSet
+
+LIST_URL = '/api/v1/vacations/'
+MY_URL = '/api/v1/vacations-me/'
+
+
+class OwnerScopedTest(TestCase):
+    """Vacations are changed by their author or a superuser only."""
+
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.owner = User.objects.create(username='anna', email='anna@example.com', role=User.Role.EMPLOYER)
+        cls.other = User.objects.create(username='boris', email='boris@example.com', role=User.Role.EMPLOYER)
+        cls.admin = User.objects.create(
+            username='admin', email='admin@example.com', role=User.Role.ADMIN, is_superuser=True,
+        )
+        with impersonate(cls.owner):
+            cls.own = Vacations.objects.create(title='Own')
+        with impersonate(cls.other):
+            cls.foreign = Vacations.objects.create(title='Foreign')
+        with impersonate(cls.admin):
+            cls.admins = Vacations.objects.create(title='Moderation')
+
+    def setUp(self) -> None:
+        cache.clear()
+        get_bucket_backend().clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.owner)
+
+    def detail_url(self, pk) -> str:
+        return f'{LIST_URL}{pk}/'
+
+    def put(self, pk, title: str = 'Edited'):
+        return self.client.put(self.detail_url(pk), {'title': title}, format='json')
+
+    def test_update_own(self) -> None:
+        response = self.put(self.own.pk)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['title'], 'Edited')
+        self.own.refresh_from_db()
+        self.assertEqual((self.own.title, self.own.updated_by), ('Edited', self.owner))
+        self.assertEqual(response.data['updated_by'], self.owner.pk)
+
+    def test_update_foreign(self) -> None:
+        response = self.put(self.foreign.pk)
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(response.data['detail'], VacationsViewSet.owner_denied_message)
+        self.foreign.refresh_from_db()
+        self.assertEqual(self.foreign.title, 'Foreign')
+
+    def test_update_missing(self) -> None:
+        self.assertEqual(self.put(999999).status_code, 404)
+        self.assertEqual(self.put('abc').status_code, 404)
+
+    def test_update_handed_over(self) -> None:
+        get_object = VacationsViewSet.get_object
+
+        def get_then_hand_over(view):
+            obj = get_object(view)
+            Vacations.objects.filter(pk=obj.pk).update(created_by=self.other)
+            return obj
+
+        with mock.patch.object(VacationsViewSet, 'get_object', get_then_hand_over):
+            self.assertEqual(self.put(self.own.pk).status_code, 404)
+        self.own.refresh_from_db()
+        self.assertEqual(self.own.title, 'Own')
+
+    def test_destroy_own(self) -> None:
+        self.assertEqual(self.client.delete(self.detail_url(self.own.pk)).status_code, 204)
+        self.assertFalse(Vacations.objects.filter(pk=self.own.pk).exists())
+
+    def test_destroy_foreign(self) -> None:
+        response = self.client.delete(self.detail_url(self.foreign.pk))
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(response.data['detail'], VacationsViewSet.owner_denied_message)
+        self.assertTrue(Vacations.objects.filter(pk=self.foreign.pk).exists())
+
+    def test_destroy_missing(self) -> None:
+        self.assertEqual(self.client.delete(self.detail_url(999999)).status_code, 404)
+        self.assertEqual(self.client.delete(self.detail_url('abc')).status_code, 404)
+
+    def test_destroy_is_one_delete(self) -> None:
+        with self.assertNumQueries(1):
+            self.assertEqual(self.client.delete(self.detail_url(self.own.pk)).status_code, 204)
+
+    def test_superuser_bypass(self) -> None:
+        self.client.force_authenticate(self.admin)
+        self.assertEqual(self.put(self.foreign.pk, 'Moderated').status_code, 200)
+        self.foreign.refresh_from_db()
+        self.assertEqual((self.foreign.title, self.foreign.updated_by), ('Moderated', self.admin))
+        self.assertEqual(self.foreign.created_by, self.other)
+
+        self.assertEqual(self.client.delete(self.detail_url(self.foreign.pk)).status_code, 204)
+        self.assertEqual(self.client.delete(self.detail_url(self.foreign.pk)).status_code, 404)
+
+    def test_my_vacations(self) -> None:
+        for user, vacation in ((self.owner, self.own), (self.other, self.foreign), (self.admin, self.admins)):
+            with self.subTest(user=user.username):
+                self.client.force_authenticate(user)
+                response = self.client.get(MY_URL)
+                self.assertEqual(response.status_code, 200)
+                # No superuser bypass: the admin only sees their own rows too.
+                self.assertEqual([row['id'] for row in response.data], [vacation.pk])
+
+    def test_my_vacations_anonymous(self) -> None:
+        self.client.force_authenticate(None)
+        self.assertEqual(self.client.get(MY_URL).status_code, 401)
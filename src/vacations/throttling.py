@@ -0,0 +1,6 @@
+from common.throttling import UserThrottle
+
+
+class VacationWriteThrottle(UserThrottle):
+    """Vacation writes per user."""
+    scope = 'vacation_write'
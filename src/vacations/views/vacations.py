@@ -1,12 +1,31 @@
-from rest_framework import permissions, filters
-from drf_spectacular.utils import extend_schema_view, extend_schema
-from django.db.models import Q
+import datetime
+from typing import Any, Optional
+
+from django.db import transaction
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from rest_framework import permissions, filters, status
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import OpenApiParameter, extend_schema_view, extend_schema
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from vacations.serializers.vacations import VacationsSerializers, CreateVacationSerializer, UpdateVacationSerializer
-from common.views.mixins import CRUDListViewSet, ListViewSet
+from common import exports
+from common.caching import ResponseCache
+from common.counting import CachedCount, EstimatedCount
+from common.filters import FullTextSearchFilter
+from common.pagination import KeysetPagination
+from common.serializers.converters import FastReadConverter
+from common.views.mixins import CRUDListViewSet, ListViewSet, OwnerScopedMixin
 from vacations.models import Vacations
 from vacations.permissions.vacations import IsEmployee
-from rest_framework_simplejwt import authentication as jwt_authentication
+from vacations.throttling import VacationWriteThrottle
+from users.jwt import authentication as jwt_authentication
 from rest_framework.viewsets import ReadOnlyModelViewSet
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.exceptions import PermissionDenied
@@ -20,53 +39,308 @@ from rest_framework.exceptions import PermissionDenied
     update=extend_schema(summary="Update Vacation", tags=["Vacations"]),
     partial_update=extend_schema(exclude=True),
     destroy=extend_schema(summary="Delete Vacations", tags=["Vacations"]),
+    export=extend_schema(
+        summary="Export vacations",
+        tags=["Vacations"],
+        parameters=[
+            OpenApiParameter(
+                'export_format',
+                enum=list(exports.CONTENT_TYPES),
+                default=exports.NDJSON,
+            ),
+            OpenApiParameter('updated_since', OpenApiTypes.DATETIME),
+        ],
+        responses={
+            (200, 'application/x-ndjson'): OpenApiTypes.STR,
+            (200, 'text/csv'): OpenApiTypes.STR,
+        },
+    ),
+    bulk_create=extend_schema(
+        summary="Create Vacations in bulk",
+        tags=["Vacations"],
+        request=CreateVacationSerializer(many=True),
+        parameters=[OpenApiParameter('partial_success', OpenApiTypes.BOOL)],
+        responses={201: OpenApiTypes.OBJECT, 207: OpenApiTypes.OBJECT},
+    ),
+    bulk_update=extend_schema(
+        summary="Update Vacations in bulk",
+        tags=["Vacations"],
+        request=UpdateVacationSerializer(many=True),
+        parameters=[OpenApiParameter('partial_success', OpenApiTypes.BOOL)],
+        responses={200: OpenApiTypes.OBJECT, 207: OpenApiTypes.OBJECT},
+    ),
+    bulk_destroy=extend_schema(
+        summary="Delete Vacations in bulk",
+        tags=["Vacations"],
+        request={'application/json': {'type': 'array', 'items': {'type': 'integer'}}},
+        parameters=[OpenApiParameter('partial_success', OpenApiTypes.BOOL)],
+        responses={200: OpenApiTypes.OBJECT, 207: OpenApiTypes.OBJECT},
+    ),
 )
-class VacationsViewSet(CRUDListViewSet):
+class VacationsViewSet(OwnerScopedMixin, CRUDListViewSet):
     """Views for Vacations """
     queryset = Vacations.objects.all()
-    authentication_classes = (jwt_authentication.JWTAuthentication,)
-
+    authentication_classes = (jwt_authentication.CachedJWTAuthentication,)
+    # Reads only check the role, which the token claims carry.
+    multi_authentication_classes = {
+        'list': (jwt_authentication.ClaimsJWTAuthentication,),
+        'retrieve': (jwt_authentication.ClaimsJWTAuthentication,),
+    }
 
     multi_permission_classes = {
         'create': (IsEmployee,),
         'update': (IsEmployee,),
         'destroy': (IsEmployee,),
-        
-
+        'export': (IsAuthenticated,),
+        'bulk_create': (IsEmployee,),
+        'bulk_update': (IsEmployee,),
+        'bulk_destroy': (IsEmployee,),
+    }
+    multi_throttle_classes = {
+        action: (VacationWriteThrottle,)
+        for action in (
+            'create', 'update', 'partial_update', 'destroy',
+            'bulk_create', 'bulk_update', 'bulk_destroy',
+        )
     }
     serializer_class = VacationsSerializers
     multi_serializer_class = {
         'create': CreateVacationSerializer,
         'update': UpdateVacationSerializer,
-
+        'bulk_create': CreateVacationSerializer,
+        'bulk_update': UpdateVacationSerializer,
     }
     http_method_names = ('get', 'post', 'put', 'delete')
 
-    filter_backends = [filters.OrderingFilter, filters.SearchFilter]
-    search_fields = ['company_name', 'title']
+    fast_read_actions = ('list', 'retrieve')
+    response_cache = ResponseCache(timeout=300)
+    pagination_class = KeysetPagination
+    count_strategy = EstimatedCount(fallback=CachedCount())
+    filter_backends = [FullTextSearchFilter, filters.OrderingFilter]
+    search_vector_field = 'search_vector'
+    search_configs = Vacations.SEARCH_CONFIGS
+    search_headline_field = 'description'
     ordering_fields = ['created_at', 'company_name']
+    export_chunk_size = 2000
+    bulk_max_items = 1000
+    partial_success_param = 'partial_success'
+    owner_scoped_actions = ('update', 'destroy', 'bulk_update', 'bulk_destroy')
+    owner_denied_message = "Вы можете изменять только свои вакансии."
+
+    @staticmethod
+    def parse_updated_since(value: str) -> datetime.datetime:
+        """Parse the `updated_since` date or datetime."""
+        try:
+            parsed = parse_datetime(value)
+            if parsed is None:
+                date = parse_date(value)
+                parsed = date and datetime.datetime.combine(date, datetime.time.min)
+        except ValueError:
+            parsed = None
+        if parsed is None:
+            raise ValidationError({'updated_since': 'Enter a valid date or datetime.'})
+        if timezone.is_naive(parsed):
+            parsed = timezone.make_aware(parsed)
+        return parsed
+
+    @action(methods=['GET'], detail=False)
+    def export(self, request: Request) -> StreamingHttpResponse:
+        """Выгрузка всех вакансий по фильтрам в NDJSON или CSV"""
+        export_format = request.query_params.get('export_format', exports.NDJSON)
+        if export_format not in exports.CONTENT_TYPES:
+            raise ValidationError(
+                {'export_format': f'Choose one of: {", ".join(exports.CONTENT_TYPES)}.'}
+            )
+
+        queryset = self.filter_queryset(self.get_queryset())
+        updated_since = request.query_params.get('updated_since')
+        if updated_since:
+            queryset = queryset.filter(updated_at__gte=self.parse_updated_since(updated_since))
+        if not queryset.ordered:
+            queryset = queryset.order_by('pk')
 
-    def get_queryset(self):
-        queryset = super().get_queryset()
-        search_query = self.request.query_params.get('search', None)
-        if search_query:
-            queryset = queryset.filter(
-                Q(title__icontains=search_query) | Q(company_name__icontains=search_query)
+        serializer = self.get_serializer()
+        converter = FastReadConverter.for_serializer(serializer, queryset)
+        if converter is not None:
+            fields = [step.name for step in converter.steps]
+            queryset, convert = converter.values(queryset), converter.convert
+        else:
+            fields = [name for name, field in serializer.fields.items() if not field.write_only]
+            convert = lambda instance: self.get_serializer(instance).data
+
+        # Django buffers a sync stream under ASGI, rows are read asynchronously there.
+        if exports.is_async_request(request):
+            rows = exports.aiter_rows(
+                queryset, convert, self.export_chunk_size, in_thread=converter is None
             )
-        return queryset
-    
-    def perform_update(self, serializer):
-        """Разрешает обновление только создателю вакансии"""
-        vacation = self.get_object()
-        if vacation.created_by != self.request.user:
-            raise PermissionDenied("Вы можете редактировать только свои вакансии.")
-        serializer.save()
+        else:
+            rows = exports.iter_rows(queryset, convert, self.export_chunk_size)
+        return exports.stream_export(rows, fields, export_format, 'vacations')
+
+    def allows_partial_success(self) -> bool:
+        """Check whether the caller accepts writing only the valid items."""
+        value = self.request.query_params.get(self.partial_success_param, '')
+        return value.lower() in ('1', 'true', 'yes')
+
+    def get_bulk_items(self) -> list:
+        """Get the list payload of a bulk action."""
+        items = self.request.data
+        if not isinstance(items, list) or not items:
+            raise ValidationError({api_settings.NON_FIELD_ERRORS_KEY: ['Expected a non-empty list.']})
+        if len(items) > self.bulk_max_items:
+            raise ValidationError({
+                api_settings.NON_FIELD_ERRORS_KEY: [f'At most {self.bulk_max_items} items per request.']
+            })
+        return items
+
+    @staticmethod
+    def get_item_pk(item: Any) -> Optional[int]:
+        """Get the id of a bulk item, given as `{"id": ...}` or as is."""
+        value = item.get('id') if isinstance(item, dict) else item
+        if isinstance(value, bool):
+            return None
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            return None
+
+    def reject_bulk(self, errors: list[dict], forbidden: bool = False) -> Optional[Response]:
+        """Reject the whole batch on errors unless partial success is allowed."""
+        if not errors or self.allows_partial_success():
+            return None
+        if forbidden:
+            raise PermissionDenied(self.owner_denied_message)
+        return self.bulk_response([], errors, status.HTTP_400_BAD_REQUEST)
+
+    @staticmethod
+    def bulk_response(results: list, errors: list[dict], status_code: int) -> Response:
+        """Report written items and per-item errors."""
+        if errors:
+            status_code = status.HTTP_207_MULTI_STATUS if results else status.HTTP_400_BAD_REQUEST
+        return Response({'results': results, 'errors': errors}, status=status_code)
 
-    def perform_destroy(self, instance):
-        """Разрешает удаление только создателю вакансии"""
-        if instance.created_by != self.request.user:
-            raise PermissionDenied("Вы можете удалять только свои вакансии.")
-        instance.delete()
+    def resolve_owned(self, items: list, errors: list[dict], load: bool = False) -> tuple[dict[int, Any], bool]:
+        """
+        Map item indexes to the vacations the user may change.
+
+        Ownership is checked with one query for the whole batch, loading the
+        instances with `load`, else only their ids.
+        """
+        pks = {}
+        for index, item in enumerate(items):
+            pk = self.get_item_pk(item)
+            if pk is None:
+                errors.append({'index': index, 'errors': {'id': ['A valid integer is required.']}})
+            else:
+                pks[index] = pk
+
+        queryset = self.annotate_owner(self.get_queryset().filter(pk__in=set(pks.values())))
+        if load:
+            rows = {obj.pk: (obj, getattr(obj, self.owner_annotation)) for obj in queryset}
+        else:
+            rows = {pk: (pk, is_owner) for pk, is_owner in queryset.values_list('pk', self.owner_annotation)}
+        scoped = self.is_owner_scoped()
+        forbidden = False
+        owned = {}
+        for index, pk in pks.items():
+            if pk not in rows:
+                errors.append({'index': index, 'errors': {'id': ['Not found.']}})
+            elif scoped and not rows[pk][1]:
+                forbidden = True
+                errors.append({'index': index, 'errors': {'id': [self.owner_denied_message]}})
+            else:
+                owned[index] = rows[pk][0]
+        return owned, forbidden
+
+    @action(methods=['POST'], detail=False, url_path='bulk')
+    def bulk_create(self, request: Request) -> Response:
+        """Создание списка вакансий одним запросом"""
+        items = self.get_bulk_items()
+        serializer = self.get_serializer(data=items, many=True)
+
+        validated, errors = [], []
+        for index, item in enumerate(items):
+            try:
+                validated.append(serializer.run_child_validation(item))
+            except ValidationError as exc:
+                errors.append({'index': index, 'errors': exc.detail})
+        rejected = self.reject_bulk(errors)
+        if rejected:
+            return rejected
+
+        objs = [Vacations(**attrs) for attrs in validated]
+        if objs:
+            with transaction.atomic():
+                Vacations.objects.bulk_create(objs)
+
+        results = [serializer.child.to_representation(obj) for obj in objs]
+        return self.bulk_response(results, errors, status.HTTP_201_CREATED)
+
+    @bulk_create.mapping.put
+    def bulk_update(self, request: Request) -> Response:
+        """Обновление списка своих вакансий одним запросом"""
+        items = self.get_bulk_items()
+        errors = []
+        owned, forbidden = self.resolve_owned(items, errors, load=True)
+
+        serializer = self.get_serializer(data=items, many=True)
+        changed, fields = {}, set()
+        for index, instance in owned.items():
+            serializer.child.instance = instance
+            serializer.child.initial_data = items[index]
+            try:
+                attrs = serializer.run_child_validation(items[index])
+            except ValidationError as exc:
+                errors.append({'index': index, 'errors': exc.detail})
+                continue
+            for attr, value in attrs.items():
+                setattr(instance, attr, value)
+            fields.update(attrs)
+            changed[index] = instance
+        serializer.child.instance = None
+
+        errors.sort(key=lambda error: error['index'])
+        rejected = self.reject_bulk(errors, forbidden=forbidden)
+        if rejected:
+            return rejected
+
+        objs = list({instance.pk: instance for instance in changed.values()}.values())
+        if objs:
+            with transaction.atomic():
+                Vacations.objects.bulk_update(objs, sorted(fields))
+
+        results = [serializer.child.to_representation(instance) for instance in changed.values()]
+        return self.bulk_response(results, errors, status.HTTP_200_OK)
+
+    @bulk_create.mapping.delete
+    def bulk_destroy(self, request: Request) -> Response:
+        """Удаление списка своих вакансий одним запросом"""
+        items = self.get_bulk_items()
+        errors = []
+        owned, forbidden = self.resolve_owned(items, errors)
+        errors.sort(key=lambda error: error['index'])
+        rejected = self.reject_bulk(errors, forbidden=forbidden)
+        if rejected:
+            return rejected
+
+        deleted = []
+        if owned:
+            queryset = self.get_queryset().filter(pk__in=set(owned.values()))
+            if self.is_owner_scoped():
+                queryset = queryset.filter(self.get_owner_filter())
+            with transaction.atomic():
+                # The locked rows are the ones the DELETE removes.
+                deleted = sorted(queryset.select_for_update().values_list('pk', flat=True))
+                if deleted:
+                    self.get_queryset().filter(pk__in=deleted).delete()
+
+        # Rows deleted since ownership was checked.
+        removed = set(deleted)
+        for index, pk in owned.items():
+            if pk not in removed:
+                errors.append({'index': index, 'errors': {'id': ['Not found.']}})
+        errors.sort(key=lambda error: error['index'])
+        return self.bulk_response(deleted, errors, status.HTTP_200_OK)
 
 
 
@@ -75,13 +349,12 @@ class VacationsViewSet(CRUDListViewSet):
         summary="Get vacations",
         tags=["Vacations"]),
 )
-class MyVacationsViewSet(ListViewSet):
+class MyVacationsViewSet(OwnerScopedMixin, ListViewSet):
     """Выводит список вакансий, созданных текущим пользователем"""
     queryset = Vacations.objects.all()
     serializer_class = VacationsSerializers
-    authentication_classes = (jwt_authentication.JWTAuthentication,)
+    authentication_classes = (jwt_authentication.ClaimsJWTAuthentication,)
     permission_classes = [IsAuthenticated, IsEmployee]
-
-    def get_queryset(self):
-        """Фильтруем вакансии по текущему пользователю"""
-        return Vacations.objects.filter(created_by=self.request.user)
+    owner_scoped_actions = ()
+    owner_filtered_actions = ('list',)
+    owner_superuser_bypass = False